@@ -1,9 +1,20 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pymysql
 import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime
 import time
+from dashboard_data import (
+    PAGE_SIZE, QueryRunner, UpbitDataStore, choose_resolution, fetch_history_bounds, fetch_page, fetch_period_frame,
+    frame_page,
+)
+from snapshot import SNAPSHOT_DIR, ColumnarSnapshot
+from charts import CHART_WIDTH_PX, CoinIndex, build_line_chart, slice_date_range, trace_points
+from correlation import CORRELATION_WINDOWS, CorrelationEngine
+from indicators import BOLLINGER_K, INDICATORS, IndicatorEngine
+from figure_cache import FIGURE_CACHE_BYTES, FIGURE_CACHE_ENTRIES, FigureCache
+import metrics
+from metrics import METRICS_FILE
 
 # [설정]
 DB_HOST = "localhost"
@@ -12,225 +23,460 @@ DB_PASSWORD = "1234"
 DB_NAME = "alswnddldy"
 TABLE_NAME = "upbit_data"
 
-# 데이터베이스에서 데이터 가져오기
-def fetch_data_from_db():
-    connection = pymysql.connect(
-        host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
+CACHE_TTL_SECONDS = 60  # 이 시간 동안은 DB를 다시 확인하지 않음
+POOL_SIZE = 4  # 모든 세션이 공유하는 DB 연결 수
+POOL_TIMEOUT_SECONDS = 10  # 연결이 모두 사용 중일 때 기다릴 최대 시간
+TABLE_SORT_LABELS = {"code": "코인", "date": "날짜", "closing_price": "종가", "volume": "거래량", "change_rate": "변동률"}  # 데이터 표 정렬 기준
+RESOLUTION_LABELS = {"day": "일봉", "week": "주봉", "month": "월봉"}
+FAST_RENDER_POINTS = 5000  # 자동 모드에서 표시할 점이 이보다 많으면 WebGL + 다운샘플링으로 전환
+VERSION_CHECK_SECONDS = 60  # 화면 구역마다 스스로 다시 실행되며 새 데이터를 확인하는 주기 (앱 전체는 다시 실행하지 않음)
+
+# DB 연결 생성
+def connect_db():
+    # 읽기 전용: 쿼리마다 최신 데이터를 보도록 autocommit 사용
+    return pymysql.connect(
+        host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME, autocommit=True
     )
-    query = f"""
-    SELECT date, code, opening_price, closing_price, prev_closing_price, volume 
-    FROM {TABLE_NAME}
-    WHERE date >= '2024-12-10'
-    ORDER BY date ASC;
-    """
-    cursor = connection.cursor()
-    cursor.execute(query)
-    rows = cursor.fetchall()
-    columns = ["date", "code", "opening_price", "closing_price", "prev_closing_price", "volume"]
-    connection.close()
-    return pd.DataFrame(rows, columns=columns)
-
-# Streamlit 앱 시작
-st.set_page_config(layout="wide")  # 넓은 레이아웃 설정
-st.title("실시간 코인 비교 시각화 (모든 데이터)")
-
-# 자동 새로고침 기능
-refresh_interval = 3600  # 1시간 간격 (초 단위)
-if "last_update" not in st.session_state:
-    st.session_state.last_update = datetime.now()
-
-# 데이터 가져오기
-data = fetch_data_from_db()
-
-if data.empty:
-    st.warning("데이터가 없습니다. 데이터를 수집 중인지 확인해주세요.")
-else:
-    # 데이터 처리
-    data["date"] = pd.to_datetime(data["date"])
-    data["change_rate"] = ((data["closing_price"] - data["opening_price"]) / data["opening_price"]) * 100
-    data["price_change"] = data["closing_price"] - data["prev_closing_price"]
-    data["cumulative_volume"] = data.groupby("code")["volume"].cumsum()  # 누적 거래량 계산
 
-    coin_list = ["전체 보기"] + list(data["code"].unique())
+# 모든 세션이 공유하는 연결 풀 + 동일 쿼리 합치기 (프로세스당 하나)
+@st.cache_resource
+def get_query_runner():
+    return QueryRunner(connect_db, POOL_SIZE, POOL_TIMEOUT_SECONDS)
+
+# 모든 세션이 공유하는 증분 데이터 캐시 (프로세스당 하나)
+# 처음에는 수집기가 갱신하는 로컬 컬럼 스냅샷을 읽고, DB에서는 그 이후의 행만 조회한다.
+@st.cache_resource
+def get_data_store():
+    return UpbitDataStore(
+        get_query_runner(), TABLE_NAME, start_date="2024-12-10", ttl=CACHE_TTL_SECONDS,
+        local_snapshot=ColumnarSnapshot(SNAPSHOT_DIR, TABLE_NAME),
+    )
 
-    # 선택 가능한 코인 필터링 추가
-    selected_coin = st.selectbox("시각화할 코인을 선택하세요:", options=coin_list)
+# 코인별 인덱스 (데이터 버전마다 한 번만 생성, 프레임은 해시하지 않도록 _data로 받음)
+@st.cache_resource(max_entries=2)
+def get_coin_index(version, _data):
+    with metrics.timer("coin_index_build"):
+        return CoinIndex(_data)
+
+# DB 전체 일봉의 날짜 범위 (데이터 버전마다 한 번 조회)
+@st.cache_resource(max_entries=2)
+def get_history_bounds(version):
+    return fetch_history_bounds(get_query_runner(), TABLE_NAME)
+
+# 선택 기간/해상도의 코인별 인덱스 (일봉 또는 주봉/월봉 집계 테이블에서 기간 안의 행만 조회)
+@st.cache_resource(max_entries=16)
+def get_period_index(version, resolution, date_range):
+    return CoinIndex(fetch_period_frame(get_query_runner(), TABLE_NAME, resolution, date_range))
+
+# 수익률 상관관계 엔진 (프로세스당 하나, 새 날짜만 증분 반영)
+@st.cache_resource
+def get_correlation_engine():
+    return CorrelationEngine()
+
+# 기술 지표 엔진 (프로세스당 하나, (지표, 기간)별 캐시 + 새 캔들만 증분 계산)
+@st.cache_resource
+def get_indicator_engine():
+    return IndicatorEngine()
+
+# 만든 차트를 모든 세션이 공유하는 LRU 캐시 (프로세스당 하나, 새 데이터 버전이 오면 비움)
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache(FIGURE_CACHE_ENTRIES, FIGURE_CACHE_BYTES)
+
+# 차트 캐시 조회 (키: 데이터 버전 + 차트 종류, 코인, 기간 등 / 없으면 build()로 만듦)
+def cached_figure(version, key, build):
+    return get_figure_cache().get_or_build(version, key, build)
+
+# 캐시된 그림 표시 (직렬화해 둔 HTML을 그대로 보내므로 보여줄 때마다 그림을 다시 직렬화하지 않음)
+# (st.iframe가 없는 이전 Streamlit에서는 components.html 사용)
+def show_figure(figure):
+    if hasattr(st, "iframe"):
+        st.iframe(figure.html, height=figure.height)
+    else:
+        components.html(figure.html, height=figure.height)
+
+# 운영자용 DB 지표 (사이드바)
+def show_db_stats():
+    stats = get_query_runner().stats()
+    pool, coalescing = stats["pool"], stats["coalescing"]
+    with st.sidebar.expander("DB 운영 지표"):
+        st.write(f"연결 풀: {pool['in_use']}개 사용 중 / {pool['opened']}개 열림 (최대 {pool['size']}개)")
+        st.write(f"연결 대기: {pool['waits']}회, 평균 {pool['avg_wait_ms']:.1f}ms, 최대 {pool['max_wait_ms']:.1f}ms")
+        st.write(
+            f"쿼리 합치기: {coalescing['coalesced']}/{coalescing['calls']}회 "
+            f"({coalescing['hit_rate'] * 100:.1f}%)"
+        )
+        st.write(f"데이터 버전: {get_data_store().version}")
+    figures = get_figure_cache().stats()
+    with st.sidebar.expander("차트 캐시"):
+        st.write(f"적중률: {figures['hit_rate'] * 100:.1f}% ({figures['hits']}/{figures['hits'] + figures['misses']}회)")
+        st.write(f"보관: {figures['entries']}개, 약 {figures['bytes'] / 1024 / 1024:.1f}MB (밀려난 그림 {figures['evictions']}개)")
+
+# 구간별 시간/횟수 (UPBIT_METRICS=1로 실행했을 때만, Prometheus 텍스트 파일도 함께 갱신)
+def show_metrics_panel():
+    if not metrics.enabled():
+        return
+    with st.sidebar.expander("성능 지표"):
+        st.dataframe(pd.DataFrame(metrics.rows()), use_container_width=True, hide_index=True)
+        text = metrics.export_prometheus()
+        st.download_button("Prometheus 형식으로 받기", text, file_name="upbit_metrics.prom")
+    metrics.write_prometheus(METRICS_FILE)
+
+# 데이터베이스에서 데이터 가져오기 (TTL 안에서는 캐시, 이후에는 새 행만 추가로 조회)
+# (데이터 버전, 프레임)을 돌려주며 프레임은 여러 세션이 공유하므로 바꾸면 안 된다.
+def fetch_data_from_db():
+    return get_data_store().snapshot()
+
+# 부분 재실행 데코레이터 (Streamlit 1.37 미만은 experimental_fragment)
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
+# 화면 구역과 의존성 (구역은 모두 나란히 있는 fragment이고, 구역 안의 위젯이 바뀌면 그 구역만 다시 실행된다)
+# - 데이터 버전: 구역마다 VERSION_CHECK_SECONDS마다 스스로 다시 실행되면서 최신 버전을 읽음 (앱 전체는 다시 실행하지 않음)
+#   버전이 그대로면 그림은 차트 캐시에서 꺼내므로 다시 만들지 않는다.
+# - 사이드바 (표시 기간, 렌더링 방식), 코인 선택: 앱 전체 실행 (그림은 차트 캐시에서 꺼냄)
+# - 이동평균/보조 지표 설정: 이동평균 차트만 (지표 구역)
+# - 롤링 상관관계 기간: 롤링 상관관계 차트만 (롤링 상관관계 구역)
+# - 정렬/페이지: 데이터 표만 (표 구역)
+# - 상관관계 기간: 히트맵만 (히트맵 구역, 코인 선택과 무관)
+
+# 구역이 실행될 때의 최신 (데이터 버전, 코인별 인덱스)
+def load_index():
+    data_version, data = fetch_data_from_db()
+    return data_version, get_coin_index(data_version, data)
+
+# 구역이 실행될 때의 화면 데이터 {"version", "index", "period_index", "resolution", "date_range", "offline"}
+# 표시 기간이 최신 날짜까지였으면(follow_latest) 새 날짜가 들어와도 최신 날짜까지 보여준다.
+def load_view(date_range, follow_latest):
+    data_version, index = load_index()
+    offline = get_data_store().offline
+    if follow_latest:
+        date_range = (date_range[0], max(date_range[1], index.frame["date"].max().date()))
+
+    # 기간 차트 해상도: 기간이 길면 주봉/월봉 집계 테이블에서 코인당 적은 행만 읽음
+    # (읽기 전용 모드에서는 메모리에 있는 일봉만 사용)
+    resolution = "day" if offline else choose_resolution(*date_range)
+    if resolution == "day" and date_range[0] >= index.frame["date"].min().date():
+        period_index = index
+    else:
+        period_index = get_period_index(data_version, resolution, tuple(date_range))
+    return {
+        "version": data_version, "index": index, "period_index": period_index,
+        "resolution": resolution, "date_range": date_range, "offline": offline,
+    }
+
+# 렌더링 방식: 자동이면 표시할 점 수가 많을 때만 WebGL + 다운샘플링 사용
+def use_fast_render(view, codes, render_mode):
+    if render_mode == "자동":
+        visible_points = sum(len(slice_date_range(view["period_index"].get(code), view["date_range"])) for code in codes)
+        return visible_points > FAST_RENDER_POINTS
+    return render_mode == "고속 (WebGL)"
+
+# 1~3. 코인별 시계열 (거래량, 누적 거래량, 변동률)
+@fragment(run_every=VERSION_CHECK_SECONDS)
+def coin_section(selected_coin, date_range, follow_latest, render_mode):
+    view = load_view(date_range, follow_latest)
+    data_version, period_index, date_range = view["version"], view["period_index"], view["date_range"]
+    selected_codes = view["index"].codes if selected_coin == "전체 보기" else [selected_coin]
+
+    fast_render = use_fast_render(view, selected_codes, render_mode)
+    chart_options = {"date_range": date_range, "fast": fast_render}
+    chart_key = (selected_coin, view["resolution"], tuple(date_range), fast_render)
 
     # 1. 거래량 변화 시계열 그래프
     st.subheader(f"{selected_coin} 거래량 변화 시계열" if selected_coin != "전체 보기" else "모든 코인의 거래량 변화 시계열")
-    fig_volume = go.Figure()
-
-    if selected_coin == "전체 보기":
-        for coin in data["code"].unique():
-            coin_data = data[data["code"] == coin]
-            fig_volume.add_trace(go.Scatter(
-                x=coin_data["date"],
-                y=coin_data["volume"],
-                mode='lines',
-                name=coin
-            ))
-    else:
-        coin_data = data[data["code"] == selected_coin]
-        fig_volume.add_trace(go.Scatter(
-            x=coin_data["date"],
-            y=coin_data["volume"],
-            mode='lines',
-            name=selected_coin
-        ))
-
-    fig_volume.update_layout(
-        title="거래량 변화 시계열",
-        xaxis_title="시간",
-        yaxis_title="거래량",
-        height=500,
-    )
-    st.plotly_chart(fig_volume, use_container_width=True)
+    fig_volume = cached_figure(data_version, ("volume",) + chart_key, lambda: build_line_chart(
+        period_index, selected_codes, "volume", "거래량 변화 시계열", "시간", "거래량", **chart_options
+    ))
+    show_figure(fig_volume)
 
     # 2. 누적 거래량 시각화
     st.subheader(f"{selected_coin} 누적 거래량 시각화" if selected_coin != "전체 보기" else "모든 코인의 누적 거래량 시각화")
-    fig_cumulative = go.Figure()
-
-    if selected_coin == "전체 보기":
-        for coin in data["code"].unique():
-            coin_data = data[data["code"] == coin]
-            fig_cumulative.add_trace(go.Scatter(
-                x=coin_data["date"],
-                y=coin_data["cumulative_volume"],
-                mode='lines',
-                name=coin
-            ))
-    else:
-        coin_data = data[data["code"] == selected_coin]
-        fig_cumulative.add_trace(go.Scatter(
-            x=coin_data["date"],
-            y=coin_data["cumulative_volume"],
-            mode='lines',
-            name=selected_coin
-        ))
-
-    fig_cumulative.update_layout(
-        title="누적 거래량 시각화",
-        xaxis_title="시간",
-        yaxis_title="누적 거래량",
-        height=500,
-    )
-    st.plotly_chart(fig_cumulative, use_container_width=True)
+    fig_cumulative = cached_figure(data_version, ("cumulative_volume",) + chart_key, lambda: build_line_chart(
+        period_index, selected_codes, "cumulative_volume", "누적 거래량 시각화", "시간", "누적 거래량", **chart_options
+    ))
+    show_figure(fig_cumulative)
 
     # 3. 일일 변동률 분석
     st.subheader(f"{selected_coin} 일일 가격 변동률 분석" if selected_coin != "전체 보기" else "모든 코인의 일일 가격 변동률 분석")
-    fig_change_rate = go.Figure()
-
-    if selected_coin == "전체 보기":
-        for coin in data["code"].unique():
-            coin_data = data[data["code"] == coin]
-            fig_change_rate.add_trace(go.Scatter(
-                x=coin_data["date"],
-                y=coin_data["change_rate"],
-                mode='lines',
-                name=f"{coin} 변동률"
-            ))
-    else:
-        coin_data = data[data["code"] == selected_coin]
-        fig_change_rate.add_trace(go.Scatter(
-            x=coin_data["date"],
-            y=coin_data["change_rate"],
-            mode='lines',
-            name=f"{selected_coin} 변동률"
-        ))
-
-    fig_change_rate.update_layout(
-        title="일일 가격 변동률",
-        xaxis_title="날짜",
-        yaxis_title="변동률 (%)",
-        height=500,
-    )
-    st.plotly_chart(fig_change_rate, use_container_width=True)
-
-    # 4. 코인별 상관관계 히트맵
-    st.subheader("코인별 가격 상관관계 히트맵")
-
-    # 데이터 피벗: 날짜별로 코인 가격을 열로 만듭니다.
-    pivot_data = data.pivot(index="date", columns="code", values="closing_price")
-
-    # 상관관계 계산
-    correlation_matrix = pivot_data.corr()
-
-    # 히트맵 시각화 (상관계수 수치 추가)
-    fig_correlation = go.Figure(data=go.Heatmap(
-        z=correlation_matrix.values,
-        x=correlation_matrix.columns,
-        y=correlation_matrix.columns,
-        text=correlation_matrix.round(2).values,  # 상관계수 값을 텍스트로 표시
-        texttemplate="%{text}",  # 텍스트 포맷 설정
-        colorscale="Viridis",
-        colorbar_title="상관계수"
+    fig_change_rate = cached_figure(data_version, ("change_rate",) + chart_key, lambda: build_line_chart(
+        period_index, selected_codes, "change_rate", "일일 가격 변동률", "날짜", "변동률 (%)", name_suffix=" 변동률", **chart_options
     ))
-
-    fig_correlation.update_layout(
-        title="코인별 가격 상관관계",
-        xaxis_title="코인",
-        yaxis_title="코인",
-        height=600,
-    )
-
-    st.plotly_chart(fig_correlation, use_container_width=True)
-
-    # 5. 이동평균선 시각화
-    if selected_coin != "전체 보기":
-        st.subheader(f"{selected_coin} 이동평균선 시각화 (5일 vs 0일)")
-        coin_data = data[data["code"] == selected_coin].sort_values("date")
-        coin_data["short_ma"] = coin_data["closing_price"].rolling(window=5).mean()
-        coin_data["long_ma"] = coin_data["closing_price"].rolling(window=10).mean()
+    show_figure(fig_change_rate)
+
+# 선택한 코인과 다른 코인의 롤링 상관관계
+@fragment(run_every=VERSION_CHECK_SECONDS)
+def rolling_correlation_section(selected_coin):
+    data_version, index = load_index()
+    correlation_engine = get_correlation_engine()
+    rolling_label = st.radio("롤링 상관관계 기간", [label for label, days in CORRELATION_WINDOWS.items() if days], index=1, horizontal=True)
+    rolling_window = CORRELATION_WINDOWS[rolling_label]
+
+    # 롤링 상관계수 계산 + 그림 (데이터가 부족하면 트레이스 없는 그림)
+    def build_rolling_figure():
+        rolling_corr = correlation_engine.rolling(data_version, index, selected_coin, rolling_window)
+        fig_rolling = go.Figure()
+        for code in rolling_corr.columns:
+            fig_rolling.add_trace(go.Scatter(
+                x=rolling_corr.index,
+                y=rolling_corr[code],
+                mode="lines",
+                name=code
+            ))
+        fig_rolling.update_layout(
+            title="롤링 상관계수",
+            xaxis_title="날짜",
+            yaxis_title="상관계수",
+            yaxis_range=[-1, 1],
+            height=500,
+        )
+        return fig_rolling
+
+    fig_rolling = cached_figure(data_version, ("rolling", selected_coin, rolling_window), build_rolling_figure)
+    if fig_rolling.traces:
+        st.subheader(f"{selected_coin} 롤링 상관관계 ({rolling_window}일)")
+        show_figure(fig_rolling)
+
+# 4. 이동평균선 / 보조 지표 시각화 (지표 엔진 캐시에서 조회)
+@fragment(run_every=VERSION_CHECK_SECONDS)
+def indicator_section(selected_coin, date_range, follow_latest, render_mode):
+    view = load_view(date_range, follow_latest)
+    data_version, index, date_range = view["version"], view["index"], view["date_range"]
+    fast_render = use_fast_render(view, [selected_coin], render_mode)
+
+    ma_col, short_col, long_col, extra_col = st.columns(4)
+    ma_type = ma_col.radio("이동평균 종류", ["sma", "ema"], format_func=INDICATORS.get, horizontal=True)
+    short_window = short_col.number_input("단기 기간 (일)", min_value=2, max_value=200, value=5)
+    long_window = long_col.number_input("장기 기간 (일)", min_value=2, max_value=400, value=20)
+    extra_window = extra_col.number_input("보조 지표 기간 (일)", min_value=2, max_value=200, value=14)
+    overlays = st.multiselect("보조 지표", ["bollinger", "vwap", "rsi"], format_func=INDICATORS.get)
+
+    indicator_engine = get_indicator_engine()
+    ma_name = "단순" if ma_type == "sma" else "지수"
+    st.subheader(f"{selected_coin} 이동평균선 시각화 ({short_window}일 vs {long_window}일)")
+    max_points = CHART_WIDTH_PX if fast_render else None
+    scatter = go.Scattergl if fast_render else go.Scatter
+    ma_key = (selected_coin, ma_type, short_window, long_window, extra_window, tuple(overlays), tuple(date_range), fast_render)
+
+    # 종가 + 이동평균선 + 가격 위 보조 지표 그림
+    def build_ma_figure():
+        coin_data = index.get(selected_coin)[["date", "closing_price"]].copy()
+        coin_data["short_ma"] = indicator_engine.get(data_version, index, selected_coin, ma_type, short_window)[ma_type]
+        coin_data["long_ma"] = indicator_engine.get(data_version, index, selected_coin, ma_type, long_window)[ma_type]
 
         fig_ma = go.Figure()
 
         # 원래 종가
-        fig_ma.add_trace(go.Scatter(
-            x=coin_data["date"],
-            y=coin_data["closing_price"],
+        x, y = trace_points(coin_data, "closing_price", date_range, max_points)
+        fig_ma.add_trace(scatter(
+            x=x,
+            y=y,
             mode="lines",
             name="종가",
             line=dict(color="blue")
         ))
 
         # 단기 이동평균선
-        fig_ma.add_trace(go.Scatter(
-            x=coin_data["date"],
-            y=coin_data["short_ma"],
+        x, y = trace_points(coin_data, "short_ma", date_range, max_points)
+        fig_ma.add_trace(scatter(
+            x=x,
+            y=y,
             mode="lines",
-            name="단기 이동평균선 (5일)",
+            name=f"단기 {ma_name} 이동평균선 ({short_window}일)",
             line=dict(color="green", dash="dot")
         ))
 
         # 장기 이동평균선
-        fig_ma.add_trace(go.Scatter(
-            x=coin_data["date"],
-            y=coin_data["long_ma"],
+        x, y = trace_points(coin_data, "long_ma", date_range, max_points)
+        fig_ma.add_trace(scatter(
+            x=x,
+            y=y,
             mode="lines",
-            name="장기 이동평균선 (20일)",
+            name=f"장기 {ma_name} 이동평균선 ({long_window}일)",
             line=dict(color="red", dash="dash")
         ))
 
+        # 볼린저 밴드 / VWAP (가격 차트 위에 겹쳐 그림)
+        overlay_lines = []
+        if "bollinger" in overlays:
+            overlay_lines += [
+                ("bollinger", "bb_upper", f"볼린저 상단 ({extra_window}일, {BOLLINGER_K}σ)", "gray"),
+                ("bollinger", "bb_lower", f"볼린저 하단 ({extra_window}일, {BOLLINGER_K}σ)", "gray"),
+            ]
+        if "vwap" in overlays:
+            overlay_lines.append(("vwap", "vwap", f"VWAP ({extra_window}일)", "orange"))
+        for indicator, column, label, color in overlay_lines:
+            coin_data[column] = indicator_engine.get(data_version, index, selected_coin, indicator, extra_window)[column]
+            x, y = trace_points(coin_data, column, date_range, max_points)
+            fig_ma.add_trace(scatter(
+                x=x,
+                y=y,
+                mode="lines",
+                name=label,
+                line=dict(color=color, width=1)
+            ))
+
         fig_ma.update_layout(
             title="이동평균선",
             xaxis_title="날짜",
             yaxis_title="가격",
             height=500,
         )
+        return fig_ma
+
+    fig_ma = cached_figure(data_version, ("ma",) + ma_key, build_ma_figure)
+    show_figure(fig_ma)
+
+    # RSI (별도 차트)
+    if "rsi" in overlays:
+        def build_rsi_figure():
+            coin_data = index.get(selected_coin)[["date"]].copy()
+            coin_data["rsi"] = indicator_engine.get(data_version, index, selected_coin, "rsi", extra_window)["rsi"]
+            x, y = trace_points(coin_data, "rsi", date_range, max_points)
+            fig_rsi = go.Figure(scatter(x=x, y=y, mode="lines", name=f"RSI ({extra_window}일)"))
+            fig_rsi.add_hline(y=70, line_dash="dot", line_color="red")
+            fig_rsi.add_hline(y=30, line_dash="dot", line_color="blue")
+            fig_rsi.update_layout(
+                title=f"RSI ({extra_window}일)",
+                xaxis_title="날짜",
+                yaxis_title="RSI",
+                yaxis_range=[0, 100],
+                height=300,
+            )
+            return fig_rsi
+
+        fig_rsi = cached_figure(
+            data_version, ("rsi", selected_coin, extra_window, tuple(date_range), fast_render), build_rsi_figure
+        )
+        show_figure(fig_rsi)
+
+# 데이터 요약 (DB에서 보이는 페이지만 조회해서 표시)
+@fragment(run_every=VERSION_CHECK_SECONDS)
+def table_section(selected_coin, date_range, follow_latest):
+    view = load_view(date_range, follow_latest)
+    date_range, offline = view["date_range"], view["offline"]
+    st.subheader("전체 데이터 요약" if selected_coin == "전체 보기" else f"{selected_coin} 데이터 요약")
+    sort_col, order_col = st.columns(2)
+    table_sort = sort_col.selectbox("정렬 기준", list(TABLE_SORT_LABELS), format_func=TABLE_SORT_LABELS.get)
+    table_descending = order_col.checkbox("내림차순", value=False)
+
+    # 필터나 정렬이 바뀌면 첫 페이지로
+    table_key = (selected_coin, tuple(date_range), table_sort, table_descending, offline)
+    if st.session_state.get("table_key") != table_key:
+        st.session_state.table_key = table_key
+        st.session_state.table_cursors = [None]  # 각 페이지의 시작 커서 (이전 페이지로 돌아가기용)
+
+    page_options = {
+        "codes": None if selected_coin == "전체 보기" else [selected_coin],
+        "date_range": date_range,
+        "sort": table_sort,
+        "descending": table_descending,
+        "after": st.session_state.table_cursors[-1],
+    }
+    # 같은 데이터 버전의 같은 페이지는 다시 조회하지 않음 (주기적으로 다시 실행될 때)
+    page_key = (view["version"], table_key, page_options["after"])
+    cached = st.session_state.get("table_page")
+    if cached is not None and cached[0] == page_key:
+        _, page, next_cursor = cached
+    else:
+        if offline:
+            page, next_cursor = frame_page(view["index"].frame, **page_options)
+        else:
+            page, next_cursor = fetch_page(get_query_runner(), TABLE_NAME, **page_options)
+        st.session_state.table_page = (page_key, page, next_cursor)
+    st.dataframe(page, use_container_width=True, hide_index=True)
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    prev_col.button(
+        "이전 페이지",
+        disabled=len(st.session_state.table_cursors) <= 1,
+        on_click=lambda: st.session_state.table_cursors.pop(),
+    )
+    page_col.write(f"{len(st.session_state.table_cursors)} 페이지 (페이지당 {PAGE_SIZE}행)")
+    next_col.button(
+        "다음 페이지",
+        disabled=next_cursor is None,
+        on_click=lambda: st.session_state.table_cursors.append(next_cursor),
+    )
+
+# 5. 코인별 상관관계 히트맵 (일간 수익률 기준, 데이터 버전마다 증분 갱신, 코인 선택과 무관)
+@fragment(run_every=VERSION_CHECK_SECONDS)
+def correlation_section():
+    data_version, index = load_index()
+    st.subheader("코인별 수익률 상관관계 히트맵")
+    correlation_engine = get_correlation_engine()
+    window_label = st.radio("상관관계 기간", list(CORRELATION_WINDOWS), index=1, horizontal=True)
+    correlation_window = CORRELATION_WINDOWS[window_label]
+
+    # 상관관계 계산 + 히트맵 그림
+    def build_correlation_figure():
+        correlation_matrix = correlation_engine.matrix(data_version, index, correlation_window)
+
+        # 히트맵 시각화 (상관계수 수치 추가)
+        fig_correlation = go.Figure(data=go.Heatmap(
+            z=correlation_matrix.values,
+            x=correlation_matrix.columns,
+            y=correlation_matrix.columns,
+            text=correlation_matrix.round(2).values,  # 상관계수 값을 텍스트로 표시
+            texttemplate="%{text}",  # 텍스트 포맷 설정
+            colorscale="Viridis",
+            colorbar_title="상관계수"
+        ))
+
+        fig_correlation.update_layout(
+            title=f"코인별 일간 수익률 상관관계 ({window_label})",
+            xaxis_title="코인",
+            yaxis_title="코인",
+            height=600,
+        )
+        return fig_correlation
 
-        st.plotly_chart(fig_ma, use_container_width=True)
+    fig_correlation = cached_figure(data_version, ("correlation", window_label), build_correlation_figure)
+    show_figure(fig_correlation)
 
-    # 데이터 요약
-    if selected_coin == "전체 보기":
-        st.subheader("전체 데이터 요약")
-        st.dataframe(data)
+# Streamlit 앱 시작
+st.set_page_config(layout="wide")  # 넓은 레이아웃 설정
+st.title("실시간 코인 비교 시각화 (모든 데이터)")
+
+# 데이터 가져오기
+data_version, data = fetch_data_from_db()
+offline = get_data_store().offline
+show_db_stats()
+show_metrics_panel()
+if offline:
+    st.warning("DB에 연결할 수 없어 로컬 스냅샷 데이터로 표시합니다 (읽기 전용, 최근 데이터가 빠져 있을 수 있음).")
+
+if data.empty:
+    st.warning("데이터가 없습니다. 데이터를 수집 중인지 확인해주세요.")
+else:
+    # 데이터 처리 (데이터 버전마다 한 번만 코인별 인덱스 생성)
+    index = get_coin_index(data_version, data)
+
+    # 표시 기간 (기간을 좁히면 다운샘플링 없이 원본 해상도로 표시)
+    # 슬라이더는 DB 전체 기간을 보여주고, 기본값은 메모리에 들고 있는 최근 일봉 구간
+    loaded_start = index.frame["date"].min().date()
+    history_start, history_end = (None, None) if offline else get_history_bounds(data_version)
+    min_date = min(history_start or loaded_start, loaded_start)
+    max_date = max(history_end or loaded_start, index.frame["date"].max().date())
+    if min_date < max_date:
+        date_range = st.sidebar.slider("표시 기간", min_value=min_date, max_value=max_date, value=(loaded_start, max_date))
     else:
-        st.subheader(f"{selected_coin} 데이터 요약")
-        recent_data = data[data["code"] == selected_coin]
-        st.dataframe(recent_data)
-
-    # 새로고침 시간 확인 및 자동 새로고침
-    time_diff = (datetime.now() - st.session_state.last_update).total_seconds()
-    if time_diff > refresh_interval:
-        st.session_state.last_update = datetime.now()
-        st.experimental_rerun()
+        date_range = (min_date, max_date)
+    # 최신 날짜까지 보고 있으면 구역이 다시 실행될 때 새로 들어온 날짜까지 늘려서 보여줌
+    follow_latest = date_range[1] >= max_date
+
+    resolution = "day" if offline else choose_resolution(*date_range)
+    st.sidebar.caption(f"기간 차트 해상도: {RESOLUTION_LABELS[resolution]}")
+
+    # 렌더링 방식: 자동이면 표시할 점 수가 많을 때만 WebGL + 다운샘플링 사용
+    render_mode = st.sidebar.radio("차트 렌더링", ["자동", "원본 (SVG)", "고속 (WebGL)"])
+
+    # 선택 가능한 코인 필터링 추가
+    selected_coin = st.selectbox("시각화할 코인을 선택하세요:", options=["전체 보기"] + index.codes)
+
+    # 1~5. 구역마다 따로 다시 실행됨 (새 데이터도 구역별로 반영)
+    coin_section(selected_coin, date_range, follow_latest, render_mode)
+    if selected_coin != "전체 보기":
+        rolling_correlation_section(selected_coin)
+        indicator_section(selected_coin, date_range, follow_latest, render_mode)
+    table_section(selected_coin, date_range, follow_latest)
+    correlation_section()
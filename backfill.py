@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from db_writer import candle_to_row
+
+# [설정]
+BACKFILL_SINCE = "2017-10-01"  # 데이터가 하나도 없는 마켓은 이 날짜부터 채움 (업비트 원화 마켓 시작 시점)
+PAGE_SIZE = 200                # 업비트 캔들 API 한 번에 받을 수 있는 최대 개수
+
+
+# 'YYYY-MM-DD' 문자열 또는 date/datetime을 date로 변환
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+# 한 마켓에서 [since, until] 기간 중 upbit_data에 없는 날짜 목록 (오름차순)
+def find_missing_dates(connection, table, market, since, until):
+    since, until = to_date(since), to_date(until)
+    if since > until:
+        return []
+    cursor = connection.cursor()
+    cursor.execute(
+        f"SELECT date FROM {table} WHERE code = %s AND date BETWEEN %s AND %s",
+        (market, since, until),
+    )
+    existing = {to_date(row[0]) for row in cursor.fetchall()}
+    cursor.close()
+    days = (until - since).days + 1
+    return [d for d in (since + timedelta(days=i) for i in range(days)) if d not in existing]
+
+
+# 빠진 날짜를 연속 구간 [(시작, 끝), ...]으로 묶기 (출력용)
+def group_ranges(dates):
+    ranges = []
+    for d in dates:
+        if ranges and d - ranges[-1][1] == timedelta(days=1):
+            ranges[-1][1] = d
+        else:
+            ranges.append([d, d])
+    return [tuple(r) for r in ranges]
+
+
+# 빠진 날짜를 count=200 페이지로 최신부터 거꾸로 채움
+# 남은 빈 날짜 중 가장 최근 날짜를 to 커서로 잡아 한 페이지씩 요청하고,
+# 페이지가 200개보다 적게 오면 상장 이전 구간이므로 중단한다.
+def fetch_missing_candles(client, market, missing_dates):
+    remaining = sorted(missing_dates, reverse=True)
+    rows = []
+    requests = 0
+    while remaining:
+        cursor_date = remaining[0] + timedelta(days=1)
+        # to는 배타적 경계이고 일봉은 KST 09:00에 시작하므로 다음 날 09:00(KST)를 커서로 사용
+        to = f"{cursor_date.isoformat()}T09:00:00+09:00"
+        candles = client.fetch_candles(market, count=PAGE_SIZE, to=to)
+        requests += 1
+        if candles is None:
+            print(f"{market}: {remaining[0]} 이전 구간 요청 실패, 중단")
+            break
+        if not candles:
+            break
+        wanted = set(remaining)
+        for candle in candles:
+            if to_date(candle["candle_date_time_kst"]) in wanted:
+                rows.append(candle_to_row(candle, market))
+        oldest = min(to_date(candle["candle_date_time_kst"]) for candle in candles)
+        remaining = [d for d in remaining if d < oldest]
+        if len(candles) < PAGE_SIZE:
+            break
+    return rows, requests
+
+
+# 여러 마켓의 빈 구간을 찾아 동시에 채우고 writer로 묶음 저장
+def run_backfill(client, writer, table, markets, since=BACKFILL_SINCE, until=None, max_concurrency=None):
+    until = to_date(until) if until else (datetime.now() - timedelta(days=1)).date()
+    since = to_date(since)
+
+    gaps = {}
+    for market in markets:
+        missing = find_missing_dates(writer.connection, table, market, since, until)
+        if missing:
+            ranges = group_ranges(missing)
+            print(f"{market}: 빈 날짜 {len(missing)}일 ({len(ranges)}개 구간)")
+            gaps[market] = missing
+        else:
+            print(f"{market}: 빈 날짜 없음")
+
+    if not gaps:
+        print("채울 데이터가 없습니다.")
+        return {}
+
+    workers = max_concurrency or client.max_concurrency
+    summary = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(fetch_missing_candles, client, market, missing): market
+            for market, missing in gaps.items()
+        }
+        for future in as_completed(futures):
+            market = futures[future]
+            rows, requests = future.result()
+            writer.add_rows(rows)
+            summary[market] = {"missing": len(gaps[market]), "fetched": len(rows), "requests": requests}
+            print(f"{market}: {requests}회 요청으로 {len(rows)}일 수집")
+    writer.flush()
+    return summary
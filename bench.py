@@ -0,0 +1,377 @@
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from upbit_api import UpbitClient
+from db_writer import CandleBatchWriter
+from dashboard_data import DATA_COLUMNS, QueryRunner, UpbitDataStore
+from charts import CoinIndex, add_derived_columns, build_line_chart
+from correlation import CorrelationEngine
+from indicators import IndicatorEngine
+from snapshot import ColumnarSnapshot
+
+# [설정]
+DEFAULT_MARKETS = 50
+DEFAULT_DAYS = 730
+DEFAULT_REPEAT = 3
+DEFAULT_OUTPUT = "bench_result.json"
+TABLE_NAME = "upbit_data"
+
+MYSQL_TABLE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    date DATE NOT NULL,
+    code VARCHAR(20) NOT NULL,
+    opening_price DOUBLE NOT NULL,
+    closing_price DOUBLE NOT NULL,
+    high_price DOUBLE NOT NULL,
+    low_price DOUBLE NOT NULL,
+    volume DOUBLE NOT NULL,
+    prev_closing_price DOUBLE NOT NULL,
+    UNIQUE(date, code)
+);
+"""
+
+SQLITE_TABLE_DDL = f"""
+CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    code TEXT NOT NULL,
+    opening_price REAL NOT NULL,
+    closing_price REAL NOT NULL,
+    high_price REAL NOT NULL,
+    low_price REAL NOT NULL,
+    volume REAL NOT NULL,
+    prev_closing_price REAL NOT NULL,
+    UNIQUE(date, code)
+);
+"""
+
+
+# 가짜 일봉 생성: 코인마다 로그 정규 랜덤 워크 (날짜 오름차순)
+# 반환: {마켓: [(date, code, open, close, high, low, volume, prev_close), ...]}
+def generate_history(markets, days, seed=0, end=None):
+    rng = np.random.default_rng(seed)
+    end = end or date.today() - timedelta(days=1)
+    dates = [(end - timedelta(days=days - 1 - i)).isoformat() for i in range(days)]
+    history = {}
+    for n in range(markets):
+        code = f"KRW-C{n:03d}"
+        start_price = float(rng.lognormal(8, 2))
+        close = start_price * np.exp(np.cumsum(rng.normal(0, 0.03, days)))
+        prev_close = np.r_[start_price, close[:-1]]
+        opening = prev_close * (1 + rng.normal(0, 0.005, days))
+        high = np.maximum(opening, close) * (1 + np.abs(rng.normal(0, 0.01, days)))
+        low = np.minimum(opening, close) * (1 - np.abs(rng.normal(0, 0.01, days)))
+        volume = rng.lognormal(10, 1, days)
+        history[code] = [
+            (dates[i], code, float(opening[i]), float(close[i]), float(high[i]), float(low[i]), float(volume[i]), float(prev_close[i]))
+            for i in range(days)
+        ]
+    return history
+
+
+# 일봉 행을 업비트 일봉 응답 형식으로 변환
+def row_to_candle(row):
+    day, code, opening, close, high, low, volume, prev_close = row
+    return {
+        "market": code,
+        "candle_date_time_utc": f"{day}T00:00:00",
+        "candle_date_time_kst": f"{day}T09:00:00",
+        "opening_price": opening,
+        "high_price": high,
+        "low_price": low,
+        "trade_price": close,
+        "prev_closing_price": prev_close,
+        "candle_acc_trade_volume": volume,
+    }
+
+
+# 업비트 일봉 API 스텁 서버 (/v1/candles/days, 최신순으로 count개)
+def start_stub_api(history):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+            rows = history.get(params.get("market", [""])[0])
+            if url.path != "/v1/candles/days" or rows is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            count = int(params.get("count", ["1"])[0])
+            body = json.dumps([row_to_candle(row) for row in reversed(rows[-count:])]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Remaining-Req", "group=candles; min=600; sec=9")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# SQLite를 pymysql처럼 쓰기 위한 얇은 래퍼 (%s 자리표시자, ON DUPLICATE KEY UPDATE id = id)
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    @staticmethod
+    def _translate(query):
+        return query.replace("%s", "?").replace("ON DUPLICATE KEY UPDATE id = id", "ON CONFLICT DO NOTHING")
+
+    def execute(self, query, params=None):
+        self.cursor.execute(self._translate(query), tuple(params or ()))
+        return self.cursor.rowcount
+
+    def executemany(self, query, rows):
+        self.cursor.executemany(self._translate(query), rows)
+        return self.cursor.rowcount
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def close(self):
+        self.cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+    def cursor(self):
+        return SQLiteCursor(self.connection.cursor())
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+
+
+# MySQL 테이블에 행이 있는지 (테이블이 없으면 False)
+def mysql_table_has_rows(cursor):
+    cursor.execute("SHOW TABLES LIKE %s", (TABLE_NAME,))
+    if cursor.fetchone() is None:
+        return False
+    cursor.execute(f"SELECT 1 FROM {TABLE_NAME} LIMIT 1")
+    return cursor.fetchone() is not None
+
+
+# 벤치마크용 DB 준비: MySQL 접속 정보가 있고 연결되면 MySQL, 아니면 임시 SQLite 파일
+# - MySQL 테이블에 이미 행이 있으면 --drop을 줄 때만 지우고 다시 만든다.
+# 반환: (백엔드 이름, 연결 생성 함수)
+def open_backend(args, workdir):
+    if args.mysql_host:
+        try:
+            import pymysql
+            def connect():
+                return pymysql.connect(
+                    host=args.mysql_host, user=args.mysql_user, password=args.mysql_password, database=args.mysql_db
+                )
+            connection = connect()
+            cursor = connection.cursor()
+            if mysql_table_has_rows(cursor) and not args.drop:
+                connection.close()
+                raise SystemExit(
+                    f"{args.mysql_db}.{TABLE_NAME} 테이블에 데이터가 있습니다. 지우고 진행하려면 --drop을 지정하세요."
+                )
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+            cursor.execute(MYSQL_TABLE_DDL)
+            connection.commit()
+            connection.close()
+            return "mysql", connect
+        except Exception as e:
+            print(f"MySQL 연결 실패, SQLite로 진행: {e}")
+
+    path = os.path.join(workdir, "bench.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
+    connection.execute(SQLITE_TABLE_DDL)
+    connection.commit()
+    connection.close()
+    return "sqlite", lambda: SQLiteConnection(path)
+
+
+def empty_table(connect):
+    connection = connect()
+    cursor = connection.cursor()
+    cursor.execute(f"DELETE FROM {TABLE_NAME}")
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+# 단계 하나를 repeat번 실행해서 시간 기록 (마지막 실행 결과 반환)
+def time_stage(results, name, func, repeat):
+    runs, value = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        value = func()
+        runs.append(time.perf_counter() - started)
+    results[name] = {"runs": runs, "min": min(runs), "median": statistics.median(runs)}
+    print(f"{name:<24} 최소 {min(runs) * 1000:9.1f}ms  중앙값 {statistics.median(runs) * 1000:9.1f}ms")
+    return value
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# 수집 단계: 스텁 API에서 마켓별 캔들을 받아 빈 테이블에 묶음 저장
+def bench_ingest(results, history, connect, args):
+    server, base_url = start_stub_api(history)
+    markets = list(history)
+    count = min(args.days, 200)
+    try:
+        with UpbitClient(base_url=base_url, max_concurrency=args.concurrency) as client:
+            fetched = time_stage(results, "ingest_fetch", lambda: client.fetch_all(markets, count=count), args.repeat)
+
+        def insert():
+            empty_table(connect)
+            writer = CandleBatchWriter(connect(), TABLE_NAME, verbose=False, compact=False)
+            with writer:
+                for market, candles in fetched.items():
+                    for candle in candles or []:
+                        writer.add(candle, market)
+            return writer.total_written
+
+        written = time_stage(results, "ingest_insert", insert, args.repeat)
+        results["ingest_insert"]["rows"] = written
+    finally:
+        server.shutdown()
+
+
+# 대시보드 단계: 조회, 프레임 생성, 파생 컬럼, 코인별 분할, 상관관계, 지표, 그림 생성/직렬화
+def bench_dashboard(results, history, connect, args, workdir):
+    empty_table(connect)
+    writer = CandleBatchWriter(connect(), TABLE_NAME, chunk_size=5000, verbose=False, compact=False)
+    with writer:
+        for rows in history.values():
+            writer.add_rows(rows)
+
+    runner = QueryRunner(connect)
+    start_date = "2000-01-01"
+    query = f"SELECT id, {', '.join(DATA_COLUMNS)} FROM {TABLE_NAME} WHERE id > %s AND date >= %s ORDER BY id ASC"
+    rows = time_stage(results, "query", lambda: runner.fetchall(query, (0, start_date)), args.repeat)
+
+    def build_frame():
+        frame = pd.DataFrame(rows, columns=["id"] + DATA_COLUMNS).drop(columns="id")
+        frame["date"] = pd.to_datetime(frame["date"])
+        return frame.sort_values(["code", "date"], kind="stable", ignore_index=True)
+
+    frame = time_stage(results, "dataframe_build", build_frame, args.repeat)
+    time_stage(results, "derived_metrics_pandas", lambda: add_derived_columns(frame.copy()), args.repeat)
+
+    def store_load():
+        store = UpbitDataStore(runner, TABLE_NAME, start_date=start_date, compact=False)
+        store.refresh()
+        return store.frame
+
+    data = time_stage(results, "store_load_sql_derived", store_load, args.repeat)
+    index = time_stage(results, "per_coin_split", lambda: CoinIndex(data), args.repeat)
+
+    def correlation():
+        engine = CorrelationEngine()
+        return engine.matrix(1, index), engine.matrix(1, index, 30)
+
+    time_stage(results, "correlation", correlation, args.repeat)
+
+    def indicators():
+        engine = IndicatorEngine()
+        for code in index.codes:
+            engine.get(1, index, code, "sma", 20)
+            engine.get(1, index, code, "rsi", 14)
+
+    time_stage(results, "indicators", indicators, args.repeat)
+
+    codes = index.codes
+    fig = time_stage(results, "figure_build_svg", lambda: build_line_chart(index, codes, "volume", "", "", ""), args.repeat)
+    time_stage(results, "figure_serialize_svg", fig.to_json, args.repeat)
+    fig = time_stage(results, "figure_build_webgl",
+                     lambda: build_line_chart(index, codes, "volume", "", "", "", fast=True), args.repeat)
+    time_stage(results, "figure_serialize_webgl", fig.to_json, args.repeat)
+
+    snapshot_dir = os.path.join(workdir, "snapshot")
+
+    def snapshot_sync():
+        snapshot = ColumnarSnapshot(snapshot_dir, TABLE_NAME)
+        connection = connect()
+        try:
+            return snapshot.sync(connection, compact=False)
+        finally:
+            connection.close()
+
+    # 처음 한 번은 전체를 쓰고 이후에는 새 행이 없으므로 첫 실행 시간만 의미가 있다
+    time_stage(results, "snapshot_sync", snapshot_sync, 1)
+    time_stage(results, "snapshot_load", lambda: ColumnarSnapshot(snapshot_dir, TABLE_NAME).load(start_date), args.repeat)
+
+
+# 명령행 옵션
+def parse_args():
+    parser = argparse.ArgumentParser(description="가짜 일봉 데이터로 수집기/대시보드 단계별 시간 측정")
+    parser.add_argument("--markets", type=int, default=DEFAULT_MARKETS, help="마켓 수")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="마켓당 일봉 수")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="단계별 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=8, help="스텁 API 동시 요청 수")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="결과 JSON 파일")
+    parser.add_argument("--mysql-host", help=f"지정하면 로컬 MySQL의 {TABLE_NAME} 테이블 사용 (비어 있어야 함)")
+    parser.add_argument("--mysql-user", default="root")
+    parser.add_argument("--mysql-password", default="")
+    parser.add_argument("--mysql-db", default="upbit_bench")
+    parser.add_argument("--drop", action="store_true", help=f"MySQL {TABLE_NAME} 테이블에 데이터가 있어도 지우고 다시 만듦")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    history = generate_history(args.markets, args.days, args.seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        backend, connect = open_backend(args, workdir)
+        print(f"벤치마크: {args.markets}개 마켓 x {args.days}일 ({backend})")
+        bench_ingest(results, history, connect, args)
+        bench_dashboard(results, history, connect, args, workdir)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "backend": backend,
+        "params": {"markets": args.markets, "days": args.days, "repeat": args.repeat, "seed": args.seed},
+        "stages": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main()
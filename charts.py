@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# [설정]
+CHART_WIDTH_PX = 1200    # 차트 가로 픽셀 수 (다운샘플링 기준: 트레이스당 최대 점 수)
+
+
+# 파생 컬럼 계산 (변동률, 전일 대비 가격 변화, 코인별 누적 거래량)
+# DB 조회 결과에는 이미 들어 있으므로 파생 컬럼 없이 들어온 데이터에만 사용한다.
+# frame은 코인, 날짜 순으로 정렬되어 있어야 한다.
+def add_derived_columns(frame):
+    frame["change_rate"] = ((frame["closing_price"] - frame["opening_price"]) / frame["opening_price"]) * 100
+    frame["price_change"] = frame["closing_price"] - frame["prev_closing_price"]
+    frame["cumulative_volume"] = frame.groupby("code", sort=False)["volume"].cumsum()  # 누적 거래량 계산
+    return frame
+
+
+# 코인별 인덱스: 데이터 버전마다 한 번만 코인, 날짜 순으로 정렬해 두고
+# 코인별 구간(시작, 끝 위치)을 기억해서 코인 데이터를 O(1) 슬라이스로 꺼낸다.
+# (차트마다 data[data["code"] == coin]으로 전체를 다시 훑지 않기 위함)
+class CoinIndex:
+    def __init__(self, data):
+        # 코인 목록은 기존처럼 처음 등장한 순서를 유지
+        self.codes = list(pd.unique(data["code"]))
+        frame = data.sort_values(["code", "date"], kind="stable", ignore_index=True)
+        # 파생 컬럼은 DB에서 계산되어 오므로 없을 때만 직접 계산
+        if "cumulative_volume" not in frame.columns:
+            frame = add_derived_columns(frame)
+        self.frame = frame
+
+        codes = self.frame["code"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+        ends = np.r_[starts[1:], len(codes)]
+        self.slices = {codes[s]: slice(s, e) for s, e in zip(starts, ends)}
+
+    def __len__(self):
+        return len(self.frame)
+
+    # 한 코인의 데이터 (날짜 순, 읽기 전용으로 사용)
+    def get(self, code):
+        part = self.slices.get(code)
+        if part is None:
+            return self.frame.iloc[0:0]
+        return self.frame.iloc[part]
+
+    # (코인, 데이터) 순회
+    def items(self, codes=None):
+        for code in codes if codes is not None else self.codes:
+            yield code, self.get(code)
+
+
+# LTTB(Largest-Triangle-Three-Buckets) 다운샘플링: 모양을 유지하면서 threshold개 점의 위치를 고름
+def lttb_indices(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # 직전 선택 점, 다음 구간 평균 점과 만드는 삼각형 넓이가 가장 큰 점 선택
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+# 날짜 범위 안의 행만 잘라냄 (데이터가 날짜 순이므로 이진 탐색)
+def slice_date_range(coin_data, date_range):
+    if date_range is None:
+        return coin_data
+    dates = coin_data["date"].to_numpy()
+    start = np.searchsorted(dates, np.datetime64(pd.Timestamp(date_range[0])), side="left")
+    end = np.searchsorted(dates, np.datetime64(pd.Timestamp(date_range[1])), side="right")
+    return coin_data.iloc[start:end]
+
+
+# 트레이스 하나의 (x, y): 표시 기간으로 자르고, max_points보다 많으면 LTTB로 줄임
+# 기간을 좁히면 점 수가 max_points 아래로 내려가 원본 해상도로 그려진다.
+def trace_points(coin_data, column, date_range=None, max_points=None):
+    coin_data = slice_date_range(coin_data, date_range)
+    x = coin_data["date"].to_numpy()
+    y = coin_data[column].to_numpy()
+    if max_points and len(x) > max_points:
+        keep = lttb_indices(x.astype("datetime64[ns]").astype(np.int64), y, max_points)
+        x, y = x[keep], y[keep]
+    return x, y
+
+
+# 코인별 선 그래프 (거래량, 누적 거래량, 변동률 차트 공용)
+# fast=True면 WebGL(Scattergl)로 그리고 트레이스마다 max_points개 이하로 다운샘플링
+def build_line_chart(index, codes, column, title, xaxis_title, yaxis_title, name_suffix="", height=500,
+                     date_range=None, fast=False, max_points=CHART_WIDTH_PX):
+    scatter = go.Scattergl if fast else go.Scatter
+    fig = go.Figure()
+    for code, coin_data in index.items(codes):
+        x, y = trace_points(coin_data, column, date_range, max_points if fast else None)
+        fig.add_trace(scatter(
+            x=x,
+            y=y,
+            mode='lines',
+            name=f"{code}{name_suffix}"
+        ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title=yaxis_title,
+        height=height,
+    )
+    return fig
@@ -0,0 +1,117 @@
+from datetime import date
+
+# [설정]
+MARKET_TABLE = "upbit_markets"      # 마켓 코드 사전 테이블
+COMPACT_SUFFIX = "_compact"         # 압축 스키마 본 테이블 접미사 (예: upbit_data_compact)
+FIRST_PARTITION_YEAR = 2017         # 연도 파티션을 만들 첫 해 (업비트 원화 마켓 시작)
+
+TABLE_TYPE_QUERY = "SELECT TABLE_TYPE FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+
+COMPACT_COLUMNS = [
+    "id", "code_id", "date", "opening_price", "closing_price",
+    "high_price", "low_price", "volume", "prev_closing_price",
+]
+
+
+# 압축 스키마 본 테이블 이름
+def compact_table_name(table):
+    return f"{table}{COMPACT_SUFFIX}"
+
+
+# 연도별 RANGE 파티션 정의 (FIRST_PARTITION_YEAR ~ 내년, 나머지는 pmax)
+def year_partitions(last_year=None):
+    last_year = last_year or date.today().year + 1
+    parts = [f"PARTITION p{year} VALUES LESS THAN ({year + 1})" for year in range(FIRST_PARTITION_YEAR, last_year + 1)]
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return "PARTITION BY RANGE (YEAR(date)) (\n    " + ",\n    ".join(parts) + "\n)"
+
+
+# 마켓 사전 테이블과 압축 본 테이블 생성
+# - code는 사전 테이블에 한 번만 저장하고 행에는 2바이트 code_id만 저장한다.
+# - 기본 키(code_id, date)가 InnoDB 클러스터 인덱스이므로 코인별 기간 조회가 연속 구간 읽기가 된다.
+# - id는 기존 증분 조회(MAX(id), id > last_id)를 위해 보조 인덱스로 유지한다.
+def create_compact_tables(connection, table, partition_by_year=False):
+    cursor = connection.cursor()
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {MARKET_TABLE} (
+        code_id SMALLINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+        code VARCHAR(20) NOT NULL,               -- 마켓 코드 (예: KRW-BTC)
+        UNIQUE(code)
+    );
+    """)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {compact_table_name(table)} (
+        id INT NOT NULL AUTO_INCREMENT,
+        code_id SMALLINT UNSIGNED NOT NULL,      -- {MARKET_TABLE}.code_id
+        date DATE NOT NULL,
+        opening_price DOUBLE NOT NULL,           -- 시가
+        closing_price DOUBLE NOT NULL,           -- 종가
+        high_price DOUBLE NOT NULL,              -- 고가
+        low_price DOUBLE NOT NULL,               -- 저가
+        volume DOUBLE NOT NULL,                  -- 거래량
+        prev_closing_price DOUBLE NOT NULL,      -- 전일 종가
+        PRIMARY KEY (code_id, date),
+        KEY (id)
+    )
+    {year_partitions() if partition_by_year else ""};
+    """)
+    connection.commit()
+    cursor.close()
+
+
+# 기존 컬럼 그대로 읽을 수 있는 뷰 (id, date, code, ...)
+# 읽는 쪽(대시보드, 백필, 집계)은 테이블 이름만 보고 그대로 동작한다.
+# id로 확인하는 증분 조회는 뷰 대신 compact_source()로 본 테이블의 id 인덱스를 직접 읽는다.
+def create_compat_view(connection, table):
+    cursor = connection.cursor()
+    cursor.execute(f"""
+    CREATE OR REPLACE VIEW {table} AS
+    SELECT d.id, d.date, m.code, d.opening_price, d.closing_price, d.high_price,
+           d.low_price, d.volume, d.prev_closing_price
+    FROM {compact_table_name(table)} d
+    JOIN {MARKET_TABLE} m ON m.code_id = d.code_id;
+    """)
+    connection.commit()
+    cursor.close()
+
+
+# 증분 조회용 FROM 절: 본 테이블(별칭 d)에 코드만 사전에서 붙임 (d.id, d.date로 조건을 건다)
+def compact_source(table):
+    return f"{compact_table_name(table)} d JOIN {MARKET_TABLE} m ON m.code_id = d.code_id"
+
+
+# table이 압축 스키마로 옮겨진 뒤의 호환 뷰인지
+def is_compact(connection, table):
+    cursor = connection.cursor()
+    cursor.execute(TABLE_TYPE_QUERY, (table,))
+    row = cursor.fetchone()
+    cursor.close()
+    return row is not None and row[0] == "VIEW"
+
+
+# 마켓 코드 -> code_id 사전 (처음 보는 코드는 사전 테이블에 추가)
+class MarketDictionary:
+    def __init__(self, connection):
+        self.connection = connection
+        self.ids = {}
+
+    def load(self):
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT code, code_id FROM {MARKET_TABLE}")
+        self.ids = dict(cursor.fetchall())
+        cursor.close()
+        return self
+
+    # 코드 목록의 code_id를 모두 확보 (없는 코드만 INSERT IGNORE 후 다시 읽음)
+    def ensure(self, codes):
+        missing = sorted(set(codes) - set(self.ids))
+        if missing:
+            cursor = self.connection.cursor()
+            cursor.executemany(f"INSERT IGNORE INTO {MARKET_TABLE} (code) VALUES (%s)", [(code,) for code in missing])
+            self.connection.commit()
+            cursor.close()
+            self.load()
+        return self.ids
+
+    def get(self, code):
+        return self.ensure([code])[code]
@@ -0,0 +1,153 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# [설정]
+CORRELATION_WINDOWS = {"7일": 7, "30일": 30, "90일": 90, "전체": None}
+
+
+# 수익률 행렬 X(날짜 x 코인, 결측은 NaN)에서 코인 쌍별 합계를 한 번의 행렬 곱으로 계산
+# 두 코인 모두 값이 있는 날짜만 사용한다 (pairwise complete).
+# 반환: (n, sx, sxx, sxy)  각각 코인 x 코인 행렬, sx[i, j]는 i, j가 모두 있는 날의 x_i 합
+def pair_sums(returns):
+    present = ~np.isnan(returns)
+    values = np.where(present, returns, 0.0)
+    mask = present.astype(np.float64)
+    n = mask.T @ mask
+    sx = values.T @ mask
+    sxx = (values * values).T @ mask
+    sxy = values.T @ values
+    return n, sx, sxx, sxy
+
+
+# 쌍별 합계로 피어슨 상관계수 행렬 계산
+def correlation_from_sums(n, sx, sxx, sxy):
+    sy, syy = sx.T, sxx.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        corr = cov / np.sqrt(var)
+    corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+# 코인별 인덱스의 종가를 날짜 x 코인 행렬로
+def price_pivot(index):
+    return index.frame.pivot(index="date", columns="code", values="closing_price")
+
+
+# 종가 행렬(날짜 x 코인)에서 일간 수익률 행렬 (첫 날짜는 수익률이 없어 빠짐)
+def daily_returns(prices):
+    if len(prices) > 1:
+        return prices[1:] / prices[:-1] - 1
+    return np.empty((0, prices.shape[1]))
+
+
+# 코인 간 수익률 상관관계 엔진
+# - 7/30/90일 창은 마지막 N일 수익률만으로 계산하므로 전체 기간 길이와 무관하다.
+# - 전체 기간은 쌍별 누적 합계를 들고 있다가 새 날짜가 들어오면 그 행만 더한다.
+# - 결과 행렬은 데이터 버전별로 캐시한다.
+# - 세션마다 보고 있는 데이터 버전이 다를 수 있으므로 호출마다 (버전, 인덱스)를 받는다.
+#   엔진 상태는 더 새 버전으로만 바뀌고, 이전 버전 세션은 자기 인덱스로 따로 계산한다 (캐시 안 함).
+# 과거 날짜가 중간에 채워지거나(백필) 코인 목록이 바뀌면 처음부터 다시 계산한다.
+class CorrelationEngine:
+    def __init__(self):
+        self.version = None
+        self.dates = pd.DatetimeIndex([])
+        self.codes = []
+        self.prices = np.empty((0, 0))
+        self.returns = np.empty((0, 0))
+        self.total_sums = None
+        self._matrices = {}   # (버전, 기간) -> 상관계수 표
+        self._lock = threading.Lock()
+
+    # 새 버전의 코인별 인덱스를 반영 (같거나 이전 버전이면 그대로)
+    def update(self, version, index):
+        with self._lock:
+            self._advance(version, index)
+
+    def _advance(self, version, index):
+        if self.version is not None and version <= self.version:
+            return
+        self._apply(price_pivot(index))
+        self.version = version
+        self._matrices = {}
+
+    # 호출한 세션의 버전에 맞는 (코인 목록, 날짜, 수익률, 전체 기간 합계)
+    # 엔진 상태는 update()로 바뀔 수 있으므로 잠금 안에서 함께 꺼낸다 (배열은 바꾸지 않고 새로 만들어 교체됨).
+    def _state(self, version, index):
+        with self._lock:
+            self._advance(version, index)
+            if version == self.version:
+                return self.codes, self.dates, self.returns, self.total_sums
+        pivot = price_pivot(index)
+        return list(pivot.columns), pivot.index, daily_returns(pivot.to_numpy(dtype=np.float64)), None
+
+    def _apply(self, pivot):
+        codes = list(pivot.columns)
+        dates = pivot.index
+        prices = pivot.to_numpy(dtype=np.float64)
+        old_rows = len(self.dates)
+        appendable = (
+            codes == self.codes
+            and old_rows > 0
+            and len(dates) >= old_rows
+            and dates[:old_rows].equals(self.dates)
+            and np.array_equal(prices[:old_rows], self.prices, equal_nan=True)
+        )
+        if appendable:
+            # 새로 들어온 날짜의 수익률만 계산해서 누적 합계에 더함
+            tail = prices[old_rows - 1:]
+            new_returns = tail[1:] / tail[:-1] - 1
+            if len(new_returns):
+                self.returns = np.vstack([self.returns, new_returns])
+                self.total_sums = tuple(a + b for a, b in zip(self.total_sums, pair_sums(new_returns)))
+        else:
+            self.returns = daily_returns(prices)
+            self.total_sums = pair_sums(self.returns)
+        self.codes = codes
+        self.dates = dates
+        self.prices = prices
+
+    # 기간별 상관계수 행렬 (window=None이면 전체 기간)
+    def matrix(self, version, index, window=None):
+        codes, _, returns, total_sums = self._state(version, index)
+        with self._lock:
+            cached = self._matrices.get((version, window))
+        if cached is None:
+            if window is None:
+                sums = total_sums if total_sums is not None else pair_sums(returns)
+            else:
+                sums = pair_sums(returns[-window:])
+            cached = pd.DataFrame(correlation_from_sums(*sums), index=codes, columns=codes)
+            with self._lock:
+                if version == self.version:
+                    self._matrices[(version, window)] = cached
+        return cached
+
+    # 한 코인과 다른 모든 코인의 롤링 상관계수 (날짜 x 코인)
+    # 누적 합을 한 번 구해 창 끝과 시작의 차이로 모든 날짜를 한꺼번에 계산한다.
+    def rolling(self, version, index, code, window):
+        codes, dates, returns, _ = self._state(version, index)
+        if code not in codes or len(returns) < window:
+            return pd.DataFrame()
+        i = codes.index(code)
+        present = ~np.isnan(returns)
+        both = present & present[:, [i]]
+        x = np.where(both, returns[:, [i]], 0.0)
+        y = np.where(both, returns, 0.0)
+
+        def window_sum(values):
+            csum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+            return csum[window:] - csum[:-window]
+
+        n = window_sum(both.astype(np.float64))
+        sx, sy = window_sum(x), window_sum(y)
+        sxx, syy, sxy = window_sum(x * x), window_sum(y * y), window_sum(x * y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+        # returns[k]는 dates[k + 1]의 수익률이므로 창의 마지막 날짜를 붙임
+        frame = pd.DataFrame(np.clip(corr, -1.0, 1.0), index=dates[window:], columns=codes)
+        return frame.drop(columns=code)
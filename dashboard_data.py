@@ -0,0 +1,513 @@
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+import metrics
+from compact_schema import TABLE_TYPE_QUERY, compact_source, compact_table_name
+from rollup import rollup_table_name
+
+# [설정]
+DEFAULT_TABLE_NAME = "upbit_data"
+DEFAULT_START_DATE = "2024-12-10"
+PROBE_TTL_SECONDS = 60  # 이 시간 안의 재실행은 DB를 전혀 조회하지 않음
+ID_OVERLAP = 5000       # 증분 조회 때 다시 확인하는 마지막 id 이전 구간 (병렬 수집기는 id 순서대로 커밋하지 않음)
+POOL_SIZE = 4           # 프로세스 전체에서 열어 둘 최대 DB 연결 수
+POOL_TIMEOUT_SECONDS = 10  # 연결이 모두 사용 중일 때 기다릴 최대 시간
+
+PAGE_SIZE = 50          # 데이터 표 한 페이지의 행 수
+MAX_POINTS_PER_COIN = 400  # 기간 차트에서 코인당 읽을 최대 행 수 (넘으면 주봉, 월봉으로 전환)
+
+DATA_COLUMNS = ["date", "code", "opening_price", "closing_price", "prev_closing_price", "volume"]
+DERIVED_COLUMNS = ["change_rate", "price_change", "cumulative_volume"]  # DB에서 계산해서 받는 파생 컬럼
+
+CHANGE_RATE_EXPRESSION = "(closing_price - opening_price) / opening_price * 100"
+PRICE_CHANGE_EXPRESSION = "closing_price - prev_closing_price"
+
+NULL_SORT_VALUE = -1e308  # 변동률이 NULL(시가 0)인 행의 정렬 키 (NULL은 키셋 비교에서 빠지므로 가장 작은 값으로 대신함)
+
+# 데이터 표에서 정렬할 수 있는 컬럼과 SQL 식 (사용자 입력을 SQL에 직접 넣지 않도록 고정된 목록만 사용)
+SORT_EXPRESSIONS = {
+    "code": "code",
+    "date": "date",
+    "closing_price": "closing_price",
+    "volume": "volume",
+    "change_rate": f"COALESCE({CHANGE_RATE_EXPRESSION}, {NULL_SORT_VALUE})",
+}
+
+
+# 파생 컬럼 SELECT 식 (변동률, 전일 대비 가격 변화, 코인별 누적 거래량)
+# 누적 거래량은 MySQL 8 윈도 함수로 조회 결과 안에서 코인별, 날짜 순으로 누적한다.
+def derived_select(date_column="date"):
+    return f"""{CHANGE_RATE_EXPRESSION} AS change_rate,
+           {PRICE_CHANGE_EXPRESSION} AS price_change,
+           SUM(volume) OVER (PARTITION BY code ORDER BY {date_column} ROWS UNBOUNDED PRECEDING) AS cumulative_volume"""
+
+
+# 프로세스 전체에서 공유하는 DB 연결 풀
+# 쉬고 있는 연결을 재사용하고, size개가 모두 사용 중이면 timeout까지 기다린다.
+class ConnectionPool:
+    def __init__(self, connect, size=POOL_SIZE, timeout=POOL_TIMEOUT_SECONDS):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.in_use = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _open(self):
+        with metrics.timer("db_connect"):
+            return self.connect()
+
+    def _acquire(self):
+        fresh = False
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                fresh = self.opened < self.size
+                if fresh:
+                    self.opened += 1
+            if fresh:
+                try:
+                    connection = self._open()
+                except Exception:
+                    with self._lock:
+                        self.opened -= 1
+                    raise
+            else:
+                connection = self._wait_for_idle()
+        if connection is None:
+            # 오류로 버려진 연결 자리: 새로 연결
+            fresh = True
+            try:
+                connection = self._open()
+            except Exception:
+                self._idle.put(None)
+                raise
+        # 오래 쉬던 연결은 서버가 끊었을 수 있으므로 확인 후 필요하면 다시 연결
+        if not fresh and hasattr(connection, "ping"):
+            connection.ping(reconnect=True)
+        with self._lock:
+            self.in_use += 1
+        return connection
+
+    def _wait_for_idle(self):
+        started = time.monotonic()
+        try:
+            connection = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"DB 연결 풀 대기 시간 초과 ({self.timeout}초)")
+        waited = time.monotonic() - started
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return connection
+
+    # with pool.connection() as connection: ... (오류가 난 연결은 버리고 새로 열게 함)
+    @contextmanager
+    def connection(self):
+        connection = self._acquire()
+        try:
+            yield connection
+        except Exception:
+            with self._lock:
+                self.in_use -= 1
+            try:
+                connection.close()
+            except Exception:
+                pass
+            # 자리는 남겨 두고 다음 사용자가 새로 연결하게 함
+            self._idle.put(None)
+            raise
+        else:
+            # 읽기 트랜잭션을 끝내고 돌려놓음 (REPEATABLE READ에서 이전 스냅샷을 계속 보지 않게)
+            try:
+                connection.rollback()
+            except Exception:
+                connection = None
+            with self._lock:
+                self.in_use -= 1
+            self._idle.put(connection)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "opened": self.opened,
+                "in_use": self.in_use,
+                "waits": self.waits,
+                "avg_wait_ms": self.wait_seconds / self.waits * 1000 if self.waits else 0.0,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+            }
+
+
+# 같은 키의 작업이 이미 실행 중이면 새로 실행하지 않고 그 결과를 같이 받음
+class SingleFlight:
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "hit_rate": self.coalesced / self.calls if self.calls else 0.0,
+            }
+
+
+# 연결 풀 + 동일 쿼리 합치기: N개 세션이 같은 쿼리를 동시에 보내면 한 번만 실행
+class QueryRunner:
+    def __init__(self, connect, pool_size=POOL_SIZE, pool_timeout=POOL_TIMEOUT_SECONDS):
+        self.pool = ConnectionPool(connect, pool_size, pool_timeout)
+        self.flight = SingleFlight()
+
+    def _execute(self, query, params):
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                with metrics.timer("db_query"):
+                    cursor.execute(query, params)
+                    return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    # 결과 행은 여러 세션이 공유하므로 바꾸지 말고 읽기만 해야 한다
+    def fetchall(self, query, params=None):
+        key = (query, tuple(params) if params is not None else None)
+        return self.flight.do(key, lambda: self._execute(query, params))
+
+    def stats(self):
+        return {"pool": self.pool.stats(), "coalescing": self.flight.stats()}
+
+
+# upbit_data를 프로세스 안에 들고 있는 증분 캐시
+# - TTL이 지나기 전에는 DB를 조회하지 않고 들고 있는 프레임을 그대로 돌려준다.
+# - TTL이 지나면 MAX(id)와 최근 id 구간의 행 수로 새 행이 있는지만 확인하고,
+#   있으면 마지막으로 읽은 id 직전 ID_OVERLAP 구간부터 읽어 아직 없던 행만 붙인다.
+#   (백필로 과거 날짜가 들어와도 id는 증가하고, 병렬 수집기가 id 순서와 다르게 커밋해도 빠지지 않는다)
+# - 파생 컬럼은 DB가 계산해서 보내므로 새 행의 누적 거래량에는 코인별 직전 누적값만 더한다.
+#   과거 날짜가 끼어들면(백필) 이후 누적값이 모두 바뀌므로 처음부터 다시 읽는다.
+# - local_snapshot(ColumnarSnapshot)이 있으면 처음 한 번은 로컬 스냅샷을 읽고 그 뒤의 행(과 확인 구간)만 DB에서 가져온다.
+#   DB에 연결할 수 없으면 들고 있는 데이터로 읽기 전용(offline) 상태로 계속 동작한다.
+# - 데이터가 바뀔 때마다 version이 올라가므로 다른 캐시의 키로 쓸 수 있다.
+class UpbitDataStore:
+    def __init__(self, runner, table=DEFAULT_TABLE_NAME, start_date=DEFAULT_START_DATE, ttl=PROBE_TTL_SECONDS,
+                 local_snapshot=None, compact=None):
+        self.runner = runner
+        self.detect_compact = compact is None   # None이면 테이블이 압축 스키마 호환 뷰인지 DB에서 확인
+        self.compact = compact
+        self.local_snapshot = local_snapshot
+        self.offline = False    # DB 연결 실패로 스냅샷/기존 데이터만 보여주는 중
+        self.table = table
+        self.start_date = start_date
+        self.ttl = ttl
+        self.frame = pd.DataFrame(columns=DATA_COLUMNS + DERIVED_COLUMNS)
+        self.last_id = 0
+        self.id_floor = 0         # 이 id까지는 다시 확인하지 않음
+        self.recent_ids = set()   # 확인 구간에서 이미 읽은 id
+        self.snapshot_window = False   # 스냅샷 직후: 확인 구간의 행을 id 대신 (코인, 날짜)로 비교해야 함
+        self.version = 0
+        self.checked_at = None
+        self.tails = {}     # 코인별 (마지막 날짜, 마지막 누적 거래량)
+        self._lock = threading.Lock()
+
+    def _query(self, query, params=None):
+        return self.runner.fetchall(query, params)
+
+    # 마지막 id 이전 구간의 시작 (이 구간의 행은 늦게 커밋됐을 수 있어 다시 확인)
+    def _overlap_start(self):
+        return max(self.id_floor, self.last_id - ID_OVERLAP)
+
+    # 압축 스키마면 증분 조회는 호환 뷰 대신 본 테이블을 직접 읽음 (id 인덱스만으로 확인)
+    def _detect_compact(self):
+        if self.compact is None:
+            rows = self._query(TABLE_TYPE_QUERY, (self.table,))
+            self.compact = bool(rows) and rows[0][0] == "VIEW"
+
+    # 테이블의 현재 버전: (가장 큰 id, 확인 구간 이후의 행 수)
+    # 행 수도 비교해야 더 작은 id가 나중에 커밋된 경우를 알 수 있다 (id 인덱스 범위 조회라 가벼움).
+    def probe(self):
+        self._detect_compact()
+        source = compact_table_name(self.table) if self.compact else self.table
+        rows = self._query(
+            f"SELECT MAX(id), COUNT(*) FROM {source} WHERE id > %s AND date >= %s",
+            (self._overlap_start(), self.start_date),
+        )
+        max_id, count = rows[0]
+        return max_id or 0, count
+
+    # last_id 이후에 들어온 행만 조회 (누적 거래량은 가져온 행 안에서의 누적)
+    def fetch_since(self, last_id):
+        query = f"""
+        SELECT d.id, {', '.join(DATA_COLUMNS)},
+           {derived_select()}
+        FROM {compact_source(self.table) if self.compact else f"{self.table} d"}
+        WHERE d.id > %s AND d.date >= %s
+        ORDER BY d.id ASC;
+        """
+        rows = self._query(query, (last_id, self.start_date))
+        with metrics.timer("dataframe_build"):
+            return pd.DataFrame(rows, columns=["id"] + DATA_COLUMNS + DERIVED_COLUMNS)
+
+    # 처음부터 다시 읽도록 초기화
+    def reset(self):
+        self.frame = pd.DataFrame(columns=DATA_COLUMNS + DERIVED_COLUMNS)
+        self.last_id = 0
+        self.id_floor = 0
+        self.recent_ids = set()
+        self.snapshot_window = False
+        self.tails = {}
+        if self.detect_compact:
+            self.compact = None
+        self.version += 1
+
+    # 새 행이 모든 코인에서 기존 마지막 날짜 뒤에만 붙었는지 (그래야 누적값을 이어 붙일 수 있음)
+    def _is_append(self, delta):
+        if not self.tails:
+            return True
+        first_dates = delta.groupby("code", sort=False)["date"].min()
+        for code, first in first_dates.items():
+            tail = self.tails.get(code)
+            if tail is not None and first <= tail[0]:
+                return False
+        return True
+
+    # 코인별 마지막 날짜와 누적 거래량 기억 (frame은 날짜 순)
+    def _remember_tails(self, frame):
+        last = frame.groupby("code", sort=False).last()
+        for code, row in last.iterrows():
+            self.tails[code] = (row["date"], row["cumulative_volume"])
+
+    # 로컬 스냅샷을 시작 데이터로 사용 (처음 한 번)
+    def _load_local_snapshot(self):
+        last_id, frame = self.local_snapshot.load(self.start_date)
+        if frame is None:
+            return
+        self.frame = frame
+        self.last_id = last_id
+        # 스냅샷을 만든 뒤 더 작은 id가 늦게 커밋됐을 수 있으므로 마지막 id 이전 구간도 다시 확인
+        # (스냅샷에는 id가 없어서 첫 조회에서는 (코인, 날짜)로 이미 있는 행을 거름)
+        self.id_floor = max(0, last_id - ID_OVERLAP)
+        self.snapshot_window = True
+        self._remember_tails(frame)
+        self.version += 1
+
+    # 새 행이 있으면 붙이고 True, 없으면 False
+    def refresh(self):
+        if self.version == 0 and self.local_snapshot is not None:
+            self._load_local_snapshot()
+        max_id, count = self.probe()
+        self.checked_at = time.monotonic()
+        if max_id == self.last_id and count == len(self.recent_ids):
+            return False
+
+        if max_id < self.last_id:
+            # 테이블이 비워졌거나 다시 만들어진 경우 처음부터 다시 읽음
+            self.reset()
+
+        delta, window_ids = self._load_delta()
+        if not delta.empty and not self._is_append(delta):
+            # 과거 날짜가 채워짐: 그 뒤 날짜의 누적 거래량이 모두 바뀌므로 전체를 다시 읽음
+            self.reset()
+            delta, window_ids = self._load_delta()
+        # 확인과 조회 사이에 들어온 행까지 읽었을 수 있으므로 실제로 읽은 최대 id도 반영
+        self.last_id = max(self.last_id, max_id, max(window_ids, default=0))
+        start = self._overlap_start()
+        self.recent_ids = {i for i in window_ids if i > start}
+        self.snapshot_window = False
+        if not delta.empty:
+            delta = delta.drop(columns="id")
+            # 새 행의 누적 거래량 = 코인별 직전 누적값 + 새 행 안에서의 누적
+            offsets = {code: tail[1] for code, tail in self.tails.items()}
+            delta["cumulative_volume"] += delta["code"].map(offsets).fillna(0.0)
+            self._remember_tails(delta.sort_values("date", kind="stable"))
+            frame = delta if self.frame.empty else pd.concat([self.frame, delta], ignore_index=True)
+            self.frame = frame.sort_values("date", kind="stable", ignore_index=True)
+            self.version += 1
+        return True
+
+    # 확인 구간부터 읽고 이미 읽은 행은 버림 (버린 행이 있으면 누적 거래량을 남은 행으로 다시 계산)
+    # 반환: (새 행, 확인 구간에서 읽은 모든 id)
+    def _load_delta(self):
+        delta = self.fetch_since(self._overlap_start())
+        delta["date"] = pd.to_datetime(delta["date"])
+        numeric = DATA_COLUMNS[2:] + DERIVED_COLUMNS
+        delta = delta.astype({column: "float64" for column in numeric})
+        window_ids = delta["id"].tolist()
+        known = None
+        if self.recent_ids:
+            known = delta["id"].isin(self.recent_ids)
+        elif self.snapshot_window and not self.frame.empty and not delta.empty:
+            keys = pd.MultiIndex.from_frame(self.frame[["code", "date"]])
+            known = pd.Series(pd.MultiIndex.from_frame(delta[["code", "date"]]).isin(keys), index=delta.index)
+        if known is not None and known.any():
+            delta = delta[~known].reset_index(drop=True)
+            ordered = delta.sort_values("date", kind="stable")
+            delta["cumulative_volume"] = ordered.groupby("code", sort=False)["volume"].cumsum()
+        return delta, window_ids
+
+    # (버전, 캐시된 프레임) 반환 (TTL이 지났을 때만 버전 확인)
+    # 보여줄 데이터가 있는데 DB가 응답하지 않으면 오류 대신 읽기 전용으로 전환하고 TTL 뒤에 다시 시도한다.
+    def snapshot(self):
+        with self._lock:
+            if self.checked_at is None or time.monotonic() - self.checked_at >= self.ttl:
+                try:
+                    self.refresh()
+                    self.offline = False
+                except Exception as e:
+                    if self.frame.empty:
+                        raise
+                    if not self.offline:
+                        print(f"DB 연결 실패, 로컬 데이터로 읽기 전용 전환: {e}")
+                    self.offline = True
+                    self.checked_at = time.monotonic()
+            return self.version, self.frame
+
+    # 캐시된 프레임 반환
+    def get(self):
+        return self.snapshot()[1]
+
+
+# 데이터 표 한 페이지 조회 (키셋 페이지네이션)
+# (정렬 컬럼, code, date) 순으로 정렬하고 직전 페이지 마지막 행의 키(after)보다 뒤의 행만 읽으므로
+# 몇 번째 페이지든 OFFSET 없이 page_size + 1행만 조회한다.
+# 반환: (페이지 프레임, 다음 페이지 커서 또는 None)
+def fetch_page(runner, table=DEFAULT_TABLE_NAME, codes=None, date_range=None, sort="code",
+               descending=False, after=None, page_size=PAGE_SIZE):
+    sort_expression = SORT_EXPRESSIONS[sort]
+    keys = ["code", "date"] if sort == "code" else [sort_expression, "code", "date"]
+    direction = "DESC" if descending else "ASC"
+
+    conditions, params = [], []
+    if codes:
+        conditions.append(f"code IN ({', '.join(['%s'] * len(codes))})")
+        params += list(codes)
+    if date_range:
+        conditions.append("date BETWEEN %s AND %s")
+        params += [date_range[0], date_range[1]]
+    if after:
+        conditions.append(f"({', '.join(keys)}) {'<' if descending else '>'} ({', '.join(['%s'] * len(keys))})")
+        params += list(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    query = f"""
+    SELECT {', '.join(DATA_COLUMNS)},
+           {CHANGE_RATE_EXPRESSION} AS change_rate,
+           {PRICE_CHANGE_EXPRESSION} AS price_change,
+           {sort_expression} AS sort_key
+    FROM {table}
+    {where}
+    ORDER BY {', '.join(f"{key} {direction}" for key in keys)}
+    LIMIT %s;
+    """
+    rows = runner.fetchall(query, params + [page_size + 1])
+    page = pd.DataFrame(rows[:page_size], columns=DATA_COLUMNS + ["change_rate", "price_change", "sort_key"])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        last = page.iloc[-1]
+        values = (last["code"], last["date"]) if sort == "code" else (last["sort_key"], last["code"], last["date"])
+        # numpy 스칼라는 파이썬 값으로 바꿔서 쿼리 인자로 사용
+        next_cursor = tuple(v.item() if hasattr(v, "item") else v for v in values)
+    return page.drop(columns="sort_key"), next_cursor
+
+
+# DB 없이 메모리 프레임에서 데이터 표 한 페이지 조회 (읽기 전용 모드용, 커서는 행 위치)
+# 반환: (페이지 프레임, 다음 페이지 커서 또는 None)
+def frame_page(frame, codes=None, date_range=None, sort="code", descending=False, after=None, page_size=PAGE_SIZE):
+    view = frame
+    if codes:
+        view = view[view["code"].isin(codes)]
+    if date_range:
+        dates = view["date"]
+        view = view[(dates >= pd.Timestamp(date_range[0])) & (dates <= pd.Timestamp(date_range[1]))]
+    keys = ["code", "date"] if sort == "code" else [sort, "code", "date"]
+    view = view.sort_values(keys, ascending=not descending, kind="stable")
+    start = after or 0
+    page = view.iloc[start:start + page_size][DATA_COLUMNS + ["change_rate", "price_change"]]
+    next_cursor = start + page_size if len(view) > start + page_size else None
+    return page.reset_index(drop=True), next_cursor
+
+
+# 전체 일봉 데이터의 (가장 이른 날짜, 가장 늦은 날짜)
+def fetch_history_bounds(runner, table=DEFAULT_TABLE_NAME):
+    rows = runner.fetchall(f"SELECT MIN(date), MAX(date) FROM {table}")
+    return rows[0] if rows else (None, None)
+
+
+# 기간 길이에 맞는 가장 세밀한 해상도 ("day", "week", "month")
+# 코인당 점 수가 max_points를 넘지 않는 범위에서 고르므로 긴 기간일수록 집계 테이블을 읽는다.
+def choose_resolution(start, end, max_points=MAX_POINTS_PER_COIN):
+    days = (end - start).days + 1
+    if days <= max_points:
+        return "day"
+    if days / 7 <= max_points:
+        return "week"
+    return "month"
+
+
+# 기간 차트용 데이터 (일봉 테이블 또는 주봉/월봉 집계 테이블에서 기간 안의 행만 조회)
+# 집계 테이블의 period_start를 date로 돌려주므로 일봉과 같은 컬럼으로 쓸 수 있다.
+# 파생 컬럼도 DB에서 계산한다 (누적 거래량은 기간 시작부터의 누적).
+def fetch_period_frame(runner, table, resolution, date_range, codes=None):
+    source = table if resolution == "day" else rollup_table_name(table, resolution)
+    date_column = "date" if resolution == "day" else "period_start"
+    conditions, params = [f"{date_column} BETWEEN %s AND %s"], [date_range[0], date_range[1]]
+    if codes:
+        conditions.append(f"code IN ({', '.join(['%s'] * len(codes))})")
+        params += list(codes)
+    query = f"""
+    SELECT {date_column}, code, opening_price, closing_price, prev_closing_price, volume,
+           {derived_select(date_column)}
+    FROM {source}
+    WHERE {' AND '.join(conditions)}
+    ORDER BY {date_column} ASC;
+    """
+    frame = pd.DataFrame(runner.fetchall(query, params), columns=DATA_COLUMNS + DERIVED_COLUMNS)
+    frame["date"] = pd.to_datetime(frame["date"])
+    # 결과가 비어 있어도 숫자 컬럼 타입을 맞춰 둠 (DECIMAL로 오는 SUM 결과 포함)
+    return frame.astype({column: "float64" for column in DATA_COLUMNS[2:] + DERIVED_COLUMNS})
@@ -0,0 +1,139 @@
+from datetime import datetime
+
+import metrics
+from rollup import update_rollups
+from compact_schema import MarketDictionary, compact_table_name, is_compact
+
+# [설정]
+DEFAULT_TABLE_NAME = "upbit_data"
+DEFAULT_CHUNK_SIZE = 500  # 한 번에 executemany로 보내고 커밋할 행 수
+
+CANDLE_COLUMNS = [
+    "date", "code", "opening_price", "closing_price", "high_price",
+    "low_price", "volume", "prev_closing_price",
+]
+
+
+# 'YYYY-MM-DD' 문자열을 date로 변환
+def to_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+# 업비트 일봉 응답 하나를 upbit_data 행 튜플로 변환
+def candle_to_row(candle, market):
+    return (
+        candle["candle_date_time_kst"][:10],
+        market,
+        candle["opening_price"],
+        candle["trade_price"],
+        candle["high_price"],
+        candle["low_price"],
+        candle["candle_acc_trade_volume"],
+        candle["prev_closing_price"],
+    )
+
+
+# 캔들 행을 모아서 한 연결로 묶음 저장하는 writer
+# 중복 (date, code)는 ON DUPLICATE KEY UPDATE id = id 로 건너뛰므로
+# 영향받은 행 수 = 새로 기록된 행 수, 나머지는 건너뛴 행 수가 된다.
+class CandleBatchWriter:
+    # rollups=True면 닫을 때 새로 들어온 일봉이 속한 주봉/월봉 집계 테이블도 갱신한다.
+    # compact=None이면 table이 압축 스키마 호환 뷰인지 확인해서, 뷰면 본 테이블에 code_id로 저장한다.
+    def __init__(self, connection, table=DEFAULT_TABLE_NAME, chunk_size=DEFAULT_CHUNK_SIZE, verbose=True, rollups=False,
+                 compact=None):
+        self.connection = connection
+        self.compact = is_compact(connection, table) if compact is None else compact
+        self.markets = MarketDictionary(connection).load() if self.compact else None
+        self.rollups = rollups
+        self.touched = {}        # 코인별로 저장한 가장 이른/늦은 날짜 {code: [min, max]}
+        self.table = table
+        self.chunk_size = max(1, int(chunk_size))
+        self.verbose = verbose
+        self.buffer = []
+        self.batches = []        # 배치별 결과 [{"rows", "written", "skipped"}]
+        self.total_written = 0
+        self.total_skipped = 0
+        target, columns = table, CANDLE_COLUMNS
+        if self.compact:
+            target, columns = compact_table_name(table), ["date", "code_id"] + CANDLE_COLUMNS[2:]
+        self.insert_query = f"""
+        INSERT INTO {target}
+        ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON DUPLICATE KEY UPDATE id = id;
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.buffer.clear()
+            self.connection.close()
+
+    # 업비트 캔들 응답 하나 추가
+    def add(self, candle, market):
+        self.add_row(candle_to_row(candle, market))
+
+    # 이미 변환된 행 튜플 하나 추가 (chunk_size가 차면 바로 저장)
+    def add_row(self, row):
+        self.buffer.append(row)
+        day, code = str(row[0])[:10], row[1]
+        span = self.touched.get(code)
+        if span is None:
+            self.touched[code] = [day, day]
+        elif day < span[0]:
+            span[0] = day
+        elif day > span[1]:
+            span[1] = day
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    # 여러 행 추가
+    def add_rows(self, rows):
+        for row in rows:
+            self.add_row(row)
+
+    # 버퍼에 쌓인 행을 chunk_size 단위로 저장하고 청크마다 커밋
+    def flush(self):
+        while self.buffer:
+            chunk = self.buffer[:self.chunk_size]
+            del self.buffer[:self.chunk_size]
+            self._write_chunk(chunk)
+
+    def _write_chunk(self, chunk):
+        if self.compact:
+            # 마켓 코드를 사전의 code_id로 바꿔서 저장
+            ids = self.markets.ensure(row[1] for row in chunk)
+            chunk = [(row[0], ids[row[1]]) + tuple(row[2:]) for row in chunk]
+        cursor = self.connection.cursor()
+        try:
+            with metrics.timer("db_insert", table=self.table):
+                written = cursor.executemany(self.insert_query, chunk) or 0
+                self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        skipped = len(chunk) - written
+        metrics.count("rows_written", written, table=self.table)
+        metrics.count("rows_skipped", skipped, table=self.table)
+        self.batches.append({"rows": len(chunk), "written": written, "skipped": skipped})
+        self.total_written += written
+        self.total_skipped += skipped
+        if self.verbose:
+            print(f"배치 저장: {len(chunk)}행 중 {written}행 기록, {skipped}행 건너뜀 (중복)")
+
+    # 남은 행을 저장하고 (필요하면 집계 테이블을 갱신한 뒤) 연결 종료
+    def close(self):
+        self.flush()
+        if self.rollups and self.touched:
+            touched = {code: (to_date(first), to_date(last)) for code, (first, last) in self.touched.items()}
+            written = update_rollups(self.connection, self.table, touched)
+            if self.verbose:
+                print(f"주봉/월봉 집계 {written}행 갱신")
+        self.connection.close()
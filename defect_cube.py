@@ -0,0 +1,109 @@
+import pandas as pd
+
+# [설정]
+TOP_ACTIONS = 5            # 칸(연도, 유형, 발생유형)마다 보관할 상위 조치 내용 수
+CELL_COLUMNS = ["YEAR", "TYPE_GBN_U_NM", "TYPE_GBN_NM"]
+NO_ACTION_LABEL = "조치 내용 없음"
+
+
+# 조치 내용을 줄 단위로 나눈 (칸, 조치) 행 (빈 줄 제외)
+def explode_actions(frame):
+    actions = frame["JOCHI_DESCR"].astype(str).str.split("\n").explode().str.strip()
+    actions = actions[actions != ""]
+    exploded = frame.loc[actions.index, CELL_COLUMNS].copy()
+    exploded["ACTION"] = actions.to_numpy()
+    return exploded
+
+
+# (칸, 조치, 횟수) 표에서 칸별 상위 n개 {칸: [(조치, 횟수), ...]} (횟수가 같으면 조치 이름 순)
+def rank_actions(action_counts, top_n=TOP_ACTIONS):
+    ranked = action_counts.sort_values(CELL_COLUMNS + ["COUNT", "ACTION"],
+                                       ascending=[True, True, True, False, True])
+    ranked = ranked.groupby(CELL_COLUMNS, observed=True, sort=False).head(top_n)
+    top = {}
+    for year, type_name, subtype, action, count in ranked[CELL_COLUMNS + ["ACTION", "COUNT"]].itertuples(index=False):
+        top.setdefault((year, type_name, subtype), []).append((action, int(count)))
+    return top
+
+
+# 정리된 프레임에서 집계 큐브 생성 (데이터 버전마다 한 번)
+def build_cube(frame, top_n=TOP_ACTIONS):
+    frame = frame.dropna(subset=["YEAR"])
+    cell_counts = frame.groupby(CELL_COLUMNS, observed=True).size()
+    action_counts = (
+        explode_actions(frame).groupby(CELL_COLUMNS + ["ACTION"], observed=True).size()
+        .rename("COUNT").reset_index()
+    )
+    return DefectCube(cell_counts, rank_actions(action_counts, top_n))
+
+
+# Treemap 라벨용 TOP-n 조치 내용 (HTML 줄바꿈)
+def actions_html(top):
+    if top:
+        return "<br>".join(f"{i+1}. {action} ({count})" for i, (action, count) in enumerate(top))
+    return NO_ACTION_LABEL
+
+
+# 연도 × 불량 유형 × 발생 유형 집계 큐브
+# - 칸별 건수와 상위 조치 내용만 들고 있으며, 화면에서 쓰는 표는 만들 때 미리 준비해서 선택마다 사전 조회로 끝낸다.
+# - 여러 세션이 공유하므로 꺼낸 표는 바꾸면 안 된다.
+class DefectCube:
+    def __init__(self, cell_counts, top_actions):
+        self.cell_counts = cell_counts          # (연도, 유형, 발생유형) -> 건수
+        self.top_actions = top_actions          # (연도, 유형, 발생유형) -> [(조치, 횟수), ...]
+
+        cells = cell_counts.rename("빈도수").reset_index()
+        cells["YEAR"] = cells["YEAR"].astype(int)
+        cells = cells[cells["빈도수"] > 0]
+        cells["조치내용"] = [
+            actions_html(top_actions.get((year, type_name, subtype)))
+            for year, type_name, subtype in cells[CELL_COLUMNS].itertuples(index=False)
+        ]
+        self.years = sorted(cells["YEAR"].unique().tolist())
+
+        # 연도별 불량 유형 빈도 (많은 순): 사이드바 목록과 라벨
+        type_totals = cells.groupby(["YEAR", "TYPE_GBN_U_NM"], observed=True)["빈도수"].sum().reset_index()
+        type_totals = type_totals.sort_values(["YEAR", "빈도수"], ascending=[True, False], kind="mergesort")
+        self.type_counts = {
+            year: dict(zip(group["TYPE_GBN_U_NM"], group["빈도수"].astype(int)))
+            for year, group in type_totals.groupby("YEAR")
+        }
+
+        # (연도, 유형)별 Treemap 표
+        self.treemaps = {
+            (year, type_name): group[["TYPE_GBN_U_NM", "TYPE_GBN_NM", "빈도수", "조치내용"]].reset_index(drop=True)
+            for (year, type_name), group in cells.groupby(["YEAR", "TYPE_GBN_U_NM"], observed=True)
+        }
+
+        # 연도 비교용: 유형 × 연도, (유형, 발생유형) × 연도 건수
+        self.type_by_year = type_totals.pivot(index="TYPE_GBN_U_NM", columns="YEAR", values="빈도수").fillna(0).astype(int)
+        self.subtype_by_year = {
+            type_name: group.pivot_table(index="TYPE_GBN_NM", columns="YEAR", values="빈도수",
+                                         aggfunc="sum", fill_value=0, observed=True)
+            for type_name, group in cells.groupby("TYPE_GBN_U_NM", observed=True)
+        }
+
+    # 연도의 불량 유형별 빈도 {유형: 건수} (많은 순)
+    def types(self, year):
+        return self.type_counts.get(year, {})
+
+    # (연도, 유형)의 Treemap 표 (없으면 빈 표)
+    def treemap_frame(self, year, type_name):
+        frame = self.treemaps.get((year, type_name))
+        if frame is None:
+            return pd.DataFrame(columns=["TYPE_GBN_U_NM", "TYPE_GBN_NM", "빈도수", "조치내용"])
+        return frame
+
+    # 선택한 연도들의 유형별 건수 (긴 형식: 유형, 연도, 빈도수)
+    def compare_types(self, years):
+        columns = [year for year in years if year in self.type_by_year.columns]
+        table = self.type_by_year[columns]
+        return table.reset_index().melt(id_vars="TYPE_GBN_U_NM", var_name="YEAR", value_name="빈도수")
+
+    # 선택한 연도들의 한 유형 내 발생유형별 건수 (긴 형식)
+    def compare_subtypes(self, type_name, years):
+        table = self.subtype_by_year.get(type_name)
+        if table is None:
+            return pd.DataFrame(columns=["TYPE_GBN_NM", "YEAR", "빈도수"])
+        table = table[[year for year in years if year in table.columns]]
+        return table.reset_index().melt(id_vars="TYPE_GBN_NM", var_name="YEAR", value_name="빈도수")
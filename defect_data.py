@@ -0,0 +1,111 @@
+import os
+import shutil
+import hashlib
+
+import pandas as pd
+
+from text_cleaner import TextCleaner, load_stop_words
+
+try:
+    import pyarrow  # Parquet 스냅샷용 (없으면 pickle로 저장)
+    SNAPSHOT_FORMAT = "parquet"
+except ImportError:
+    SNAPSHOT_FORMAT = "pickle"
+
+# [설정]
+DATA_FILE = "data.csv"
+CACHE_DIR = os.environ.get("ZOQ_CACHE_DIR", ".zoq_cache")  # 정리된 데이터 스냅샷 저장 위치
+REQUIRED_COLUMNS = ["TYPE_GBN_U_NM", "TYPE_GBN_NM", "JOCHI_DESCR", "D_YMD"]
+CATEGORY_COLUMNS = ["TYPE_GBN_U_NM", "TYPE_GBN_NM"]  # 값 종류가 적어서 category로 저장
+
+# 파일 서명 (절대 경로, 크기, 수정 시각): 하나라도 바뀌면 다시 만든다
+def file_signature(path):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+# 데이터 버전: 파일 서명 + 불용어 (불용어가 바뀌어도 다시 정리해야 함)
+def data_signature(path=DATA_FILE, stop_words=None):
+    stop_words = load_stop_words() if stop_words is None else stop_words
+    return file_signature(path) + (tuple(stop_words),)
+
+
+# CSV를 읽어 정리된 프레임 생성 (결측 제거, 조치 내용 정리, 연도 추출, 유형은 category)
+def build_clean_frame(path, cleaner=None):
+    data = pd.read_csv(path, on_bad_lines='skip', encoding='utf-8-sig')
+
+    # 관련 열에 결측치가 있는 행 제거 (화면에서 쓰는 열만 유지)
+    frame = data.dropna(subset=REQUIRED_COLUMNS)[REQUIRED_COLUMNS].reset_index(drop=True)
+
+    # 'JOCHI_DESCR' 열에 불용어 및 특수기호 제거 적용 (같은 문장은 한 번만 정리)
+    cleaner = cleaner or TextCleaner(load_stop_words())
+    frame['JOCHI_DESCR'] = cleaner.clean_series(frame['JOCHI_DESCR'])
+
+    # 연도 추출 후 정수형으로 변환
+    frame['YEAR'] = pd.to_datetime(frame['D_YMD'], errors='coerce').dt.year.astype('Int64')
+    frame = frame.drop(columns='D_YMD')
+    return frame.astype({column: 'category' for column in CATEGORY_COLUMNS})
+
+
+# 캐시 이름 앞부분: CSV 이름 + 절대 경로 해시 (+ 종류), 다른 폴더의 같은 이름 CSV와 겹치지 않음
+def cache_stem(path, kind=None):
+    path = os.path.abspath(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    stem = f"{name}-{hashlib.sha1(path.encode()).hexdigest()[:8]}"
+    return f"{stem}-{kind}" if kind else stem
+
+
+# 서명별 캐시 경로 (예: .zoq_cache/data-0a1b2c3d-cube-1a2b3c4d5e6f.pkl, extension이 없으면 폴더)
+def cache_path(signature, kind=None, extension=None, cache_dir=CACHE_DIR):
+    digest = hashlib.sha1(repr(signature).encode()).hexdigest()[:12]
+    name = f"{cache_stem(signature[0], kind)}-{digest}"
+    return os.path.join(cache_dir, f"{name}.{extension}" if extension else name)
+
+
+# 같은 CSV, 같은 종류의 이전 버전 캐시(파일 또는 폴더) 삭제
+def remove_stale(target):
+    cache_dir, name = os.path.split(target)
+    stem = name.rsplit("-", 1)[0]
+    for other in os.listdir(cache_dir):
+        old = os.path.join(cache_dir, other)
+        if other.rsplit("-", 1)[0] == stem and old != target and not other.endswith(".tmp"):
+            if os.path.isdir(old):
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                os.remove(old)
+
+
+# 서명별 스냅샷 파일 경로
+def snapshot_path(signature, cache_dir=CACHE_DIR):
+    return cache_path(signature, extension="parquet" if SNAPSHOT_FORMAT == "parquet" else "pkl", cache_dir=cache_dir)
+
+
+def _read_snapshot(path):
+    if SNAPSHOT_FORMAT == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _write_snapshot(frame, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    if SNAPSHOT_FORMAT == "parquet":
+        frame.to_parquet(temp, index=False)
+    else:
+        frame.to_pickle(temp)
+    os.replace(temp, path)
+
+
+# 정리된 프레임 로딩: 같은 서명의 스냅샷이 있으면 그것을 읽고, 없으면 CSV에서 만들어 저장
+# 같은 CSV의 이전 스냅샷은 지운다. 불용어가 바뀌어도 서명이 달라져 다시 만든다.
+def load_clean_frame(path=DATA_FILE, cache_dir=CACHE_DIR, stop_words=None):
+    signature = data_signature(path, stop_words)
+    cleaner = TextCleaner(signature[-1])
+    target = snapshot_path(signature, cache_dir)
+    if os.path.exists(target):
+        return _read_snapshot(target)
+
+    frame = build_clean_frame(path, cleaner)
+    _write_snapshot(frame, target)
+    remove_stale(target)
+    return frame
@@ -0,0 +1,138 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from defect_data import CACHE_DIR, cache_path, remove_stale
+
+# [설정]
+SEARCH_RESULT_ROWS = 500   # 화면에 보여줄 최대 결과 행 수
+PREFIX_MARK = "*"          # 검색어 끝에 붙이면 접두어 검색 (예: 재작*)
+
+# 인덱스 폴더에 배열 하나당 .npy 파일 하나로 저장
+# - terms: 정렬된 단어, offsets: 단어별 postings 시작 위치 (길이 = 단어 수 + 1)
+# - postings: 단어별로 이어 붙인 행 번호 (단어 안에서 오름차순, 중복 없음)
+# - years / types / subtypes: 행별 필터 값 (연도가 없으면 -1, 유형은 category 코드)
+INDEX_ARRAYS = ["terms", "offsets", "postings", "years", "types", "subtypes", "type_names", "subtype_names"]
+
+
+# 검색어 정규화 (인덱스에 넣는 단어와 같은 규칙)
+def normalize_term(term):
+    return term.strip().lower()
+
+
+# 정리된 프레임(행 번호 = 0부터 시작하는 위치)에서 역색인 배열 생성
+def build_index_arrays(frame):
+    tokens = frame["JOCHI_DESCR"].astype(str).str.lower().str.split().explode().dropna()
+    pairs = pd.DataFrame({"term": tokens.to_numpy(), "row": tokens.index.to_numpy(dtype=np.int64)})
+    pairs = pairs[pairs["term"] != ""].drop_duplicates()
+
+    codes, terms = pd.factorize(pairs["term"], sort=True)
+    rows = pairs["row"].to_numpy()
+    order = np.lexsort((rows, codes))
+    counts = np.bincount(codes, minlength=len(terms))
+
+    types = frame["TYPE_GBN_U_NM"].astype("category")
+    subtypes = frame["TYPE_GBN_NM"].astype("category")
+    return {
+        "terms": np.asarray(terms, dtype=str),
+        "offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+        "postings": rows[order].astype(np.int32),
+        "years": frame["YEAR"].fillna(-1).to_numpy(dtype=np.int32),
+        "types": types.cat.codes.to_numpy(dtype=np.int32),
+        "subtypes": subtypes.cat.codes.to_numpy(dtype=np.int32),
+        "type_names": np.asarray(types.cat.categories, dtype=str),
+        "subtype_names": np.asarray(subtypes.cat.categories, dtype=str),
+    }
+
+
+# 조치 내용 역색인 (정리된 단어 -> 행 번호)
+# - 배열을 메모리 매핑으로 열어 여러 세션이 함께 읽는다.
+# - 단어가 정렬되어 있어 접두어가 같은 단어들은 연속 구간이고, 그 postings도 이어져 있다.
+class DefectIndex:
+    def __init__(self, path):
+        self.path = path
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in INDEX_ARRAYS}
+        self.terms = arrays["terms"]
+        self.offsets = arrays["offsets"]
+        self.postings = arrays["postings"]
+        self.years = arrays["years"]
+        self.types = arrays["types"]
+        self.subtypes = arrays["subtypes"]
+        self.type_codes = {name: code for code, name in enumerate(arrays["type_names"].tolist())}
+        self.subtype_codes = {name: code for code, name in enumerate(arrays["subtype_names"].tolist())}
+
+    # 단어 구간 [lo, hi): 일치 검색은 한 단어, 접두어 검색은 접두어로 시작하는 모든 단어
+    def term_range(self, term, prefix=False):
+        lo = int(np.searchsorted(self.terms, term, side="left"))
+        if prefix:
+            hi = int(np.searchsorted(self.terms, term + "\U0010ffff", side="left"))
+        else:
+            hi = lo + 1 if lo < len(self.terms) and self.terms[lo] == term else lo
+        return lo, hi
+
+    # 행 번호 배열 중 필터(연도, 유형, 발생유형)를 만족하는 것 (없는 유형이면 모두 제외)
+    def _filter_mask(self, rows, year=None, type_name=None, subtype=None):
+        mask = np.ones(len(rows), dtype=bool)
+        if year is not None:
+            mask &= self.years[rows] == year
+        if type_name is not None:
+            mask &= self.types[rows] == self.type_codes.get(type_name, -2)
+        if subtype is not None:
+            mask &= self.subtypes[rows] == self.subtype_codes.get(subtype, -2)
+        return mask
+
+    # 검색: 공백으로 나눈 검색어를 모두 포함하는 행 (끝에 *가 붙은 검색어는 접두어 검색)
+    # 반환: (행 번호 배열, [(단어, 필터 후 행 수), ...] 많은 순)
+    def search(self, query, year=None, type_name=None, subtype=None, prefix=False):
+        words = [normalize_term(word) for word in query.split()]
+        words = [word for word in words if word.rstrip(PREFIX_MARK)]
+        if not words:
+            return np.empty(0, dtype=np.int32), []
+
+        result = None
+        term_counts = []
+        for word in words:
+            word_prefix = prefix or word.endswith(PREFIX_MARK)
+            lo, hi = self.term_range(word.rstrip(PREFIX_MARK), word_prefix)
+            start, end = int(self.offsets[lo]), int(self.offsets[hi])
+            rows = np.asarray(self.postings[start:end])
+            mask = self._filter_mask(rows, year, type_name, subtype)
+            if hi > lo:
+                counts = np.add.reduceat(mask.astype(np.int64), np.asarray(self.offsets[lo:hi]) - start)
+                term_counts.extend(
+                    (str(self.terms[lo + i]), int(count)) for i, count in enumerate(counts) if count
+                )
+            matched = np.unique(rows[mask])
+            result = matched if result is None else np.intersect1d(result, matched, assume_unique=True)
+
+        term_counts.sort(key=lambda pair: (-pair[1], pair[0]))
+        return result, term_counts
+
+
+# 서명별 인덱스 폴더 경로
+def index_path(signature, cache_dir=CACHE_DIR):
+    return cache_path(signature, "index", cache_dir=cache_dir)
+
+
+# 인덱스 배열을 임시 폴더에 쓴 뒤 한 번에 교체 (다른 프로세스가 먼저 만들었으면 그것을 사용)
+def _write_index(arrays, target):
+    temp = f"{target}.{os.getpid()}.tmp"
+    os.makedirs(temp, exist_ok=True)
+    for name in INDEX_ARRAYS:
+        np.save(os.path.join(temp, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+    try:
+        os.replace(temp, target)
+    except OSError:
+        shutil.rmtree(temp, ignore_errors=True)
+
+
+# 인덱스 로딩: 같은 데이터 버전의 인덱스가 있으면 열고, 없으면 프레임에서 만들어 저장 (이전 인덱스는 삭제)
+def load_index(frame, signature, cache_dir=CACHE_DIR):
+    target = index_path(signature, cache_dir)
+    if not os.path.isdir(target):
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_index(build_index_arrays(frame), target)
+        remove_stale(target)
+    return DefectIndex(target)
@@ -0,0 +1,131 @@
+import os
+import heapq
+import pickle
+from collections import Counter
+
+import pandas as pd
+
+from defect_cube import CELL_COLUMNS, TOP_ACTIONS, DefectCube, explode_actions
+from defect_data import CACHE_DIR, DATA_FILE, REQUIRED_COLUMNS, cache_path, file_signature, remove_stale
+from text_cleaner import TextCleaner, load_stop_words
+
+# [설정]
+STREAM_CHUNK_ROWS = int(os.environ.get("ZOQ_CHUNK_ROWS", 200_000))      # 한 번에 읽는 CSV 행 수
+STREAM_MIN_BYTES = int(os.environ.get("ZOQ_STREAM_MIN_BYTES", 1 << 30))  # 이보다 큰 파일은 스트리밍 집계
+HEAVY_HITTER_CAPACITY = 1000   # 칸마다 추적하는 조치 내용 수 (Space-Saving 카운터 수)
+EXACT_TOP_ACTIONS = os.environ.get("ZOQ_EXACT_TOP", "0") == "1"        # 모든 조치 내용을 정확히 셀지 (메모리 제한 없음)
+
+
+# 상위 항목 근사 집계 (Space-Saving)
+# - 카운터가 capacity개로 고정되어 메모리가 일정하다.
+# - 가득 찬 상태에서 새 항목이 오면 가장 작은 카운터를 넘겨받는다 (횟수는 최대 그 값만큼 많게 추정됨).
+# - 전체 횟수의 1/capacity보다 많이 나온 항목은 반드시 남는다.
+class SpaceSaving:
+    def __init__(self, capacity=HEAVY_HITTER_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}   # 항목 -> 추정 횟수
+        self.errors = {}   # 항목 -> 넘겨받은 횟수 (과대 추정 한도)
+        self.heap = []     # (횟수, 항목), 오래된 값은 꺼낼 때 건너뜀
+
+    def update(self, item, weight=1):
+        if item in self.counts:
+            self.counts[item] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = weight
+            self.errors[item] = 0
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim]
+            del self.errors[victim]
+            self.counts[item] = floor + weight
+            self.errors[item] = floor
+        heapq.heappush(self.heap, (self.counts[item], item))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(count, key) for key, count in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def _pop_min(self):
+        while True:
+            count, item = heapq.heappop(self.heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    # 상위 n개 [(항목, 추정 횟수)] (횟수가 같으면 이름 순)
+    def top(self, n):
+        return sorted(self.counts.items(), key=lambda pair: (-pair[1], pair[0]))[:n]
+
+
+# 정확한 집계 (SpaceSaving과 같은 사용법)
+class ExactCounter:
+    def __init__(self):
+        self.counts = Counter()
+
+    def update(self, item, weight=1):
+        self.counts[item] += weight
+
+    def top(self, n):
+        return sorted(self.counts.items(), key=lambda pair: (-pair[1], pair[0]))[:n]
+
+
+# 스트리밍 집계를 쓸지: 파일이 STREAM_MIN_BYTES보다 크면 사용
+def use_streaming(signature):
+    return signature[1] >= STREAM_MIN_BYTES
+
+
+# CSV를 조각 단위로 읽어 집계 큐브 생성 (행 단위 데이터는 한 조각만 메모리에 둠)
+def stream_cube(path=DATA_FILE, chunk_rows=STREAM_CHUNK_ROWS, capacity=HEAVY_HITTER_CAPACITY,
+                exact=EXACT_TOP_ACTIONS, top_n=TOP_ACTIONS, cleaner=None):
+    cleaner = cleaner or TextCleaner(load_stop_words())
+    cell_counts = Counter()
+    counters = {}   # 칸 -> SpaceSaving 또는 ExactCounter
+
+    reader = pd.read_csv(path, usecols=REQUIRED_COLUMNS, chunksize=chunk_rows,
+                         on_bad_lines='skip', encoding='utf-8-sig')
+    for chunk in reader:
+        chunk = chunk.dropna(subset=REQUIRED_COLUMNS)
+        chunk['YEAR'] = pd.to_datetime(chunk['D_YMD'], errors='coerce').dt.year.astype('Int64')
+        chunk = chunk.dropna(subset=['YEAR'])
+        if chunk.empty:
+            continue
+        chunk['JOCHI_DESCR'] = cleaner.clean_series(chunk['JOCHI_DESCR'])
+
+        for cell, size in chunk.groupby(CELL_COLUMNS).size().items():
+            cell_counts[cell] += int(size)
+
+        # 조각 안에서 먼저 합친 뒤 (칸, 조치)마다 한 번만 갱신
+        action_counts = explode_actions(chunk).groupby(CELL_COLUMNS + ["ACTION"]).size()
+        for (year, type_name, subtype, action), size in action_counts.items():
+            cell = (year, type_name, subtype)
+            counter = counters.get(cell)
+            if counter is None:
+                counter = counters[cell] = ExactCounter() if exact else SpaceSaving(capacity)
+            counter.update(action, int(size))
+
+    index = pd.MultiIndex.from_tuples(list(cell_counts), names=CELL_COLUMNS)
+    series = pd.Series(list(cell_counts.values()), index=index, dtype='int64')
+    top_actions = {cell: counter.top(top_n) for cell, counter in counters.items()}
+    return DefectCube(series, top_actions)
+
+
+# 서명별 큐브 파일 경로
+def cube_path(signature, cache_dir=CACHE_DIR):
+    return cache_path(signature, "cube", "pkl", cache_dir)
+
+
+# 스트리밍 큐브 로딩: 같은 서명의 큐브 파일이 있으면 읽고, 없으면 만들어 저장 (이전 큐브 파일은 삭제)
+def load_stream_cube(path=DATA_FILE, cache_dir=CACHE_DIR, exact=EXACT_TOP_ACTIONS, stop_words=None):
+    cleaner = TextCleaner(load_stop_words() if stop_words is None else stop_words)
+    signature = file_signature(path) + (cleaner.key(), exact)
+    target = cube_path(signature, cache_dir)
+    if os.path.exists(target):
+        with open(target, "rb") as f:
+            return pickle.load(f)
+
+    cube = stream_cube(path, exact=exact, cleaner=cleaner)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp = f"{target}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        pickle.dump(cube, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp, target)
+    remove_stale(target)
+    return cube
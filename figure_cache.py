@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import plotly.io as pio
+
+import metrics
+from dashboard_data import SingleFlight
+
+# [설정]
+FIGURE_CACHE_ENTRIES = 256                 # 최대 보관 그림 수
+FIGURE_CACHE_BYTES = 256 * 1024 * 1024     # 최대 보관 크기 (직렬화한 HTML 길이 기준)
+PLOTLY_JS = "cdn"                          # 그림 HTML이 plotly.js를 불러오는 방법 (to_html의 include_plotlyjs)
+DEFAULT_FIGURE_HEIGHT = 450                # 레이아웃에 높이가 없는 그림의 표시 높이
+
+# 직렬화한 그림 (바꿀 수 없는 튜플이라 여러 세션이 그대로 공유해도 안전)
+SerializedFigure = namedtuple("SerializedFigure", ["html", "height", "traces"])
+
+
+# 그림을 화면에 보낼 HTML 조각으로 한 번만 직렬화
+# HTML에 그림 JSON이 들어 있으므로 보여줄 때마다 그림 객체를 만들거나 다시 직렬화하지 않는다.
+def serialize_figure(fig):
+    html = pio.to_html(fig, include_plotlyjs=PLOTLY_JS, full_html=False, default_width="100%",
+                       config={"responsive": True})
+    height = fig.layout.height or DEFAULT_FIGURE_HEIGHT
+    return SerializedFigure("<style>body { margin: 0; }</style>" + html, height, len(fig.data))
+
+
+# 만든 Plotly 그림을 직렬화해서 세션끼리 공유하는 LRU 캐시
+class FigureCache:
+    def __init__(self, max_entries=FIGURE_CACHE_ENTRIES, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version = None
+        self.entries = OrderedDict()   # key -> (SerializedFigure, 크기)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    # 캐시된 그림(SerializedFigure)을 돌려주고, 없으면 build()로 만들어 직렬화한 뒤 저장
+    def get_or_build(self, version, key, build):
+        key = (version,) + tuple(key)
+        with self._lock:
+            if version != self.version:
+                self._invalidate(version)
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        with metrics.timer("figure_build", chart=key[1]):
+            fig = self.flight.do(key, lambda: serialize_figure(build()))
+        size = len(fig.html)
+        with self._lock:
+            if version == self.version and key not in self.entries and size <= self.max_bytes:
+                self.entries[key] = (fig, size)
+                self.bytes += size
+                self._evict()
+        return fig
+
+    # 새 데이터 버전: 이전 버전 그림 삭제
+    def _invalidate(self, version):
+        self.version = version
+        self.entries.clear()
+        self.bytes = 0
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
@@ -0,0 +1,152 @@
+import threading
+
+import numpy as np
+
+# [설정]
+INDICATORS = {"sma": "단순 이동평균", "ema": "지수 이동평균", "rsi": "RSI", "bollinger": "볼린저 밴드", "vwap": "VWAP"}
+BOLLINGER_K = 2  # 볼린저 밴드 폭 (표준편차 배수)
+
+# 창 기반 지표: 새 행은 직전 (window - 1)행만 있으면 다시 계산 가능
+WINDOWED = ("sma", "bollinger", "vwap")
+
+
+# 지표 계산 (frame은 코인, 날짜 순 정렬; 모든 코인을 groupby 한 번으로 계산)
+# 반환: {컬럼 이름: frame과 같은 길이의 배열}
+def compute_indicator(frame, indicator, window):
+    codes = frame["code"]
+    close = frame["closing_price"]
+    grouped = close.groupby(codes, sort=False)
+
+    if indicator == "sma":
+        return {"sma": grouped.rolling(window).mean().to_numpy()}
+    if indicator == "ema":
+        return {"ema": grouped.ewm(span=window, adjust=False).mean().to_numpy()}
+    if indicator == "bollinger":
+        mid = grouped.rolling(window).mean().to_numpy()
+        std = grouped.rolling(window).std(ddof=0).to_numpy()
+        return {"bb_mid": mid, "bb_upper": mid + BOLLINGER_K * std, "bb_lower": mid - BOLLINGER_K * std}
+    if indicator == "vwap":
+        price_volume = (close * frame["volume"]).groupby(codes, sort=False).rolling(window).sum().to_numpy()
+        volume = frame["volume"].groupby(codes, sort=False).rolling(window).sum().to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {"vwap": price_volume / volume}
+    if indicator == "rsi":
+        # Wilder 방식: 상승폭/하락폭의 지수 평균 (alpha = 1 / window)
+        diff = grouped.diff()
+        avg_gain = diff.clip(lower=0).groupby(codes, sort=False).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+        avg_loss = (-diff.clip(upper=0)).groupby(codes, sort=False).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+        return {"rsi": _rsi(avg_gain, avg_loss), "_avg_gain": avg_gain, "_avg_loss": avg_loss}
+    raise ValueError(f"지원하지 않는 지표: {indicator}")
+
+
+def _rsi(avg_gain, avg_loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where((avg_loss == 0) & (avg_gain > 0), 100.0, rsi)
+
+
+# 재귀형 지표(EMA, RSI)의 마지막 상태에서 새 종가만큼 이어서 계산
+def _extend_recursive(indicator, window, values, old_close, new_close):
+    if indicator == "ema":
+        alpha = 2 / (window + 1)
+        ema = np.empty(len(new_close))
+        prev = values["ema"][-1]
+        for i, price in enumerate(new_close):
+            prev = alpha * price + (1 - alpha) * prev
+            ema[i] = prev
+        return {"ema": ema}
+
+    alpha = 1 / window
+    gains, losses = np.empty(len(new_close)), np.empty(len(new_close))
+    gain, loss, last = values["_avg_gain"][-1], values["_avg_loss"][-1], old_close
+    for i, price in enumerate(new_close):
+        change = price - last
+        # 첫 변화량이면 (이전 평균이 NaN) 그 값으로 시작
+        gain = max(change, 0) if np.isnan(gain) else (1 - alpha) * gain + alpha * max(change, 0)
+        loss = max(-change, 0) if np.isnan(loss) else (1 - alpha) * loss + alpha * max(-change, 0)
+        gains[i], losses[i], last = gain, loss, price
+    return {"rsi": _rsi(gains, losses), "_avg_gain": gains, "_avg_loss": losses}
+
+
+# 기술 지표 엔진
+# - (지표, 기간)별로 처음 요청될 때 모든 코인을 한 번에 계산하고 코인별 배열로 캐시한다.
+# - 데이터 버전이 바뀌면 코인마다 새로 붙은 캔들만 계산해서 뒤에 이어 붙인다.
+#   (과거 날짜가 채워지는 등 단순 추가가 아니면 그 (지표, 기간)을 다시 계산)
+# - 코인/기간 변경은 캐시 조회로 끝난다.
+# - 세션마다 보고 있는 데이터 버전이 다를 수 있으므로 호출마다 (버전, 인덱스)를 받는다.
+#   엔진 상태는 더 새 버전으로만 바뀌고, 이전 버전 세션은 자기 인덱스의 코인 데이터로 따로 계산한다 (캐시 안 함).
+class IndicatorEngine:
+    def __init__(self):
+        self.version = None
+        self.index = None
+        self._cache = {}   # (지표, 기간) -> {"version": 버전, "coins": {코인: {"dates", "close", "values"}}}
+        self._lock = threading.Lock()
+
+    # 새 버전의 코인별 인덱스를 반영 (같거나 이전 버전이면 그대로)
+    def update(self, version, index):
+        with self._lock:
+            self._advance(version, index)
+
+    def _advance(self, version, index):
+        if self.version is None or version > self.version:
+            self.version = version
+            self.index = index
+
+    # 한 코인의 지표 값 {컬럼: 배열} (index.get(code)와 같은 길이, 읽기 전용)
+    def get(self, version, index, code, indicator, window):
+        key = (indicator, int(window))
+        with self._lock:
+            self._advance(version, index)
+            if version == self.version:
+                entry = self._cache.get(key)
+                if entry is None or not self._extend(entry, key):
+                    entry = self._cache[key] = self._compute_all(key)
+                coin = entry["coins"].get(code)
+                return coin["values"] if coin else {}
+        coin_data = index.get(code)
+        return compute_indicator(coin_data, *key) if len(coin_data) else {}
+
+    # 모든 코인을 한 번에 계산해서 코인별로 나눠 저장
+    def _compute_all(self, key):
+        frame = self.index.frame
+        values = compute_indicator(frame, *key)
+        coins = {}
+        for code, part in self.index.slices.items():
+            coins[code] = {
+                "dates": frame["date"].iloc[part].to_numpy(),
+                "close": frame["closing_price"].iloc[part].to_numpy(),
+                "values": {name: array[part].copy() for name, array in values.items()},
+            }
+        return {"version": self.version, "coins": coins}
+
+    # 새 버전에서 코인마다 뒤에 붙은 캔들만 계산 (단순 추가가 아니면 False)
+    def _extend(self, entry, key):
+        if entry["version"] == self.version:
+            return True
+        indicator, window = key
+        updated = {}
+        for code in self.index.codes:
+            coin_data = self.index.get(code)
+            dates = coin_data["date"].to_numpy()
+            close = coin_data["closing_price"].to_numpy()
+            old = entry["coins"].get(code)
+            if old is None:
+                values = compute_indicator(coin_data, indicator, window)
+            else:
+                n_old = len(old["dates"])
+                if len(dates) < n_old or not np.array_equal(dates[:n_old], old["dates"]):
+                    return False
+                if len(dates) == n_old:
+                    updated[code] = old
+                    continue
+                if indicator in WINDOWED:
+                    lookback = coin_data.iloc[max(0, n_old - window + 1):]
+                    tail = {name: array[-(len(dates) - n_old):]
+                            for name, array in compute_indicator(lookback, indicator, window).items()}
+                else:
+                    tail = _extend_recursive(indicator, window, old["values"], old["close"][-1], close[n_old:])
+                values = {name: np.concatenate([old["values"][name], tail[name]]) for name in old["values"]}
+            updated[code] = {"dates": dates, "close": close, "values": values}
+        entry["coins"] = updated
+        entry["version"] = self.version
+        return True
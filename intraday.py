@@ -0,0 +1,238 @@
+import json
+import time
+import signal
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# [설정]
+DEFAULT_INTRADAY_TABLE = "upbit_intraday"
+BAR_MINUTES = 5            # 분봉을 묶을 봉 간격 (분)
+POLL_SECONDS = 10          # 분봉 API 조회 간격 (초)
+FLUSH_SECONDS = 30         # 이 시간마다 변경된 봉을 저장 (초)
+FLUSH_BARS = 500           # 변경된 봉이 이만큼 쌓이면 바로 저장
+MAX_BARS_PER_MARKET = 8    # 마켓당 메모리에 들고 있는 최대 봉 수 (넘으면 바로 저장 후 정리)
+
+INTRADAY_COLUMNS = [
+    "code", "bar_minutes", "bar_time", "opening_price", "high_price",
+    "low_price", "closing_price", "volume",
+]
+
+
+# 장중 봉 테이블 생성 (같은 봉은 (code, bar_minutes, bar_time)으로 한 행만 존재)
+def create_intraday_table(connection, table=DEFAULT_INTRADAY_TABLE):
+    cursor = connection.cursor()
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {table} (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        code VARCHAR(20) NOT NULL,               -- 마켓 코드 (예: KRW-BTC)
+        bar_minutes SMALLINT NOT NULL,           -- 봉 간격 (분)
+        bar_time DATETIME NOT NULL,              -- 봉 시작 시각 (KST)
+        opening_price DOUBLE NOT NULL,           -- 시가
+        high_price DOUBLE NOT NULL,              -- 고가
+        low_price DOUBLE NOT NULL,               -- 저가
+        closing_price DOUBLE NOT NULL,           -- 종가
+        volume DOUBLE NOT NULL,                  -- 거래량
+        UNIQUE(code, bar_minutes, bar_time)
+    );
+    """)
+    connection.commit()
+    cursor.close()
+
+
+# 'YYYY-MM-DDTHH:MM:SS' (KST) 문자열을 datetime으로 변환
+def parse_kst(value):
+    return datetime.fromisoformat(value[:19])
+
+
+# 봉 하나: 구성 분봉을 분 시각별로 보관하므로 같은 분봉이 다시 와도 최신 값으로 교체된다.
+# (진행 중인 분봉은 조회할 때마다 값이 바뀌기 때문)
+class Bar:
+    __slots__ = ("minutes",)
+
+    def __init__(self):
+        self.minutes = {}
+
+    def update(self, minute, candle):
+        self.minutes[minute] = (
+            candle["opening_price"],
+            candle["high_price"],
+            candle["low_price"],
+            candle["trade_price"],
+            candle["candle_acc_trade_volume"],
+        )
+
+    # (시가, 고가, 저가, 종가, 거래량)
+    def ohlcv(self):
+        ordered = [self.minutes[m] for m in sorted(self.minutes)]
+        return (
+            ordered[0][0],
+            max(c[1] for c in ordered),
+            min(c[2] for c in ordered),
+            ordered[-1][3],
+            sum(c[4] for c in ordered),
+        )
+
+
+# 분봉을 고정 간격 봉으로 묶는 집계기
+# 마켓마다 가장 최근 분봉 기준으로 "직전 봉 시작"보다 오래된 분봉은 받지 않는다.
+# 분봉 조회 한 번이 직전 봉과 현재 봉을 완전히 덮도록 요청하므로, 재시작 후에도
+# 불완전한 봉으로 기존 행을 덮어쓰지 않고 같은 값을 다시 저장(upsert)하게 된다.
+class BarAggregator:
+    def __init__(self, bar_minutes=BAR_MINUTES, max_bars=MAX_BARS_PER_MARKET):
+        self.bar_minutes = bar_minutes
+        self.max_bars = max_bars
+        self.bars = {}        # 마켓 -> OrderedDict(봉 시작 시각 -> Bar)
+        self.latest = {}      # 마켓 -> 가장 최근 분봉 시각
+        self.dirty = set()    # 마지막 저장 이후 바뀐 (마켓, 봉 시작 시각)
+        self.late = 0         # 너무 늦게 와서 버린 분봉 수
+        self.overflow = False
+
+    def bar_start(self, minute):
+        offset = (minute.hour * 60 + minute.minute) % self.bar_minutes
+        return minute.replace(second=0, microsecond=0) - timedelta(minutes=offset)
+
+    # 이 시각보다 오래된 분봉은 버림 (직전 봉의 시작 시각)
+    def horizon(self, market):
+        latest = self.latest.get(market)
+        if latest is None:
+            return None
+        return self.bar_start(latest) - timedelta(minutes=self.bar_minutes)
+
+    def add(self, candle):
+        market = candle["market"]
+        minute = parse_kst(candle["candle_date_time_kst"])
+        if market not in self.latest or minute > self.latest[market]:
+            self.latest[market] = minute
+        if minute < self.horizon(market):
+            self.late += 1
+            return
+
+        start = self.bar_start(minute)
+        bars = self.bars.setdefault(market, OrderedDict())
+        bar = bars.get(start)
+        if bar is None:
+            bar = bars[start] = Bar()
+            if len(bars) > self.max_bars:
+                self.overflow = True
+        bar.update(minute, candle)
+        self.dirty.add((market, start))
+
+    def add_many(self, candles):
+        for candle in candles:
+            self.add(candle)
+
+    def needs_flush(self, flush_bars=FLUSH_BARS):
+        return self.overflow or len(self.dirty) >= flush_bars
+
+    # 바뀐 봉을 저장용 행 튜플로 꺼냄
+    def pending_rows(self):
+        rows = []
+        for market, start in sorted(self.dirty):
+            bar = self.bars[market][start]
+            rows.append((market, self.bar_minutes, start) + bar.ohlcv())
+        return rows
+
+    # 저장 완료 후 변경 표시를 지우고, 더 이상 바뀔 수 없는 오래된 봉을 메모리에서 정리
+    def mark_flushed(self):
+        self.dirty.clear()
+        self.overflow = False
+        for market, bars in self.bars.items():
+            horizon = self.horizon(market)
+            while bars and next(iter(bars)) < horizon:
+                bars.popitem(last=False)
+
+
+# 장중 봉 저장기: 연결 하나로 변경된 봉을 한 번에 upsert하고 커밋
+# 같은 봉을 여러 번 저장해도 마지막 값으로 덮어쓰므로 재시작해도 중복 행이 생기지 않는다.
+class IntradayBarWriter:
+    def __init__(self, connection, table=DEFAULT_INTRADAY_TABLE):
+        self.connection = connection
+        self.table = table
+        self.total_written = 0
+        updates = ", ".join(f"{c} = VALUES({c})" for c in INTRADAY_COLUMNS[3:])
+        self.upsert_query = f"""
+        INSERT INTO {table}
+        ({', '.join(INTRADAY_COLUMNS)})
+        VALUES ({', '.join(['%s'] * len(INTRADAY_COLUMNS))})
+        ON DUPLICATE KEY UPDATE {updates};
+        """
+
+    def write(self, rows):
+        if not rows:
+            return 0
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(self.upsert_query, rows)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        self.total_written += len(rows)
+        return len(rows)
+
+    def close(self):
+        self.connection.close()
+
+
+# 업비트 분봉 API를 주기적으로 조회하는 소스
+# 한 번에 직전 봉 + 현재 봉을 모두 덮도록 2 * bar_minutes개를 요청한다.
+def poll_source(client, markets, bar_minutes=BAR_MINUTES, poll_seconds=POLL_SECONDS, stop=None):
+    stop = stop or threading.Event()
+    count = min(200, bar_minutes * 2)
+    while not stop.is_set():
+        started = time.monotonic()
+        results = client.map_markets(lambda market: client.fetch_minute_candles(market, 1, count), markets)
+        # API는 최신 분봉부터 돌려주므로 그대로 넣으면 집계기가 먼저 최신 시각을 알고
+        # 직전 봉보다 오래된 (불완전할 수 있는) 분봉은 버린다
+        yield [c for candles in results.values() if candles for c in candles]
+        stop.wait(max(0.0, poll_seconds - (time.monotonic() - started)))
+
+
+# 파일에 저장된 분봉(JSON Lines, 한 줄에 업비트 분봉 응답 하나)을 재생하는 소스 (테스트용)
+def replay_source(path, batch_size=100, delay=0.0, stop=None):
+    batch = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if stop is not None and stop.is_set():
+                break
+            line = line.strip()
+            if not line:
+                continue
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+                if delay:
+                    time.sleep(delay)
+    if batch:
+        yield batch
+
+
+# SIGTERM을 받으면 stop 이벤트를 세워 루프가 남은 봉을 저장하고 끝나게 함
+def install_stop_handler(stop):
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+
+# 데몬 루프: 소스에서 분봉을 받아 집계하고, 시간 또는 개수 기준으로 묶어서 저장
+def run_stream(source, aggregator, writer, flush_seconds=FLUSH_SECONDS, flush_bars=FLUSH_BARS):
+    def flush():
+        rows = aggregator.pending_rows()
+        writer.write(rows)
+        aggregator.mark_flushed()
+        if rows:
+            print(f"장중 봉 {len(rows)}개 저장 (누적 {writer.total_written}개, 늦게 도착해 버린 분봉 {aggregator.late}개)")
+
+    last_flush = time.monotonic()
+    try:
+        for batch in source:
+            aggregator.add_many(batch)
+            if aggregator.needs_flush(flush_bars) or time.monotonic() - last_flush >= flush_seconds:
+                flush()
+                last_flush = time.monotonic()
+    except KeyboardInterrupt:
+        print("중단 요청을 받았습니다.")
+    finally:
+        flush()
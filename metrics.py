@@ -0,0 +1,155 @@
+import os
+import time
+import threading
+from contextlib import contextmanager, nullcontext
+
+# [설정]
+METRICS_ENABLED = os.environ.get("UPBIT_METRICS", "0") == "1"      # 시간/횟수 기록 여부 (꺼져 있으면 거의 비용 없음)
+METRICS_FILE = os.environ.get("UPBIT_METRICS_FILE", "upbit_metrics.prom")  # Prometheus 텍스트 파일 경로
+VERBOSE_PAYLOADS = os.environ.get("UPBIT_VERBOSE", "0") == "1"     # API 응답 전체를 출력할지 (디버깅용)
+METRIC_PREFIX = "upbit_"
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_timers = {}     # (이름, 라벨) -> [횟수, 합계(초), 최대(초)]
+_counters = {}   # (이름, 라벨) -> 값
+_NULL = nullcontext()
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def enabled():
+    return _enabled
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+# 구간 시간 기록: with timer("http_fetch", market="KRW-BTC"): ...
+def timer(name, **labels):
+    if not _enabled:
+        return _NULL
+    return _timed(name, labels)
+
+
+@contextmanager
+def _timed(name, labels):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+# 측정한 시간 한 건 추가
+def observe(name, seconds, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        entry = _timers.get(key)
+        if entry is None:
+            _timers[key] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+
+# 횟수 증가: count("rows_written", 10)
+def count(name, value=1, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+# 다른 프로세스로 넘길 수 있는 현재 값 복사본
+def dump():
+    with _lock:
+        return {"timers": {k: list(v) for k, v in _timers.items()}, "counters": dict(_counters)}
+
+
+# 워커 프로세스에서 받은 dump() 결과 합치기
+def merge(data):
+    with _lock:
+        for key, (n, total, peak) in data["timers"].items():
+            entry = _timers.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += n
+            entry[1] += total
+            entry[2] = max(entry[2], peak)
+        for key, value in data["counters"].items():
+            _counters[key] = _counters.get(key, 0) + value
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+
+# 표로 보여줄 행 [{"이름", "라벨", "횟수", "합계", "평균", "최대"}] (시간은 ms)
+def rows():
+    with _lock:
+        result = []
+        for (name, labels), (n, total, peak) in sorted(_timers.items()):
+            result.append({
+                "이름": name,
+                "라벨": ", ".join(f"{k}={v}" for k, v in labels),
+                "횟수": n,
+                "합계(ms)": round(total * 1000, 1),
+                "평균(ms)": round(total / n * 1000, 2),
+                "최대(ms)": round(peak * 1000, 1),
+            })
+        for (name, labels), value in sorted(_counters.items()):
+            result.append({"이름": name, "라벨": ", ".join(f"{k}={v}" for k, v in labels), "횟수": value})
+        return result
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+# Prometheus 텍스트 형식으로 변환 (시간은 summary의 _count/_sum, 최대값은 따로 _max 게이지)
+# 같은 이름의 줄은 한 묶음으로 모아야 하므로 이름별로 정리해서 출력한다.
+def export_prometheus():
+    data = dump()
+    timers, counters = {}, {}
+    for (name, labels), entry in data["timers"].items():
+        timers.setdefault(name, []).append((labels, entry))
+    for (name, labels), value in data["counters"].items():
+        counters.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, series in sorted(timers.items()):
+        metric = f"{METRIC_PREFIX}{name}_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for labels, (n, total, _) in sorted(series):
+            lines.append(f"{metric}_count{_format_labels(labels)} {n}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total:.6f}")
+        lines.append(f"# TYPE {metric}_max gauge")
+        for labels, (_, _, peak) in sorted(series):
+            lines.append(f"{metric}_max{_format_labels(labels)} {peak:.6f}")
+    for name, series in sorted(counters.items()):
+        metric = f"{METRIC_PREFIX}{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for labels, value in sorted(series):
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# Prometheus 텍스트 파일로 저장 (node_exporter textfile 수집기용, 임시 파일 후 교체)
+def write_prometheus(path=METRICS_FILE):
+    temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp, "w", encoding="utf-8") as f:
+        f.write(export_prometheus())
+    os.replace(temp, path)
@@ -0,0 +1,135 @@
+import argparse
+import time
+import pymysql
+from compact_schema import (
+    MARKET_TABLE, COMPACT_COLUMNS, compact_table_name, create_compact_tables, create_compat_view, is_compact,
+)
+
+# [설정]
+DB_HOST = "localhost"
+DB_USER = "alswnddldy"
+DB_PASSWORD = "1234"
+DB_NAME = "alswnddldy"
+TABLE_NAME = "upbit_data"
+CHUNK_SIZE = 5000  # 한 번에 옮기고 커밋할 id 범위
+PAUSE_SECONDS = 0.1  # 청크 사이 쉬는 시간 (운영 중인 수집기/대시보드에 주는 부하 조절)
+LEGACY_SUFFIX = "_legacy"  # 전환 후 기존 테이블 이름 접미사 (확인 후 직접 삭제)
+
+
+# id 범위 (low, high] 의 행을 압축 테이블로 복사 (여러 번 실행해도 같은 결과)
+def copy_range(connection, source, table, low, high):
+    target = compact_table_name(table)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"INSERT IGNORE INTO {MARKET_TABLE} (code) SELECT DISTINCT code FROM {source} WHERE id > %s AND id <= %s",
+            (low, high),
+        )
+        copied = cursor.execute(
+            f"""
+            INSERT INTO {target} ({', '.join(COMPACT_COLUMNS)})
+            SELECT d.id, m.code_id, d.date, d.opening_price, d.closing_price,
+                   d.high_price, d.low_price, d.volume, d.prev_closing_price
+            FROM {source} d
+            JOIN {MARKET_TABLE} m ON m.code = d.code
+            WHERE d.id > %s AND d.id <= %s
+            ON DUPLICATE KEY UPDATE {target}.id = {target}.id;
+            """,
+            (low, high),
+        )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return copied
+
+
+def max_id(connection, table):
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+    value = cursor.fetchone()[0]
+    cursor.close()
+    return value
+
+
+# source의 last_id 이후 행을 chunk_size 단위로 복사
+# 복사하는 동안 새로 들어온 행이 있으면 더 없을 때까지 이어서 복사하고, 마지막으로 복사한 id를 반환
+def copy_rows(connection, source, table, last_id, chunk_size=CHUNK_SIZE, pause=PAUSE_SECONDS):
+    while True:
+        end = max_id(connection, source)
+        if end <= last_id:
+            return last_id
+        started = time.monotonic()
+        while last_id < end:
+            high = min(last_id + chunk_size, end)
+            copied = copy_range(connection, source, table, last_id, high)
+            print(f"복사: id {last_id + 1} ~ {high} ({copied}행)")
+            last_id = high
+            time.sleep(pause)
+        print(f"{end}까지 복사 완료 ({time.monotonic() - started:.1f}초)")
+
+
+def count_rows(connection, table):
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    value = cursor.fetchone()[0]
+    cursor.close()
+    return value
+
+
+# 기존 테이블을 _legacy로 바꾸고 남은 행을 옮긴 뒤 같은 이름의 호환 뷰 생성
+# 이름을 바꾸는 순간부터 뷰가 생길 때까지(남은 행 복사 시간) 쓰기가 실패하므로 수집기가 돌지 않을 때 실행한다.
+def swap(connection, table, last_id):
+    legacy = f"{table}{LEGACY_SUFFIX}"
+    cursor = connection.cursor()
+    cursor.execute(f"RENAME TABLE {table} TO {legacy}")
+    cursor.close()
+    copy_rows(connection, legacy, table, last_id, pause=0)
+    create_compat_view(connection, table)
+
+    before, after = count_rows(connection, legacy), count_rows(connection, compact_table_name(table))
+    print(f"전환 완료: {legacy} {before}행 -> {compact_table_name(table)} {after}행")
+    if before != after:
+        print("경고: 행 수가 다릅니다. 기존 테이블을 지우기 전에 확인하세요.")
+
+
+# 명령행 옵션
+def parse_args():
+    parser = argparse.ArgumentParser(description="upbit_data를 압축 스키마(마켓 사전 + (code_id, date) 기본 키)로 옮김")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="한 번에 복사할 id 범위")
+    parser.add_argument("--pause", type=float, default=PAUSE_SECONDS, help="청크 사이 쉬는 시간 (초)")
+    parser.add_argument("--partition-by-year", action="store_true", help="압축 테이블을 연도별로 파티션")
+    parser.add_argument("--swap", action="store_true", help="복사가 끝나면 기존 테이블을 호환 뷰로 교체")
+    return parser.parse_args()
+
+
+# 메인 실행 (중단해도 다시 실행하면 이어서 복사)
+def main():
+    args = parse_args()
+    connection = pymysql.connect(
+        host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
+    )
+    try:
+        if is_compact(connection, TABLE_NAME):
+            print("이미 압축 스키마로 전환되었습니다.")
+            return
+        create_compact_tables(connection, TABLE_NAME, partition_by_year=args.partition_by_year)
+
+        # 압축 테이블의 가장 큰 id까지는 이미 복사된 것으로 보고 이어서 진행
+        last_id = max_id(connection, compact_table_name(TABLE_NAME))
+        if last_id:
+            print(f"id {last_id}까지 복사되어 있어 이어서 진행합니다.")
+        last_id = copy_rows(connection, TABLE_NAME, TABLE_NAME, last_id, args.chunk_size, args.pause)
+
+        if args.swap:
+            swap(connection, TABLE_NAME, last_id)
+        else:
+            print("복사 완료. 수집기를 멈춘 상태에서 --swap으로 다시 실행하면 전환합니다.")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
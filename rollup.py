@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+# [설정]
+ROLLUP_SUFFIXES = {"week": "_weekly", "month": "_monthly"}  # 일봉 테이블 이름 뒤에 붙는 집계 테이블 접미사
+
+ROLLUP_COLUMNS = [
+    "code", "period_start", "period_end", "opening_price", "closing_price",
+    "high_price", "low_price", "volume", "prev_closing_price", "days",
+]
+
+
+# 집계 테이블 이름 (예: upbit_data_weekly)
+def rollup_table_name(table, resolution):
+    return f"{table}{ROLLUP_SUFFIXES[resolution]}"
+
+
+# 날짜가 속한 기간의 시작일 (주: 월요일, 월: 1일)
+def period_start(day, resolution):
+    if resolution == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+# 기간의 마지막 날
+def period_end(start, resolution):
+    if resolution == "week":
+        return start + timedelta(days=6)
+    next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+# 주봉/월봉 집계 테이블 생성
+def create_rollup_tables(connection, table):
+    cursor = connection.cursor()
+    for resolution in ROLLUP_SUFFIXES:
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {rollup_table_name(table, resolution)} (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            code VARCHAR(20) NOT NULL,               -- 마켓 코드 (예: KRW-BTC)
+            period_start DATE NOT NULL,              -- 기간 시작일 (주: 월요일, 월: 1일)
+            period_end DATE NOT NULL,                -- 기간 안의 마지막 일봉 날짜
+            opening_price DOUBLE NOT NULL,           -- 기간 첫 일봉의 시가
+            closing_price DOUBLE NOT NULL,           -- 기간 마지막 일봉의 종가
+            high_price DOUBLE NOT NULL,              -- 기간 고가
+            low_price DOUBLE NOT NULL,               -- 기간 저가
+            volume DOUBLE NOT NULL,                  -- 기간 거래량 합계
+            prev_closing_price DOUBLE NOT NULL,      -- 기간 첫 일봉의 전일 종가
+            days INT NOT NULL,                       -- 기간에 포함된 일봉 수
+            UNIQUE(code, period_start)
+        );
+        """)
+    connection.commit()
+    cursor.close()
+
+
+# 날짜 순 일봉 행 [(date, open, close, high, low, volume, prev_close), ...]을 기간별 집계 행으로 변환
+def aggregate_periods(code, rows, resolution):
+    periods = {}
+    for row in rows:
+        periods.setdefault(period_start(row[0], resolution), []).append(row)
+    result = []
+    for start, days in periods.items():
+        result.append((
+            code, start, days[-1][0],
+            days[0][1], days[-1][2],
+            max(d[3] for d in days), min(d[4] for d in days),
+            sum(d[5] for d in days), days[0][6], len(days),
+        ))
+    return result
+
+
+# 새로 저장된 일봉이 속한 주/월 기간을 일봉 테이블에서 다시 집계해서 upsert
+# touched: {code: (가장 이른 날짜, 가장 늦은 날짜)}  그 사이의 모든 기간을 다시 계산한다.
+def update_rollups(connection, table, touched):
+    if not touched:
+        return 0
+    updates = ", ".join(f"{c} = VALUES({c})" for c in ROLLUP_COLUMNS[2:])
+    cursor = connection.cursor()
+    written = 0
+    try:
+        for code, (first, last) in touched.items():
+            # 기간마다 시작일~마지막 날을 통째로 읽어야 하므로 주/월을 따로 조회한다
+            # (둘을 합친 범위로 읽으면 범위 끝에 걸친 기간이 일부 일봉만으로 덮어써짐)
+            for resolution in ROLLUP_SUFFIXES:
+                start = period_start(first, resolution)
+                end = period_end(period_start(last, resolution), resolution)
+                cursor.execute(
+                    f"""
+                    SELECT date, opening_price, closing_price, high_price, low_price, volume, prev_closing_price
+                    FROM {table}
+                    WHERE code = %s AND date BETWEEN %s AND %s
+                    ORDER BY date ASC;
+                    """,
+                    (code, start, end),
+                )
+                rollup_rows = aggregate_periods(code, cursor.fetchall(), resolution)
+                if not rollup_rows:
+                    continue
+                cursor.executemany(
+                    f"""
+                    INSERT INTO {rollup_table_name(table, resolution)}
+                    ({', '.join(ROLLUP_COLUMNS)})
+                    VALUES ({', '.join(['%s'] * len(ROLLUP_COLUMNS))})
+                    ON DUPLICATE KEY UPDATE {updates};
+                    """,
+                    rollup_rows,
+                )
+                written += len(rollup_rows)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return written
+
+
+# 일봉 테이블 전체를 기준으로 집계 테이블을 다시 만듦 (처음 도입할 때 한 번 실행)
+def rebuild_rollups(connection, table):
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT code, MIN(date), MAX(date) FROM {table} GROUP BY code")
+    touched = {code: (first, last) for code, first, last in cursor.fetchall()}
+    cursor.close()
+    return update_rollups(connection, table, touched)
@@ -0,0 +1,207 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import compact_source, compact_table_name, is_compact
+from dashboard_data import ID_OVERLAP
+
+# [설정]
+SNAPSHOT_DIR = os.environ.get("UPBIT_SNAPSHOT_DIR", "snapshot")  # 로컬 컬럼 스냅샷 위치
+DEFAULT_TABLE_NAME = "upbit_data"
+META_FILE = "meta.json"
+
+# 코인 폴더마다 컬럼 하나당 .npy 파일 하나로 저장 (date는 datetime64[ns])
+SNAPSHOT_COLUMNS = [
+    "date", "opening_price", "closing_price", "prev_closing_price", "volume",
+    "change_rate", "price_change", "cumulative_volume",
+]
+
+
+# 새 행 배열에 파생 컬럼 추가 (base: 직전까지의 누적 거래량)
+def add_derived_arrays(arrays, base=0.0):
+    arrays["change_rate"] = (arrays["closing_price"] - arrays["opening_price"]) / arrays["opening_price"] * 100
+    arrays["price_change"] = arrays["closing_price"] - arrays["prev_closing_price"]
+    arrays["cumulative_volume"] = base + np.cumsum(arrays["volume"])
+    return arrays
+
+
+# 조회한 행 [(date, open, close, prev_close, volume), ...]을 컬럼 배열로 변환
+def rows_to_arrays(rows):
+    frame = pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS[:5])
+    arrays = {"date": pd.to_datetime(frame["date"]).to_numpy(dtype="datetime64[ns]")}
+    for column in SNAPSHOT_COLUMNS[1:5]:
+        arrays[column] = frame[column].to_numpy(dtype=np.float64)
+    return arrays
+
+
+# upbit_data의 로컬 컬럼 스냅샷
+# - 코인별 폴더에 컬럼별 .npy 파일로 저장하고 읽을 때는 메모리 매핑으로 연다 (행 튜플 변환 없음).
+# - sync()는 마지막으로 반영한 id 직전 ID_OVERLAP 구간부터 DB에서 읽어, 스냅샷에 없는 날짜만 코인별로 이어 붙인다.
+#   (병렬 수집기는 id 순서대로 커밋하지 않으므로 지난 sync 뒤에 커밋된 더 작은 id도 다시 확인)
+#   과거 날짜가 끼어든 코인(백필)은 그 코인만 DB에서 다시 읽어 새로 쓴다.
+# - 파일 이름에 세대 번호를 붙이고 meta.json을 마지막에 바꾸므로,
+#   읽는 쪽은 항상 meta.json이 가리키는 완성된 파일만 본다.
+class ColumnarSnapshot:
+    def __init__(self, path=SNAPSHOT_DIR, table=DEFAULT_TABLE_NAME):
+        self.path = path
+        self.table = table
+
+    def _file(self, code, column, generation):
+        return os.path.join(self.path, code, f"{column}.{generation}.npy")
+
+    # meta.json: {"table", "last_id", "codes": {code: {"generation", "rows", "last_date"}}} (없으면 None)
+    def read_meta(self):
+        try:
+            with open(os.path.join(self.path, META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if meta.get("table") == self.table else None
+
+    def _write_meta(self, meta):
+        target = os.path.join(self.path, META_FILE)
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(target + ".tmp", target)
+
+    # 한 코인의 컬럼 배열 (읽기 전용 메모리 매핑)
+    def load_code(self, code, entry):
+        return {
+            column: np.load(self._file(code, column, entry["generation"]), mmap_mode="r")
+            for column in SNAPSHOT_COLUMNS
+        }
+
+    def _write_code(self, code, generation, arrays):
+        os.makedirs(os.path.join(self.path, code), exist_ok=True)
+        for column in SNAPSHOT_COLUMNS:
+            target = self._file(code, column, generation)
+            with open(target + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(arrays[column]))
+            os.replace(target + ".tmp", target)
+
+    # 이전 세대 파일 삭제 (이미 열어 둔 메모리 매핑은 그대로 유효)
+    def _remove_generation(self, code, generation):
+        for column in SNAPSHOT_COLUMNS:
+            try:
+                os.remove(self._file(code, column, generation))
+            except FileNotFoundError:
+                pass
+
+    # 스냅샷을 프레임으로 읽음: (마지막 id, 프레임)  스냅샷이 없으면 (0, None)
+    # start_date 이전 행은 버리고 누적 거래량도 start_date부터의 누적으로 맞춘다.
+    def load(self, start_date=None):
+        for _ in range(2):
+            meta = self.read_meta()
+            if meta is None or not meta["codes"]:
+                return 0, None
+            try:
+                return meta["last_id"], self._load_frame(meta, start_date)
+            except FileNotFoundError:
+                # 읽는 도중 sync()가 세대를 바꿨으면 새 meta.json으로 한 번 더 시도
+                continue
+        return 0, None
+
+    def _load_frame(self, meta, start_date):
+        start = np.datetime64(pd.Timestamp(start_date)) if start_date else None
+        parts, codes = [], []
+        for code, entry in meta["codes"].items():
+            arrays = self.load_code(code, entry)
+            first = int(np.searchsorted(arrays["date"], start)) if start is not None else 0
+            if first >= entry["rows"]:
+                continue
+            part = {column: arrays[column][first:entry["rows"]] for column in SNAPSHOT_COLUMNS}
+            if first > 0:
+                part["cumulative_volume"] = part["cumulative_volume"] - (
+                    arrays["cumulative_volume"][first] - arrays["volume"][first]
+                )
+            parts.append(part)
+            codes.append(np.full(entry["rows"] - first, code, dtype=object))
+        if not parts:
+            return None
+        frame = pd.DataFrame({column: np.concatenate([part[column] for part in parts]) for column in SNAPSHOT_COLUMNS})
+        frame.insert(1, "code", np.concatenate(codes))
+        return frame.sort_values("date", kind="stable", ignore_index=True)
+
+    # DB에서 마지막 반영 이후의 행을 읽어 스냅샷에 반영하고 새로 반영한 행 수를 반환
+    # compact=None이면 테이블이 압축 스키마 호환 뷰인지 확인해서, 뷰면 본 테이블의 id 인덱스로 읽는다.
+    def sync(self, connection, compact=None):
+        compact = is_compact(connection, self.table) if compact is None else compact
+        source = compact_source(self.table) if compact else f"{self.table} d"
+        os.makedirs(self.path, exist_ok=True)
+        meta = self.read_meta() or {"table": self.table, "last_id": 0, "codes": {}}
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"SELECT MAX(id) FROM {compact_table_name(self.table) if compact else self.table}")
+            max_id = cursor.fetchone()[0] or 0
+            if max_id < meta["last_id"]:
+                # 테이블이 다시 만들어졌으면 처음부터
+                meta = {"table": self.table, "last_id": 0, "codes": {}}
+
+            cursor.execute(
+                f"""
+                SELECT code, date, opening_price, closing_price, prev_closing_price, volume
+                FROM {source}
+                WHERE d.id > %s AND d.id <= %s
+                ORDER BY code ASC, date ASC;
+                """,
+                (max(0, meta["last_id"] - ID_OVERLAP), max_id),
+            )
+            by_code = {}
+            for row in cursor.fetchall():
+                by_code.setdefault(row[0], []).append(row[1:])
+
+            replaced = []
+            added = 0
+            for code, rows in by_code.items():
+                entry = meta["codes"].get(code)
+                new = rows_to_arrays(rows)
+                if entry is not None:
+                    # 확인 구간에서 이미 스냅샷에 있는 날짜는 버림
+                    old_dates = self.load_code(code, entry)["date"][:entry["rows"]]
+                    fresh = ~np.isin(new["date"], old_dates)
+                    if not fresh.any():
+                        continue
+                    new = {column: values[fresh] for column, values in new.items()}
+                added += len(new["date"])
+                last_date = np.datetime64(entry["last_date"]) if entry else None
+                if entry is None:
+                    arrays = add_derived_arrays(new)
+                elif new["date"][0] > last_date:
+                    # 뒤에 붙는 날짜만 있으면 기존 파일 + 새 행
+                    old = self.load_code(code, entry)
+                    add_derived_arrays(new, float(old["cumulative_volume"][entry["rows"] - 1]))
+                    arrays = {column: np.concatenate([old[column][:entry["rows"]], new[column]])
+                              for column in SNAPSHOT_COLUMNS}
+                else:
+                    # 과거 날짜가 채워짐: 이 코인만 DB에서 다시 읽음
+                    cursor.execute(
+                        f"""
+                        SELECT date, opening_price, closing_price, prev_closing_price, volume
+                        FROM {source}
+                        WHERE code = %s AND d.id <= %s
+                        ORDER BY date ASC;
+                        """,
+                        (code, max_id),
+                    )
+                    arrays = add_derived_arrays(rows_to_arrays(cursor.fetchall()))
+                generation = entry["generation"] + 1 if entry else 1
+                self._write_code(code, generation, arrays)
+                if entry:
+                    replaced.append((code, entry["generation"]))
+                meta["codes"][code] = {
+                    "generation": generation,
+                    "rows": len(arrays["date"]),
+                    "last_date": str(arrays["date"][-1])[:10],
+                }
+        finally:
+            cursor.close()
+
+        if added == 0 and max_id == meta["last_id"]:
+            return 0
+        meta["last_id"] = max_id
+        self._write_meta(meta)
+        for code, generation in replaced:
+            self._remove_generation(code, generation)
+        return added
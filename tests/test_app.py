@@ -0,0 +1,66 @@
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+import bench
+from db_writer import CandleBatchWriter
+
+pymysql = pytest.importorskip("pymysql")
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+# 날짜 문자열을 MySQL처럼 date로 돌려주는 행 변환 (SQLite는 DATE 열도 문자열로 돌려줌)
+def mysql_row(cursor, row):
+    return tuple(
+        date.fromisoformat(value) if isinstance(value, str) and len(value) == 10 and value[4:5] == "-" else value
+        for value in row
+    )
+
+
+# 대시보드가 쓰는 MySQL 전용 부분(information_schema, DATABASE())만 채운 SQLite 연결
+class DashboardConnection(bench.SQLiteConnection):
+    def __init__(self, path):
+        super().__init__(path)
+        self.connection.row_factory = mysql_row
+        self.connection.create_function("DATABASE", 0, lambda: "main")
+        self.connection.execute("ATTACH ':memory:' AS information_schema")
+        self.connection.execute("CREATE TABLE information_schema.TABLES (TABLE_SCHEMA, TABLE_NAME, TABLE_TYPE)")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    path = str(tmp_path / "dashboard.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(bench.SQLITE_TABLE_DDL)
+    connection.close()
+    history = bench.generate_history(3, 60, end=date.today())
+    with CandleBatchWriter(bench.SQLiteConnection(path), bench.TABLE_NAME, verbose=False, compact=False) as writer:
+        for rows in history.values():
+            for row in rows:
+                writer.add(bench.row_to_candle(row), row[1])
+
+    monkeypatch.setattr(pymysql, "connect", lambda **kwargs: DashboardConnection(path))
+    monkeypatch.chdir(tmp_path)
+    return AppTest.from_file(APP_FILE, default_timeout=60).run()
+
+
+def test_sections_render_and_react_to_their_own_widgets(app):
+    assert not app.exception
+    app.selectbox[0].select("KRW-C000").run()
+    assert not app.exception
+    assert [radio.label for radio in app.radio] == ["롤링 상관관계 기간", "이동평균 종류", "상관관계 기간", "차트 렌더링"]
+
+    # 표 구역의 페이지 이동
+    [button for button in app.button if button.label == "다음 페이지"][0].click().run()
+    assert not app.exception
+    assert "2 페이지" in app.markdown[0].value
+
+    # 다른 구역의 위젯을 바꿔도 오류 없이 다시 그려지고, 표 구역의 페이지는 그대로
+    app.radio[0].set_value("90일").run()
+    app.radio[1].set_value("ema").run()
+    assert not app.exception
+    assert "2 페이지" in app.markdown[0].value
@@ -0,0 +1,73 @@
+import sqlite3
+
+import bench
+from backfill import PAGE_SIZE, fetch_missing_candles, find_missing_dates, run_backfill, to_date
+from db_writer import CandleBatchWriter
+
+
+# 업비트 일봉 API처럼 to 이전의 캔들을 최신순으로 count개까지 돌려주는 가짜 클라이언트
+class PagingClient:
+    def __init__(self, history):
+        self.history = history
+        self.max_concurrency = 2
+        self.calls = []
+
+    def fetch_candles(self, market, count, to):
+        self.calls.append((market, count, to))
+        candles = [bench.row_to_candle(row) for row in self.history[market]]
+        older = [c for c in candles if c["candle_date_time_kst"] < to[:19]]
+        return list(reversed(older[-count:]))
+
+
+def make_table(tmp_path, rows):
+    path = str(tmp_path / "backfill.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(bench.SQLITE_TABLE_DDL)
+    connection.executemany(
+        f"INSERT INTO {bench.TABLE_NAME} (date, code, opening_price, closing_price, high_price, low_price, "
+        "volume, prev_closing_price) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    connection.commit()
+    connection.close()
+    return path
+
+
+def test_pages_backwards_from_newest_gap(tmp_path):
+    history = bench.generate_history(1, 450)
+    market, rows = next(iter(history.items()))
+    # 상장 후 100일과 중간 10일이 빠진 상태
+    kept = rows[100:300] + rows[310:]
+    path = make_table(tmp_path, kept)
+
+    connection = bench.SQLiteConnection(path)
+    missing = find_missing_dates(connection, bench.TABLE_NAME, market, rows[0][0], rows[-1][0])
+    connection.close()
+    assert missing == [to_date(row[0]) for row in rows[:100] + rows[300:310]]
+
+    client = PagingClient(history)
+    fetched, requests = fetch_missing_candles(client, market, missing)
+
+    # 1페이지: 가장 최근 빈 날짜 다음 날 09:00 이전 200개, 2페이지: 남은 빈 날짜 이전 (200개 미만이라 끝)
+    assert requests == 2
+    assert [call[1] for call in client.calls] == [PAGE_SIZE, PAGE_SIZE]
+    assert client.calls[0][2] == f"{rows[310][0]}T09:00:00+09:00"
+    assert client.calls[1][2] == f"{rows[100][0]}T09:00:00+09:00"
+    assert sorted(row[0] for row in fetched) == [row[0] for row in rows[:100] + rows[300:310]]
+
+
+def test_run_backfill_fills_every_gap(tmp_path):
+    history = bench.generate_history(2, 30)
+    kept = [row for market_rows in history.values() for row in market_rows[5:12] + market_rows[20:]]
+    path = make_table(tmp_path, kept)
+
+    client = PagingClient(history)
+    with CandleBatchWriter(bench.SQLiteConnection(path), bench.TABLE_NAME, verbose=False, compact=False) as writer:
+        first_day, last_day = next(iter(history.values()))[0][0], next(iter(history.values()))[-1][0]
+        summary = run_backfill(client, writer, bench.TABLE_NAME, list(history), since=first_day, until=last_day)
+
+    assert {market: info["fetched"] for market, info in summary.items()} == {market: 13 for market in history}
+    assert writer.total_written == 26
+    connection = sqlite3.connect(path)
+    assert connection.execute(f"SELECT COUNT(*) FROM {bench.TABLE_NAME}").fetchone()[0] == 60
+    connection.close()
@@ -0,0 +1,61 @@
+import sys
+import types
+from argparse import Namespace
+
+import pytest
+
+import bench
+
+
+# SHOW TABLES / SELECT 1만 흉내 내는 MySQL 연결 (실행한 쿼리를 기록)
+class FakeMySQL:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.result = None
+
+    def cursor(self):
+        return self
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+        if query.startswith("SHOW TABLES"):
+            self.result = (bench.TABLE_NAME,)
+        elif query.startswith("SELECT 1"):
+            self.result = (1,) if self.rows else None
+
+    def fetchone(self):
+        return self.result
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def mysql_args(drop=False):
+    return Namespace(mysql_host="localhost", mysql_user="root", mysql_password="", mysql_db="prod", drop=drop)
+
+
+def use_fake_mysql(monkeypatch, connection):
+    monkeypatch.setitem(sys.modules, "pymysql", types.SimpleNamespace(connect=lambda **kwargs: connection))
+
+
+def test_mysql_table_with_rows_is_not_dropped(monkeypatch, tmp_path):
+    connection = FakeMySQL(rows=True)
+    use_fake_mysql(monkeypatch, connection)
+
+    with pytest.raises(SystemExit):
+        bench.open_backend(mysql_args(), str(tmp_path))
+    assert not any(query.startswith("DROP") for query in connection.queries)
+
+
+@pytest.mark.parametrize("rows, drop", [(False, False), (True, True)])
+def test_mysql_table_is_recreated_when_empty_or_drop(monkeypatch, tmp_path, rows, drop):
+    connection = FakeMySQL(rows=rows)
+    use_fake_mysql(monkeypatch, connection)
+
+    backend, _ = bench.open_backend(mysql_args(drop), str(tmp_path))
+    assert backend == "mysql"
+    assert f"DROP TABLE IF EXISTS {bench.TABLE_NAME}" in connection.queries
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+import bench
+from charts import CoinIndex, add_derived_columns, build_line_chart, lttb_indices, trace_points
+
+
+def history_frame(markets=3, days=20):
+    rows = [row for market_rows in bench.generate_history(markets, days).values() for row in market_rows]
+    frame = pd.DataFrame(rows, columns=["date", "code", "opening_price", "closing_price", "high_price", "low_price",
+                                        "volume", "prev_closing_price"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    # DB 조회 결과처럼 코인이 섞인 순서
+    return frame.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def test_coin_slices_match_boolean_masks():
+    data = history_frame()
+    index = CoinIndex(data)
+
+    assert index.codes == list(pd.unique(data["code"]))
+    assert len(index) == len(data)
+    for code in index.codes:
+        expected = add_derived_columns(
+            data[data["code"] == code].sort_values("date", ignore_index=True)
+        )
+        pd.testing.assert_frame_equal(index.get(code).reset_index(drop=True), expected[index.frame.columns])
+    assert index.get("KRW-NONE").empty
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    y[4321] = 50.0    # 튀는 값 하나
+    keep = lttb_indices(x, y, 300)
+
+    assert len(keep) == 300
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+    assert lttb_indices(x[:100], y[:100], 300).tolist() == list(range(100))
+
+
+def test_trace_points_downsamples_only_long_ranges():
+    data = history_frame(markets=1, days=3000)
+    index = CoinIndex(data)
+    coin_data = index.get(index.codes[0])
+
+    x, y = trace_points(coin_data, "closing_price", max_points=500)
+    assert len(x) == 500
+    assert x[0] == coin_data["date"].iloc[0] and x[-1] == coin_data["date"].iloc[-1]
+
+    # 기간을 좁히면 원본 해상도
+    date_range = (coin_data["date"].iloc[100].date(), coin_data["date"].iloc[399].date())
+    x, y = trace_points(coin_data, "closing_price", date_range, max_points=500)
+    mask = (coin_data["date"] >= pd.Timestamp(date_range[0])) & (coin_data["date"] <= pd.Timestamp(date_range[1]))
+    assert x.tolist() == coin_data.loc[mask, "date"].to_numpy().tolist()
+    assert y.tolist() == coin_data.loc[mask, "closing_price"].tolist()
+
+
+def test_fast_chart_uses_webgl_traces():
+    index = CoinIndex(history_frame(markets=2, days=3000))
+    fig = build_line_chart(index, index.codes, "volume", "", "", "", fast=True, max_points=400)
+    assert [trace.type for trace in fig.data] == ["scattergl", "scattergl"]
+    assert all(len(trace.x) == 400 for trace in fig.data)
@@ -0,0 +1,43 @@
+from dashboard_data import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.rollbacks = 0
+        self.closed = False
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_released_connection_ends_its_read_transaction():
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(FakeConnection()) or opened[-1], size=1)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second and len(opened) == 1
+    assert first.rollbacks == 2
+    assert pool.stats()["in_use"] == 0
+
+
+def test_failed_connection_is_replaced():
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(FakeConnection()) or opened[-1], size=1)
+
+    try:
+        with pool.connection():
+            raise RuntimeError("query failed")
+    except RuntimeError:
+        pass
+    with pool.connection() as connection:
+        pass
+
+    assert opened[0].closed
+    assert connection is opened[1]
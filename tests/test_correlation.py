@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+import bench
+from charts import CoinIndex
+from correlation import CorrelationEngine
+
+
+def make_index(markets=4, days=60, drop_first=None):
+    rows = [row for market_rows in bench.generate_history(markets, days).values() for row in market_rows]
+    frame = pd.DataFrame(rows, columns=["date", "code", "opening_price", "closing_price", "high_price", "low_price",
+                                        "volume", "prev_closing_price"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    if drop_first:
+        # 늦게 상장한 코인 (앞쪽 날짜 없음)
+        code, days_missing = drop_first
+        late = frame[frame["code"] == code].index[:days_missing]
+        frame = frame.drop(late)
+    return CoinIndex(frame)
+
+
+def pandas_returns(index):
+    pivot = index.frame.pivot(index="date", columns="code", values="closing_price")
+    return (pivot / pivot.shift(1) - 1).iloc[1:]
+
+
+def test_matrix_matches_dataframe_corr():
+    index = make_index(drop_first=("KRW-C002", 25))
+    engine = CorrelationEngine()
+    returns = pandas_returns(index)
+
+    pd.testing.assert_frame_equal(engine.matrix(1, index), returns.corr(), check_names=False)
+    pd.testing.assert_frame_equal(engine.matrix(1, index, 7), returns.tail(7).corr(), check_names=False)
+
+
+def test_appended_dates_match_full_recompute():
+    full = make_index(days=60)
+    head = CoinIndex(full.frame[full.frame["date"] < full.frame["date"].max() - pd.Timedelta(days=5)])
+
+    engine = CorrelationEngine()
+    engine.matrix(1, head)
+    incremental = engine.matrix(2, full)
+    pd.testing.assert_frame_equal(incremental, CorrelationEngine().matrix(1, full))
+
+
+def test_rolling_matches_pandas_rolling_corr():
+    index = make_index(days=40)
+    returns = pandas_returns(index)
+    rolling = CorrelationEngine().rolling(1, index, "KRW-C000", 10)
+
+    expected = returns.drop(columns="KRW-C000").rolling(10).corr(returns["KRW-C000"]).iloc[9:]
+    pd.testing.assert_frame_equal(rolling, expected, check_names=False, check_freq=False)
+
+
+def test_older_session_does_not_see_newer_index():
+    old = make_index(markets=3, days=30)
+    new = make_index(markets=5, days=40)
+    engine = CorrelationEngine()
+    engine.matrix(2, new)
+
+    # 아직 이전 버전을 보고 있는 세션: 자기 인덱스로 계산하고 엔진 상태는 그대로
+    assert engine.matrix(1, old).shape == (3, 3)
+    assert len(engine.rolling(1, old, "KRW-C000", 7)) == 29 - 6
+    assert engine.version == 2
+    assert engine.matrix(2, new).shape == (5, 5)
+    np.testing.assert_allclose(np.diag(engine.matrix(1, old)), 1.0)
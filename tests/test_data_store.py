@@ -0,0 +1,77 @@
+import sqlite3
+
+import pandas as pd
+
+import bench
+from dashboard_data import QueryRunner, UpbitDataStore
+
+
+def insert(path, rows):
+    connection = sqlite3.connect(path)
+    connection.executemany(
+        f"INSERT INTO {bench.TABLE_NAME} (id, date, code, opening_price, closing_price, high_price, low_price, "
+        "volume, prev_closing_price) VALUES (?, ?, ?, 100, 101, 102, 99, ?, 100)",
+        rows,
+    )
+    connection.commit()
+    connection.close()
+
+
+def make_store(tmp_path):
+    path = str(tmp_path / "store.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(bench.SQLITE_TABLE_DDL)
+    connection.close()
+    store = UpbitDataStore(QueryRunner(lambda: bench.SQLiteConnection(path)), start_date="2026-01-01", ttl=0,
+                           compact=False)
+    return path, store
+
+
+def test_late_commit_with_lower_id_is_picked_up(tmp_path):
+    path, store = make_store(tmp_path)
+    insert(path, [(1, "2026-01-01", "KRW-A", 1.0), (2, "2026-01-01", "KRW-B", 2.0)])
+    assert store.refresh()
+
+    # 다른 수집기가 id 4를 먼저 커밋하고, id 3은 나중에 커밋
+    insert(path, [(4, "2026-01-02", "KRW-B", 20.0)])
+    assert store.refresh()
+    insert(path, [(3, "2026-01-02", "KRW-A", 10.0)])
+    assert store.refresh()
+    assert not store.refresh()
+
+    frame = store.frame.sort_values(["code", "date"])
+    assert len(frame) == 4
+    assert frame.set_index(["code", frame["date"].dt.day])["cumulative_volume"].to_dict() == {
+        ("KRW-A", 1): 1.0, ("KRW-A", 2): 11.0, ("KRW-B", 1): 2.0, ("KRW-B", 2): 22.0,
+    }
+
+
+def test_overlap_rows_are_not_duplicated(tmp_path):
+    path, store = make_store(tmp_path)
+    insert(path, [(i, f"2026-01-{i:02d}", "KRW-A", float(i)) for i in range(1, 6)])
+    store.refresh()
+    insert(path, [(6, "2026-01-06", "KRW-A", 6.0)])
+    store.refresh()
+
+    assert store.frame["date"].is_unique
+    assert store.frame["cumulative_volume"].tolist() == pd.Series(range(1, 7)).cumsum().astype(float).tolist()
+
+
+def test_compact_schema_reads_base_table(tmp_path):
+    queries = []
+
+    class RecordingRunner:
+        def fetchall(self, query, params=None):
+            queries.append(query)
+            if "information_schema" in query:
+                return [("VIEW",)]
+            if "MAX(id)" in query:
+                return [(0, 0)]
+            return []
+
+    store = UpbitDataStore(RecordingRunner(), start_date="2026-01-01")
+    store.refresh()
+    store.fetch_since(0)
+
+    assert "FROM upbit_data_compact WHERE" in queries[1]
+    assert "FROM upbit_data_compact d JOIN upbit_markets m" in queries[2]
@@ -0,0 +1,30 @@
+import sqlite3
+
+import bench
+from db_writer import CandleBatchWriter
+
+
+def test_written_and_skipped_counts(tmp_path):
+    path = str(tmp_path / "writer.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(bench.SQLITE_TABLE_DDL)
+    connection.close()
+    rows = bench.generate_history(2, 3)
+
+    with CandleBatchWriter(bench.SQLiteConnection(path), chunk_size=2, verbose=False, compact=False) as writer:
+        for market_rows in rows.values():
+            for row in market_rows:
+                writer.add(bench.row_to_candle(row), row[1])
+    assert (writer.total_written, writer.total_skipped) == (6, 0)
+    assert [batch["rows"] for batch in writer.batches] == [2, 2, 2]
+
+    # 같은 행을 다시 넣으면 모두 건너뜀, 새 날짜만 기록
+    again = [rows["KRW-C000"][-1], rows["KRW-C001"][-1], ("2099-01-01",) + rows["KRW-C000"][-1][1:]]
+    with CandleBatchWriter(bench.SQLiteConnection(path), chunk_size=10, verbose=False, compact=False) as writer:
+        for row in again:
+            writer.add(bench.row_to_candle(row), row[1])
+    assert (writer.total_written, writer.total_skipped) == (1, 2)
+
+    connection = sqlite3.connect(path)
+    assert connection.execute(f"SELECT COUNT(*) FROM {bench.TABLE_NAME}").fetchone()[0] == 7
+    connection.close()
@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+
+from defect_data import data_signature, load_clean_frame
+from defect_index import load_index
+
+
+def write_csv(path, descriptions):
+    pd.DataFrame({
+        "TYPE_GBN_U_NM": ["외관불량"] * len(descriptions),
+        "TYPE_GBN_NM": ["스크래치"] * len(descriptions),
+        "JOCHI_DESCR": descriptions,
+        "D_YMD": ["2026-01-02"] * len(descriptions),
+    }).to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def test_same_name_csvs_keep_separate_snapshots(tmp_path):
+    cache = tmp_path / "cache"
+    first, second = tmp_path / "a" / "data.csv", tmp_path / "b" / "data.csv"
+    for path, text in ((first, "재작업 실시"), (second, "설비 점검!")):
+        path.parent.mkdir()
+        write_csv(path, [text])
+
+    load_clean_frame(str(first), str(cache))
+    load_clean_frame(str(second), str(cache))
+    assert len(os.listdir(cache)) == 2
+
+    # 같은 CSV가 바뀌면 그 CSV의 이전 스냅샷만 교체
+    write_csv(first, ["재작업 실시", "금형 수리"])
+    os.utime(first, ns=(1, 1))
+    assert len(load_clean_frame(str(first), str(cache))) == 2
+    assert len(os.listdir(cache)) == 2
+    assert load_clean_frame(str(second), str(cache))["JOCHI_DESCR"].tolist() == ["설비 점검"]
+
+
+def test_index_is_cached_next_to_snapshot(tmp_path):
+    cache = tmp_path / "cache"
+    path = tmp_path / "data.csv"
+    write_csv(path, ["재작업 실시", "재작업 완료", "설비 점검"])
+    signature = data_signature(str(path))
+    frame = load_clean_frame(str(path), str(cache))
+
+    index = load_index(frame, signature, str(cache))
+    rows, counts = index.search("재작업")
+    assert rows.tolist() == [0, 1] and counts == [("재작업", 2)]
+    assert index.search("점*", year=2026)[0].tolist() == [2]
+    assert len(os.listdir(cache)) == 2
@@ -0,0 +1,75 @@
+from collections import Counter
+
+import pandas as pd
+
+from defect_cube import build_cube
+
+
+# 연도 2개, 유형 2개, 발생유형 3개 (칸마다 조치 횟수가 모두 달라 상위 5개 순서가 하나로 정해짐)
+def defect_frame():
+    rows = []
+    for year, type_name, subtype, actions in [
+        (2025, "외관불량", "스크래치", {"재작업": 6, "연마": 5, "폐기": 4, "세척": 3, "도장": 2, "검사": 1}),
+        (2025, "외관불량", "찍힘", {"교체": 3, "수리": 1}),
+        (2025, "치수불량", "길이", {"재가공": 2}),
+        (2026, "외관불량", "스크래치", {"연마": 4, "재작업": 2}),
+        (2026, "치수불량", "길이", {"재가공": 5, "폐기": 1}),
+        (2026, "치수불량", "폭", {"측정": 1}),
+    ]:
+        for action, count in actions.items():
+            rows += [(year, type_name, subtype, action)] * count
+    # 두 조치를 한 행에 적은 경우 (줄마다 따로 셈)
+    rows.append((2026, "치수불량", "폭", "측정\n\n재가공"))
+    frame = pd.DataFrame(rows, columns=["YEAR", "TYPE_GBN_U_NM", "TYPE_GBN_NM", "JOCHI_DESCR"])
+    frame["YEAR"] = frame["YEAR"].astype("Int64")
+    return frame.astype({"TYPE_GBN_U_NM": "category", "TYPE_GBN_NM": "category"})
+
+
+# 이전 방식: 선택한 연도/유형을 걸러서 groupby로 건수와 상위 5개 조치 계산
+def old_type_counts(frame, year):
+    counts = frame[frame["YEAR"] == year]["TYPE_GBN_U_NM"].value_counts()
+    return {name: int(count) for name, count in counts.items() if count > 0}
+
+
+def old_treemap(frame, year, type_name):
+    def top_5_html(descriptions):
+        actions = [action.strip() for desc in descriptions for action in desc.split("\n") if action.strip()]
+        top_5 = Counter(actions).most_common(5)
+        return "<br>".join(f"{i+1}. {action} ({count})" for i, (action, count) in enumerate(top_5))
+
+    selected = frame[(frame["YEAR"] == year) & (frame["TYPE_GBN_U_NM"] == type_name)]
+    return (
+        selected.groupby(["TYPE_GBN_U_NM", "TYPE_GBN_NM"], observed=True)
+        .agg(빈도수=("JOCHI_DESCR", "size"), 조치내용=("JOCHI_DESCR", top_5_html))
+        .reset_index()
+    )
+
+
+def test_cube_matches_groupby_path():
+    frame = defect_frame()
+    cube = build_cube(frame)
+
+    assert cube.years == [2025, 2026]
+    for year in cube.years:
+        assert cube.types(year) == old_type_counts(frame, year)
+        counts = list(cube.types(year).values())
+        assert counts == sorted(counts, reverse=True)
+        for type_name in cube.types(year):
+            got = cube.treemap_frame(year, type_name)
+            expected = old_treemap(frame, year, type_name)
+            assert got["TYPE_GBN_NM"].astype(str).tolist() == expected["TYPE_GBN_NM"].astype(str).tolist()
+            assert got["빈도수"].tolist() == expected["빈도수"].tolist()
+            assert got["조치내용"].tolist() == expected["조치내용"].tolist()
+
+
+def test_missing_cells_and_year_comparison():
+    cube = build_cube(defect_frame())
+    assert cube.treemap_frame(2025, "없는유형").empty
+
+    compare = cube.compare_types([2025, 2026, 2030])
+    assert sorted(compare["YEAR"].unique().tolist()) == [2025, 2026]
+    totals = compare.set_index(["TYPE_GBN_U_NM", "YEAR"])["빈도수"]
+    assert (totals["외관불량", 2025], totals["치수불량", 2026]) == (25, 8)
+
+    subtypes = cube.compare_subtypes("치수불량", [2025, 2026]).set_index(["TYPE_GBN_NM", "YEAR"])["빈도수"]
+    assert (subtypes["폭", 2025], subtypes["폭", 2026], subtypes["길이", 2025]) == (0, 2, 2)
@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from defect_index import build_index_arrays, load_index
+
+WORDS = ["재작업", "재작업실시", "재가공", "연마", "폐기", "세척", "설비", "설비점검", "금형", "Scratch"]
+
+
+def defect_frame(rows=300, seed=0):
+    rng = random.Random(seed)
+    frame = pd.DataFrame({
+        "TYPE_GBN_U_NM": [rng.choice(["외관불량", "치수불량"]) for _ in range(rows)],
+        "TYPE_GBN_NM": [rng.choice(["스크래치", "찍힘", "길이"]) for _ in range(rows)],
+        "JOCHI_DESCR": [" ".join(rng.sample(WORDS, rng.randint(0, 3))) for _ in range(rows)],
+        "YEAR": [rng.choice([2025, 2026, None]) for _ in range(rows)],
+    })
+    frame["YEAR"] = frame["YEAR"].astype("Int64")
+    return frame.astype({"TYPE_GBN_U_NM": "category", "TYPE_GBN_NM": "category"})
+
+
+# 프레임을 한 행씩 훑어서 검색 (끝이 *인 검색어는 접두어)
+def brute_force(frame, query, year=None, type_name=None, subtype=None):
+    words = [word.lower() for word in query.split()]
+    rows = []
+    for row, (text, row_year, row_type, row_subtype) in enumerate(
+        frame[["JOCHI_DESCR", "YEAR", "TYPE_GBN_U_NM", "TYPE_GBN_NM"]].itertuples(index=False)
+    ):
+        tokens = text.lower().split()
+        if year is not None and (pd.isna(row_year) or row_year != year):
+            continue
+        if (type_name is not None and row_type != type_name) or (subtype is not None and row_subtype != subtype):
+            continue
+        if all(any(token.startswith(word[:-1]) if word.endswith("*") else token == word for token in tokens)
+               for word in words):
+            rows.append(row)
+    return rows
+
+
+@pytest.fixture(scope="module")
+def indexed(tmp_path_factory):
+    frame = defect_frame()
+    return frame, load_index(frame, ("defects.csv", 1, 1), str(tmp_path_factory.mktemp("cache")))
+
+
+@pytest.mark.parametrize("query", ["재작업", "재작업*", "설비 점검", "설비*", "scratch", "재* 폐기", "연마 세척", "없는말", "재작업실시 금형*"])
+@pytest.mark.parametrize("filters", [{}, {"year": 2026}, {"type_name": "외관불량"},
+                                     {"year": 2025, "type_name": "치수불량", "subtype": "길이"}, {"type_name": "없는유형"}])
+def test_search_matches_brute_force(indexed, query, filters):
+    frame, index = indexed
+    rows, _ = index.search(query, **filters)
+    assert rows.tolist() == brute_force(frame, query, **filters)
+
+
+def test_term_counts_follow_filters(indexed):
+    frame, index = indexed
+    rows, counts = index.search("재*", year=2026)
+    expected = {}
+    for word in ["재작업", "재작업실시", "재가공"]:
+        count = len(brute_force(frame, word, year=2026))
+        if count:
+            expected[word] = count
+    assert dict(counts) == expected
+    assert [count for _, count in counts] == sorted(expected.values(), reverse=True)
+    assert index.search("재작업", prefix=True)[0].tolist() == index.search("재작업*")[0].tolist()
+
+
+def test_empty_query_and_empty_text(tmp_path):
+    frame = defect_frame(rows=3)
+    frame["JOCHI_DESCR"] = ["", "재작업", "  "]
+    arrays = build_index_arrays(frame)
+    assert arrays["terms"].tolist() == ["재작업"]
+    assert arrays["postings"].tolist() == [1]
+    assert np.array_equal(arrays["offsets"], [0, 1])
+
+    index = load_index(frame, ("defects.csv", 3, 3), str(tmp_path))
+    for query in ["", "  ", "*"]:
+        rows, counts = index.search(query)
+        assert rows.tolist() == [] and counts == []
@@ -0,0 +1,77 @@
+import random
+from collections import Counter
+
+import pandas as pd
+
+from defect_cube import build_cube
+from defect_data import build_clean_frame
+from defect_stream import ExactCounter, SpaceSaving, stream_cube
+from text_cleaner import TextCleaner
+
+
+# 몇 개 항목이 대부분을 차지하고 나머지는 드문 흐름 (앞쪽 항목일수록 많이 나옴)
+def skewed_stream(length=5000, items=300, seed=0):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) ** 1.2 for rank in range(items)]
+    return rng.choices([f"조치{rank:03d}" for rank in range(items)], weights, k=length)
+
+
+def test_space_saving_matches_exact_top():
+    stream = skewed_stream()
+    approx, exact = SpaceSaving(capacity=50), ExactCounter()
+    for item in stream:
+        approx.update(item)
+        exact.update(item)
+
+    assert [item for item, _ in approx.top(5)] == [item for item, _ in exact.top(5)]
+    # 추정 횟수는 실제 이상, 실제 + 넘겨받은 횟수 이하
+    true_counts = Counter(stream)
+    for item, count in approx.top(50):
+        assert true_counts[item] <= count <= true_counts[item] + approx.errors[item]
+    # 전체의 1/capacity보다 많이 나온 항목은 모두 남음
+    heavy = {item for item, count in true_counts.items() if count > len(stream) / 50}
+    assert heavy <= set(approx.counts)
+    assert len(approx.counts) == 50
+
+
+def test_weighted_updates_match_single_updates():
+    stream = skewed_stream(length=2000, items=40, seed=1)
+    single, weighted, exact = SpaceSaving(capacity=100), SpaceSaving(capacity=100), ExactCounter()
+    for item in stream:
+        single.update(item)
+        exact.update(item)
+    for item, count in Counter(stream).items():
+        weighted.update(item, count)
+    assert single.top(10) == weighted.top(10) == exact.top(10)
+
+
+def write_defect_csv(path, rows=400, seed=2):
+    rng = random.Random(seed)
+    actions = skewed_stream(length=rows * 2, items=30, seed=seed)
+    frame = pd.DataFrame({
+        "TYPE_GBN_U_NM": [rng.choice(["외관불량", "치수불량"]) for _ in range(rows)],
+        "TYPE_GBN_NM": [rng.choice(["스크래치", "찍힘", "길이"]) for _ in range(rows)],
+        "JOCHI_DESCR": [f"{actions[2 * i]}!\n{actions[2 * i + 1]} 은 완료" for i in range(rows)],
+        "D_YMD": [f"{rng.choice([2025, 2026])}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}" for _ in range(rows)],
+    })
+    frame.loc[::37, "JOCHI_DESCR"] = None   # 결측 행은 빠져야 함
+    frame.loc[::53, "D_YMD"] = "날짜없음"    # 연도를 알 수 없는 행도 빠져야 함
+    frame.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def test_exact_stream_cube_matches_build_cube(tmp_path):
+    path = str(tmp_path / "defects.csv")
+    write_defect_csv(path)
+    cleaner = TextCleaner()
+
+    streamed = stream_cube(path, chunk_rows=64, exact=True, cleaner=cleaner)
+    built = build_cube(build_clean_frame(path, cleaner))
+
+    assert streamed.years == built.years
+    for year in built.years:
+        assert streamed.types(year) == built.types(year)
+        for type_name in built.types(year):
+            got = streamed.treemap_frame(year, type_name)
+            expected = built.treemap_frame(year, type_name)
+            assert got["TYPE_GBN_NM"].astype(str).tolist() == expected["TYPE_GBN_NM"].astype(str).tolist()
+            assert got[["빈도수", "조치내용"]].values.tolist() == expected[["빈도수", "조치내용"]].values.tolist()
@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+import bench
+from dashboard_data import QueryRunner, fetch_page
+
+
+@pytest.fixture
+def runner(tmp_path):
+    path = str(tmp_path / "page.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(bench.SQLITE_TABLE_DDL)
+    # 시가가 0인 행은 변동률이 NULL
+    rows = [
+        (f"2026-01-{day:02d}", code, 0.0 if day % 3 == 0 else 100.0, 101.0 + day, 1, 1, 1, 100)
+        for day in range(1, 11) for code in ("KRW-A", "KRW-B")
+    ]
+    connection.executemany(
+        f"INSERT INTO {bench.TABLE_NAME} (date, code, opening_price, closing_price, high_price, low_price, "
+        "volume, prev_closing_price) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    connection.commit()
+    connection.close()
+    return QueryRunner(lambda: bench.SQLiteConnection(path))
+
+
+@pytest.mark.parametrize("sort", ["code", "change_rate", "volume"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_row_once(runner, sort, descending):
+    seen, after = [], None
+    while True:
+        page, after = fetch_page(runner, sort=sort, descending=descending, after=after, page_size=3)
+        seen += list(zip(page["code"], page["date"]))
+        if after is None:
+            break
+    assert len(seen) == 20 and len(set(seen)) == 20
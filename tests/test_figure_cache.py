@@ -0,0 +1,47 @@
+import plotly.graph_objects as go
+import pytest
+
+from figure_cache import FigureCache
+
+
+def build(value):
+    return lambda: go.Figure(go.Scatter(x=[0, 1], y=[value, value]))
+
+
+def test_new_version_replaces_old_figures():
+    cache = FigureCache()
+    first = cache.get_or_build(3, ("line", "KRW-A"), build(1))
+    assert cache.get_or_build(3, ("line", "KRW-A"), build(2)) is first
+
+    cache.get_or_build(4, ("line", "KRW-A"), build(3))
+    assert cache.stats()["entries"] == 1
+
+
+def test_version_restarting_lower_is_cached_again():
+    # 데이터 저장소가 다시 만들어지면 버전이 작은 값부터 다시 시작
+    cache = FigureCache()
+    cache.get_or_build(10, ("line", "KRW-A"), build(1))
+    restarted = cache.get_or_build(1, ("line", "KRW-A"), build(2))
+
+    assert cache.get_or_build(1, ("line", "KRW-A"), build(3)) is restarted
+    assert cache.stats()["hits"] == 1
+
+
+def test_cached_figure_is_serialized_once():
+    calls = []
+
+    def build_once():
+        calls.append(1)
+        return go.Figure(go.Scatter(x=[0, 1], y=[7.25, 8.5], name="KRW-A"), layout={"height": 321})
+
+    cache = FigureCache()
+    figure = cache.get_or_build(1, ("line", "KRW-A"), build_once)
+    again = cache.get_or_build(1, ("line", "KRW-A"), build_once)
+
+    assert again is figure and len(calls) == 1
+    assert "7.25" in figure.html and "KRW-A" in figure.html
+    assert (figure.height, figure.traces) == (321, 1)
+    assert cache.stats()["bytes"] == len(figure.html)
+    # 여러 세션이 공유하는 값이라 바꿀 수 없어야 함
+    with pytest.raises(AttributeError):
+        figure.html = ""
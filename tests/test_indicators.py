@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import bench
+from charts import CoinIndex
+from indicators import INDICATORS, IndicatorEngine, compute_indicator
+
+
+def make_index(markets=3, days=80, cut_days=0):
+    rows = [row for market_rows in bench.generate_history(markets, days).values() for row in market_rows]
+    frame = pd.DataFrame(rows, columns=["date", "code", "opening_price", "closing_price", "high_price", "low_price",
+                                        "volume", "prev_closing_price"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    if cut_days:
+        frame = frame[frame["date"] <= frame["date"].max() - pd.Timedelta(days=cut_days)]
+    return CoinIndex(frame)
+
+
+def test_sma_and_ema_match_pandas():
+    index = make_index()
+    engine = IndicatorEngine()
+    for code, coin_data in index.items():
+        close = coin_data["closing_price"]
+        np.testing.assert_allclose(engine.get(1, index, code, "sma", 7)["sma"], close.rolling(7).mean(), equal_nan=True)
+        np.testing.assert_allclose(engine.get(1, index, code, "ema", 7)["ema"], close.ewm(span=7, adjust=False).mean())
+
+
+@pytest.mark.parametrize("indicator", list(INDICATORS))
+def test_appended_candles_match_full_recompute(indicator):
+    old, new = make_index(cut_days=6), make_index()
+    engine = IndicatorEngine()
+    for code in old.codes:
+        engine.get(1, old, code, indicator, 10)
+
+    for code, coin_data in new.items():
+        incremental = engine.get(2, new, code, indicator, 10)
+        expected = compute_indicator(coin_data, indicator, 10)
+        assert set(incremental) == set(expected)
+        for name, values in expected.items():
+            assert len(incremental[name]) == len(coin_data)
+            np.testing.assert_allclose(incremental[name], values, rtol=1e-9, equal_nan=True)
+
+
+def test_older_session_gets_its_own_lengths():
+    old, new = make_index(cut_days=6), make_index()
+    engine = IndicatorEngine()
+    code = new.codes[0]
+    engine.get(2, new, code, "sma", 5)
+
+    # 이전 버전 세션: 자기 인덱스 길이의 배열, 엔진은 새 버전 그대로
+    assert len(engine.get(1, old, code, "sma", 5)["sma"]) == len(old.get(code))
+    assert engine.version == 2 and engine.index is new
+    assert engine._cache[("sma", 5)]["version"] == 2
+    assert len(engine.get(2, new, code, "sma", 5)["sma"]) == len(new.get(code))
@@ -0,0 +1,58 @@
+import json
+
+from intraday import BarAggregator, replay_source, run_stream
+
+
+def minute_candle(market, minute, price, volume=1.0):
+    return {
+        "market": market,
+        "candle_date_time_kst": f"2026-10-01T09:{minute:02d}:00",
+        "opening_price": price,
+        "high_price": price + 1,
+        "low_price": price - 1,
+        "trade_price": price + 0.5,
+        "candle_acc_trade_volume": volume,
+    }
+
+
+class ListWriter:
+    def __init__(self):
+        self.rows = []
+        self.total_written = 0
+
+    def write(self, rows):
+        self.rows.extend(rows)
+        self.total_written += len(rows)
+        return len(rows)
+
+
+def test_minutes_are_grouped_into_bars():
+    aggregator = BarAggregator(bar_minutes=5)
+    aggregator.add_many([minute_candle("KRW-A", m, 100 + m) for m in (0, 1, 4, 5)])
+    # 진행 중인 분봉이 다시 오면 최신 값으로 교체
+    aggregator.add(minute_candle("KRW-A", 5, 200, volume=3.0))
+
+    rows = {row[2].minute: row[3:] for row in aggregator.pending_rows()}
+    assert rows[0] == (100, 105, 99, 104.5, 3.0)
+    assert rows[5] == (200, 201, 199, 200.5, 3.0)
+
+
+def test_late_minutes_before_previous_bar_are_dropped():
+    aggregator = BarAggregator(bar_minutes=5)
+    aggregator.add(minute_candle("KRW-A", 12, 100))
+    aggregator.add(minute_candle("KRW-A", 4, 90))     # 직전 봉(09:05) 이전
+    assert aggregator.late == 1
+    assert [row[2].minute for row in aggregator.pending_rows()] == [10]
+
+
+def test_replay_stream_writes_every_bar(tmp_path):
+    path = tmp_path / "minutes.jsonl"
+    candles = [minute_candle(market, m, 100 + m) for m in range(10) for market in ("KRW-A", "KRW-B")]
+    path.write_text("\n".join(json.dumps(c) for c in candles), encoding="utf-8")
+
+    writer = ListWriter()
+    run_stream(replay_source(str(path), batch_size=3), BarAggregator(bar_minutes=5), writer, flush_bars=2)
+
+    final = {(row[0], row[2].minute): row[3:] for row in writer.rows}
+    assert set(final) == {("KRW-A", 0), ("KRW-A", 5), ("KRW-B", 0), ("KRW-B", 5)}
+    assert final[("KRW-B", 5)] == (105, 110, 104, 109.5, 5.0)
@@ -0,0 +1,78 @@
+from datetime import date, timedelta
+
+import rollup
+
+
+# 일봉 테이블 조회와 집계 upsert만 흉내 내는 가짜 연결
+class FakeCursor:
+    def __init__(self, days, written):
+        self.days = days
+        self.written = written
+        self.result = []
+
+    def execute(self, query, params=None):
+        code, start, end = params
+        self.result = [row for row in self.days if start <= row[0] <= end]
+
+    def fetchall(self):
+        return self.result
+
+    def executemany(self, query, rows):
+        table = query.split("INSERT INTO")[1].split()[0]
+        for row in rows:
+            self.written.setdefault(table, {})[(row[0], row[1])] = row
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, days):
+        self.days = days
+        self.written = {}
+
+    def cursor(self):
+        return FakeCursor(self.days, self.written)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def daily_rows(first, last):
+    rows = []
+    day = first
+    while day <= last:
+        n = (day - first).days
+        rows.append((day, 100.0 + n, 101.0 + n, 102.0 + n, 99.0 + n, 10.0, 99.0 + n))
+        day += timedelta(days=1)
+    return rows
+
+
+def test_month_start_mid_week_keeps_previous_month_whole():
+    # 2026-10-01은 목요일: 주 시작(09-28)이 9월 안에 있어도 9월 월봉은 9월 전체로 계산해야 함
+    connection = FakeConnection(daily_rows(date(2026, 9, 1), date(2026, 10, 1)))
+    rollup.update_rollups(connection, "upbit_data", {"KRW-BTC": (date(2026, 10, 1), date(2026, 10, 1))})
+
+    monthly = connection.written["upbit_data_monthly"]
+    assert ("KRW-BTC", date(2026, 9, 1)) not in monthly
+    october = monthly[("KRW-BTC", date(2026, 10, 1))]
+    assert october[9] == 1
+
+    weekly = connection.written["upbit_data_weekly"]
+    week = weekly[("KRW-BTC", date(2026, 9, 28))]
+    assert week[9] == 4                 # 09-28 ~ 10-01
+    assert week[3] == 127.0             # 09-28 시가
+
+
+def test_week_spanning_month_end_is_read_whole():
+    connection = FakeConnection(daily_rows(date(2026, 8, 25), date(2026, 9, 6)))
+    rollup.update_rollups(connection, "upbit_data", {"KRW-BTC": (date(2026, 8, 31), date(2026, 9, 2))})
+
+    weekly = connection.written["upbit_data_weekly"]
+    assert weekly[("KRW-BTC", date(2026, 8, 31))][9] == 7
+    monthly = connection.written["upbit_data_monthly"]
+    assert monthly[("KRW-BTC", date(2026, 8, 1))][9] == 7      # 08-25 ~ 08-31
+    assert monthly[("KRW-BTC", date(2026, 9, 1))][9] == 6      # 09-01 ~ 09-06
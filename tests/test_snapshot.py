@@ -0,0 +1,74 @@
+import sqlite3
+
+import bench
+from dashboard_data import QueryRunner, UpbitDataStore
+from snapshot import ColumnarSnapshot
+
+
+def insert(path, rows):
+    connection = sqlite3.connect(path)
+    connection.executemany(
+        f"INSERT INTO {bench.TABLE_NAME} (id, date, code, opening_price, closing_price, high_price, low_price, "
+        "volume, prev_closing_price) VALUES (?, ?, ?, 100, 101, 102, 99, ?, 100)",
+        rows,
+    )
+    connection.commit()
+    connection.close()
+
+
+def make_table(tmp_path):
+    path = str(tmp_path / "snapshot.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(bench.SQLITE_TABLE_DDL)
+    connection.close()
+    return path
+
+
+def sync(path, snapshot):
+    connection = bench.SQLiteConnection(path)
+    try:
+        return snapshot.sync(connection, compact=False)
+    finally:
+        connection.close()
+
+
+# 다른 수집기가 id 4를 먼저 커밋하고 스냅샷이 갱신된 뒤에 id 3이 커밋됨
+FIRST = [(1, "2026-01-01", "KRW-A", 1.0), (2, "2026-01-01", "KRW-B", 2.0), (4, "2026-01-02", "KRW-B", 20.0)]
+LATE = [(3, "2026-01-02", "KRW-A", 10.0)]
+CUMULATIVE = {("KRW-A", 1): 1.0, ("KRW-A", 2): 11.0, ("KRW-B", 1): 2.0, ("KRW-B", 2): 22.0}
+
+
+def cumulative(frame):
+    return frame.set_index(["code", frame["date"].dt.day])["cumulative_volume"].to_dict()
+
+
+def test_sync_picks_up_late_lower_id(tmp_path):
+    path = make_table(tmp_path)
+    snapshot = ColumnarSnapshot(str(tmp_path / "snapshot"), bench.TABLE_NAME)
+    insert(path, FIRST)
+    assert sync(path, snapshot) == 3
+
+    insert(path, LATE)
+    assert sync(path, snapshot) == 1
+    assert sync(path, snapshot) == 0
+
+    last_id, frame = snapshot.load()
+    assert last_id == 4 and len(frame) == 4
+    assert cumulative(frame) == CUMULATIVE
+
+
+def test_store_rechecks_rows_below_snapshot(tmp_path):
+    path = make_table(tmp_path)
+    snapshot = ColumnarSnapshot(str(tmp_path / "snapshot"), bench.TABLE_NAME)
+    insert(path, FIRST)
+    sync(path, snapshot)
+    insert(path, LATE)
+
+    store = UpbitDataStore(QueryRunner(lambda: bench.SQLiteConnection(path)), start_date="2026-01-01", ttl=0,
+                           local_snapshot=snapshot, compact=False)
+    assert store.refresh()
+    assert not store.refresh()
+    # 스냅샷을 버리고 처음부터 다시 읽지 않음 (스냅샷 1번 + 늦은 행 1번)
+    assert store.version == 2
+    assert len(store.frame) == 4
+    assert cumulative(store.frame) == CUMULATIVE
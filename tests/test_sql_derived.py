@@ -0,0 +1,57 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+import bench
+from charts import add_derived_columns
+from dashboard_data import DATA_COLUMNS, DERIVED_COLUMNS, QueryRunner, UpbitDataStore
+from db_writer import CandleBatchWriter
+
+
+def write_rows(path, rows):
+    with CandleBatchWriter(bench.SQLiteConnection(path), bench.TABLE_NAME, verbose=False, compact=False) as writer:
+        writer.add_rows(rows)
+
+
+def pandas_derived(rows):
+    frame = pd.DataFrame(rows, columns=["date", "code", "opening_price", "closing_price", "high_price", "low_price",
+                                        "volume", "prev_closing_price"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    frame = frame.sort_values(["code", "date"], kind="stable", ignore_index=True)
+    return add_derived_columns(frame)[DATA_COLUMNS + DERIVED_COLUMNS]
+
+
+def assert_same_derived(store, rows):
+    frame = store.frame.sort_values(["code", "date"], ignore_index=True)[DATA_COLUMNS + DERIVED_COLUMNS]
+    expected = pandas_derived(rows)
+    assert frame[["code", "date"]].equals(expected[["code", "date"]])
+    for column in DERIVED_COLUMNS:
+        np.testing.assert_allclose(frame[column], expected[column], rtol=1e-12)
+
+
+def test_window_function_columns_match_pandas(tmp_path):
+    path = str(tmp_path / "derived.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(bench.SQLITE_TABLE_DDL)
+    connection.close()
+    history = bench.generate_history(3, 40)
+    gap = history["KRW-C001"][10]
+    first = [row for rows in history.values() for row in rows[:30] if row != gap]
+    later = [row for rows in history.values() for row in rows[30:]]
+
+    store = UpbitDataStore(QueryRunner(lambda: bench.SQLiteConnection(path)), start_date="2000-01-01", ttl=0,
+                           compact=False)
+    write_rows(path, first)
+    store.refresh()
+    assert_same_derived(store, first)
+
+    # 새 날짜만 붙이면 코인별 직전 누적값을 이어 더함
+    write_rows(path, later)
+    store.refresh()
+    assert_same_derived(store, first + later)
+
+    # 과거 날짜가 채워지면(백필) 이후 누적값이 바뀌므로 다시 계산
+    write_rows(path, [gap])
+    store.refresh()
+    assert_same_derived(store, first + later + [gap])
@@ -0,0 +1,53 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import text_cleaner
+from text_cleaner import DEFAULT_STOP_WORDS, TextCleaner
+
+TEXTS = ["재작업 은 실시!", "설비 점검(완료)", np.nan, "재작업 은 실시!", "금형 의 수리\n재작업", "", "A_1 와 B-2"]
+
+
+# 이전 방식: 행마다 정규식으로 정리
+def clean_text(text, stop_words=DEFAULT_STOP_WORDS):
+    if pd.isnull(text):
+        return text
+    text = re.sub(r'[^\w\s]', '', text)
+    pattern = re.compile(r'\b(' + '|'.join(stop_words) + r')\b')
+    return pattern.sub('', text)
+
+
+def test_clean_series_matches_row_by_row():
+    series = pd.Series(TEXTS, index=range(10, 10 + len(TEXTS)), name="JOCHI_DESCR")
+    cleaned = TextCleaner().clean_series(series, workers=1)
+
+    expected = series.map(clean_text)
+    assert cleaned.index.equals(series.index) and cleaned.name == series.name
+    assert cleaned.isna().tolist() == expected.isna().tolist()
+    assert cleaned.dropna().tolist() == expected.dropna().tolist()
+    assert [TextCleaner().clean(text) for text in TEXTS[:2]] == expected.iloc[:2].tolist()
+
+
+def test_custom_and_empty_stop_words():
+    series = pd.Series(["재작업 완료 후 점검", "완료!"])
+    assert TextCleaner(["완료"]).clean_series(series, workers=1).tolist() == ["재작업  후 점검", ""]
+    assert TextCleaner([]).clean_series(series, workers=1).tolist() == ["재작업 완료 후 점검", "완료"]
+    assert TextCleaner(["완료"]).key() != TextCleaner().key()
+
+
+def test_process_pool_matches_single_process(monkeypatch):
+    monkeypatch.setattr(text_cleaner, "PROCESS_POOL_MIN_UNIQUE", 1)
+    monkeypatch.setattr(text_cleaner, "CHUNK_SIZE", 2)
+    series = pd.Series(TEXTS * 3)
+
+    pooled = TextCleaner().clean_series(series, workers=2)
+    single = TextCleaner().clean_series(series, workers=1)
+    assert pooled.isna().tolist() == single.isna().tolist()
+    assert pooled.dropna().tolist() == single.dropna().tolist()
+
+
+@pytest.mark.parametrize("text", ["", "!!!", "은"])
+def test_text_that_cleans_to_empty(text):
+    assert TextCleaner().clean(text) == clean_text(text)
@@ -0,0 +1,77 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import bench
+import metrics
+import universe
+
+
+class CountingWriter:
+    def __init__(self):
+        self.total_written = 0
+        self.total_skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, candle, market):
+        self.total_written += 1
+        metrics.count("rows_written")
+
+
+# 워커 프로세스에 넘기므로 모듈 수준 함수
+def open_counting_writer():
+    return CountingWriter()
+
+
+@pytest.fixture
+def stub_api():
+    server, base_url = bench.start_stub_api(bench.generate_history(2, 3))
+    yield base_url
+    server.shutdown()
+
+
+@pytest.fixture
+def metrics_on():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.enable(False)
+    metrics.reset()
+
+
+def test_worker_metrics_are_merged_once(stub_api, metrics_on):
+    # 메인 프로세스에서 먼저 기록한 값 (fork로 워커에 복사됨)
+    metrics.count("http_responses", status=200)
+
+    # 워커 하나가 작업 두 개를 처리
+    with ProcessPoolExecutor(max_workers=1, initializer=universe._init_worker,
+                             initargs=(None, True)) as executor:
+        futures = [
+            executor.submit(universe.collect_markets, [market], open_counting_writer, 1, stub_api)
+            for market in ("KRW-C000", "KRW-C001")
+        ]
+        for future in futures:
+            metrics.merge(future.result()["metrics"])
+
+    counters = metrics.dump()["counters"]
+    assert counters[("rows_written", ())] == 2
+    assert counters[("http_responses", (("status", 200),))] == 3   # 메인 1 + 워커 요청 2
+
+
+def test_shards_cover_every_market_once():
+    markets = [f"KRW-C{n:03d}" for n in range(40)]
+    shards = [universe.shard_markets(markets, i, 3) for i in range(3)]
+    assert sorted(sum(shards, [])) == markets
+    # 새 마켓이 추가되어도 기존 마켓의 샤드는 그대로
+    assert universe.shard_markets(markets + ["KRW-NEW"], 1, 3)[:len(shards[1])] == shards[1]
+
+
+def test_split_for_workers_balances_markets():
+    groups = universe.split_for_workers([f"KRW-C{n}" for n in range(7)], 3)
+    assert [len(group) for group in groups] == [3, 2, 2]
+    assert universe.split_for_workers(["KRW-A"], 4) == [["KRW-A"]]
@@ -0,0 +1,36 @@
+import time
+
+import bench
+from upbit_api import RateLimiter, UpbitClient, parse_remaining_req
+
+
+def test_fetch_all_against_stub_server():
+    history = bench.generate_history(3, 5)
+    server, base_url = bench.start_stub_api(history)
+    try:
+        with UpbitClient(base_url=base_url, max_concurrency=2) as client:
+            results = client.fetch_all(list(history) + ["KRW-NONE"], count=2)
+            # 스레드마다 연결 하나를 계속 재사용
+            assert len(client._connections) <= 2
+    finally:
+        server.shutdown()
+
+    assert results["KRW-NONE"] is None
+    for market, rows in history.items():
+        candles = results[market]
+        assert [c["candle_date_time_kst"][:10] for c in candles] == [rows[-1][0], rows[-2][0]]
+        assert candles[0]["trade_price"] == rows[-1][3]
+
+
+def test_parse_remaining_req():
+    assert parse_remaining_req("group=candles; min=600; sec=9") == 9
+    assert parse_remaining_req(None) is None
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50, capacity=1)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # 첫 요청은 바로, 나머지 5개는 1/50초 간격
+    assert time.monotonic() - started >= 5 / 50 * 0.9
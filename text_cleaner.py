@@ -0,0 +1,80 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# [설정]
+DEFAULT_STOP_WORDS = ['은', '는', '이', '가', '을', '를', '에', '에서', '으로', '도', '만', '의', '와', '과', '에게', '한테', '께']
+STOP_WORDS_FILE = os.environ.get("ZOQ_STOP_WORDS")  # 한 줄에 하나씩 적은 불용어 파일 (없으면 기본 목록)
+PROCESS_POOL_MIN_UNIQUE = 200_000  # 고유 문자열이 이보다 많을 때만 프로세스 풀 사용
+CHUNK_SIZE = 50_000                # 프로세스 하나에 넘기는 고유 문자열 수
+CLEAN_WORKERS = int(os.environ.get("ZOQ_CLEAN_WORKERS", os.cpu_count() or 1))  # 프로세스 풀 크기 (1이면 사용 안 함)
+
+PUNCTUATION_PATTERN = r'[^\w\s]'   # \w는 알파벳, 숫자, 밑줄(_) 포함, \s는 공백
+
+
+# 불용어 파일 읽기 (빈 줄, #으로 시작하는 줄은 무시)
+def load_stop_words(path=STOP_WORDS_FILE):
+    if not path:
+        return list(DEFAULT_STOP_WORDS)
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+# 특수기호와 불용어 제거기
+# - 정규식은 만들 때 한 번만 컴파일한다.
+# - 열 전체를 처리할 때는 고유 문자열만 한 번씩 정리하고 원래 위치로 펼친다 (조치 내용은 같은 문장이 많이 반복됨).
+class TextCleaner:
+    def __init__(self, stop_words=None):
+        self.stop_words = list(DEFAULT_STOP_WORDS if stop_words is None else stop_words)
+        self.punctuation = re.compile(PUNCTUATION_PATTERN)
+        self.stop_pattern = None
+        if self.stop_words:
+            self.stop_pattern = re.compile(r'\b(' + '|'.join(map(re.escape, self.stop_words)) + r')\b')
+
+    # 캐시 키에 넣을 설정 값 (불용어가 바뀌면 다시 정리해야 함)
+    def key(self):
+        return tuple(self.stop_words)
+
+    # 문자열 하나 정리 (결측은 그대로)
+    def clean(self, text):
+        if pd.isnull(text):
+            return text
+        text = self.punctuation.sub('', text)
+        return self.stop_pattern.sub('', text) if self.stop_pattern else text
+
+    # 문자열 배열을 str 연산으로 한꺼번에 정리
+    def clean_values(self, values):
+        series = pd.Series(values, dtype=object).str.replace(self.punctuation, '', regex=True)
+        if self.stop_pattern:
+            series = series.str.replace(self.stop_pattern, '', regex=True)
+        return series.to_numpy(dtype=object)
+
+    # 열 전체 정리: 고유 문자열만 정리 (많으면 workers개 프로세스로 나눔)
+    def clean_series(self, series, workers=CLEAN_WORKERS):
+        codes, uniques = pd.factorize(series)
+        uniques = np.asarray(uniques, dtype=object)
+        if workers and workers > 1 and len(uniques) >= PROCESS_POOL_MIN_UNIQUE:
+            chunks = [uniques[i:i + CHUNK_SIZE] for i in range(0, len(uniques), CHUNK_SIZE)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = list(executor.map(_clean_chunk, [self.stop_words] * len(chunks), chunks))
+            cleaned = np.concatenate(parts) if parts else uniques
+        else:
+            cleaned = self.clean_values(uniques)
+        # 고유값 번호로 원래 위치에 펼치기 (결측은 번호가 -1이라 reindex에서 NaN이 됨)
+        result = pd.Series(cleaned, dtype=object).reindex(codes).to_numpy()
+        return pd.Series(result, index=series.index, name=series.name)
+
+
+# 워커 프로세스: 불용어 목록으로 정리기를 만들어 한 묶음 정리 (불용어마다 한 번만 생성)
+_worker_cleaners = {}
+
+
+def _clean_chunk(stop_words, values):
+    key = tuple(stop_words)
+    cleaner = _worker_cleaners.get(key)
+    if cleaner is None:
+        cleaner = _worker_cleaners[key] = TextCleaner(stop_words)
+    return cleaner.clean_values(values)
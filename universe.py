@@ -0,0 +1,101 @@
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from upbit_api import UpbitClient, MAX_CONCURRENCY
+
+# [설정]
+DEFAULT_WORKERS = 4  # 한 호스트에서 띄울 워커 프로세스 수
+
+# 워커 프로세스 안에서 공유하는 limiter (프로세스 생성 시 initializer로 전달)
+_worker_limiter = None
+_in_worker = False
+
+
+# 마켓 코드를 해시해서 호스트 샤드에 배정 (마켓 목록이 바뀌어도 기존 배정은 그대로 유지)
+def shard_markets(markets, shard_index=0, shard_count=1):
+    if shard_count <= 1:
+        return list(markets)
+    return [m for m in markets if zlib.crc32(m.encode()) % shard_count == shard_index]
+
+
+# 마켓 목록을 n개의 워커 묶음으로 나눔
+def split_for_workers(markets, workers):
+    workers = max(1, min(workers, len(markets)))
+    return [markets[i::workers] for i in range(workers)]
+
+
+# 전체 마켓 목록을 조회한 뒤 이 호스트가 맡을 샤드만 선택
+def discover_markets(limiter=None, quote="KRW", shard_index=0, shard_count=1):
+    with UpbitClient(limiter=limiter) as client:
+        markets = client.fetch_markets(quote)
+    if markets is None:
+        return None
+    mine = shard_markets(markets, shard_index, shard_count)
+    print(f"전체 {quote} 마켓 {len(markets)}개 중 샤드 {shard_index}/{shard_count}: {len(mine)}개")
+    return mine
+
+
+# fork로 물려받은 메인 프로세스의 지표는 버린다 (메인에서 다시 합치면 두 번 세어짐)
+def _init_worker(limiter, metrics_enabled=False):
+    global _worker_limiter, _in_worker
+    _worker_limiter = limiter
+    _in_worker = True
+    metrics.enable(metrics_enabled)
+    metrics.reset()
+
+
+# 워커 프로세스: 맡은 마켓의 최신 일봉을 받아 저장
+# open_writer는 스크립트에 정의된 모듈 수준 함수여야 한다 (프로세스 간 전달)
+def collect_markets(markets, open_writer, max_concurrency=MAX_CONCURRENCY, base_url=None):
+    # 한 워커가 여러 작업을 맡을 수 있으므로 작업마다 이번 작업분만 보냄
+    if _in_worker:
+        metrics.reset()
+    client_args = {"max_concurrency": max_concurrency, "limiter": _worker_limiter}
+    if base_url:
+        client_args["base_url"] = base_url
+    with UpbitClient(**client_args) as client:
+        results = client.fetch_all(markets, count=1)
+
+    failed = [market for market, data in results.items() if not data]
+    with open_writer() as writer:
+        for market, data in results.items():
+            if data:
+                writer.add(data[0], market)
+    return {
+        "markets": len(markets),
+        "failed": failed,
+        "written": writer.total_written,
+        "skipped": writer.total_skipped,
+        "metrics": metrics.dump() if metrics.enabled() else None,  # 메인 프로세스에서 합침
+    }
+
+
+# 마켓 목록을 워커 프로세스에 나눠 수집 (모든 워커가 하나의 토큰 버킷을 공유)
+def run_universe(markets, open_writer, limiter, workers=DEFAULT_WORKERS,
+                 max_concurrency=MAX_CONCURRENCY, base_url=None):
+    groups = split_for_workers(list(markets), workers)
+    if not groups or not groups[0]:
+        print("수집할 마켓이 없습니다.")
+        return []
+
+    print(f"{sum(len(g) for g in groups)}개 마켓을 {len(groups)}개 워커로 수집")
+    summaries = []
+    with ProcessPoolExecutor(max_workers=len(groups), initializer=_init_worker,
+                             initargs=(limiter, metrics.enabled())) as executor:
+        futures = [
+            executor.submit(collect_markets, group, open_writer, max_concurrency, base_url)
+            for group in groups
+        ]
+        for index, future in enumerate(futures):
+            summary = future.result()
+            summaries.append(summary)
+            if summary["metrics"]:
+                metrics.merge(summary["metrics"])
+            print(
+                f"워커 {index}: {summary['markets']}개 마켓, {summary['written']}행 기록, "
+                f"{summary['skipped']}행 건너뜀, 실패 {len(summary['failed'])}개"
+            )
+            for market in summary["failed"]:
+                print(f"{market}: API 요청 실패 또는 응답 없음.")
+    return summaries
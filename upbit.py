@@ -1,7 +1,20 @@
-import subprocess
-import json
+import argparse
+import atexit
+import threading
 import pymysql
 from datetime import datetime, timedelta
+from upbit_api import UpbitClient, RateLimiter
+from db_writer import CandleBatchWriter
+from rollup import create_rollup_tables, rebuild_rollups
+from backfill import run_backfill, BACKFILL_SINCE
+from universe import discover_markets, run_universe
+from snapshot import ColumnarSnapshot, SNAPSHOT_DIR
+import metrics
+from metrics import METRICS_FILE, VERBOSE_PAYLOADS
+from intraday import (
+    BarAggregator, IntradayBarWriter, BAR_MINUTES, create_intraday_table,
+    install_stop_handler, poll_source, replay_source, run_stream,
+)
 
 # [설정]
 DB_HOST = "localhost"
@@ -9,6 +22,10 @@ DB_USER = "alswnddldy"
 DB_PASSWORD = "1234"
 DB_NAME = "alswnddldy"
 TABLE_NAME = "upbit_data"
+INTRADAY_TABLE = "upbit_intraday"  # 장중 봉 테이블
+FETCH_CONCURRENCY = 8  # 동시에 요청할 최대 마켓 수
+INSERT_CHUNK_SIZE = 500  # 한 번에 저장하고 커밋할 행 수
+WORKER_PROCESSES = 4  # 전체 마켓 수집 시 워커 프로세스 수
 STATUS_FILE = "/home/rlaalswnd/바탕화면/progress_second.txt"
 
 # 수집할 코인 목록
@@ -60,57 +77,26 @@ def create_table_if_not_exists():
     cursor.execute(create_table_query)
     connection.commit()
     cursor.close()
+    create_rollup_tables(connection, TABLE_NAME)  # 주봉/월봉 집계 테이블
     connection.close()
 
-# API 요청
-def fetch_data(coin_market):
-    result = subprocess.run(
-        [
-            "curl", "--request", "GET",
-            "--url", f"https://api.upbit.com/v1/candles/days?count=1&market={coin_market}",
-            "--header", "Accept: application/json"
-        ],
-        capture_output=True,
-        text=True
-    )
-    if result.returncode == 0:
-        try:
-            data = json.loads(result.stdout)
-            print(f"DEBUG: {coin_market} 응답 데이터: {data}")  # 응답 데이터 출력
-            return data
-        except json.JSONDecodeError:
-            print(f"JSON 파싱 실패: {result.stdout}")
-            return None
-    else:
-        print(f"API 요청 실패: {result.stderr}")
-        return None
+# API 요청 (모든 마켓을 keep-alive 연결로 동시에 요청)
+# verbose=True일 때만 응답 전체를 출력 (기본은 꺼짐)
+def fetch_data(markets, limiter=None, verbose=VERBOSE_PAYLOADS):
+    with UpbitClient(max_concurrency=FETCH_CONCURRENCY, limiter=limiter) as client:
+        results = client.fetch_all(markets, count=1)
+    if verbose:
+        for market, data in results.items():
+            print(f"DEBUG: {market} 응답 데이터: {data}")
+    return results
 
-# 데이터베이스 저장
-def save_data_to_db(data, market):
-    connection = pymysql.connect(
-        host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
-    )
-    cursor = connection.cursor()
-    insert_query = f"""
-    INSERT IGNORE INTO {TABLE_NAME} 
-    (date, code, opening_price, closing_price, high_price, low_price, volume, prev_closing_price)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
-    """
-    date = data["candle_date_time_kst"][:10]
-    opening_price = data["opening_price"]
-    closing_price = data["trade_price"]
-    high_price = data["high_price"]
-    low_price = data["low_price"]
-    volume = data["candle_acc_trade_volume"]
-    prev_closing_price = data["prev_closing_price"]
-
-    cursor.execute(
-        insert_query,
-        (date, market, opening_price, closing_price, high_price, low_price, volume, prev_closing_price),
-    )
-    connection.commit()
-    cursor.close()
-    connection.close()
+# 데이터베이스 저장용 writer (실행 동안 연결 하나를 유지하고 묶음으로 저장)
+def open_db_writer():
+    with metrics.timer("db_connect"):
+        connection = pymysql.connect(
+            host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
+        )
+    return CandleBatchWriter(connection, TABLE_NAME, chunk_size=INSERT_CHUNK_SIZE, rollups=True)
 
 # 상태 파일 업데이트
 def update_status_file(last_date):
@@ -125,14 +111,112 @@ def get_last_processed_date():
     except FileNotFoundError:
         return None
 
+# 과거 데이터 백필 (빈 날짜를 찾아 200개 단위 페이지로 채움)
+def backfill(markets, since, limiter=None):
+    with UpbitClient(max_concurrency=FETCH_CONCURRENCY, limiter=limiter) as client, open_db_writer() as writer:
+        run_backfill(client, writer, TABLE_NAME, markets, since=since)
+    print(f"백필 완료: {writer.total_written}행 기록, {writer.total_skipped}행 건너뜀")
+
+# 대시보드용 로컬 컬럼 스냅샷에 새로 저장된 행 반영 (실패해도 수집 결과에는 영향 없음)
+def sync_snapshot():
+    connection = pymysql.connect(
+        host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
+    )
+    try:
+        synced = ColumnarSnapshot(SNAPSHOT_DIR, TABLE_NAME).sync(connection)
+        print(f"로컬 스냅샷에 {synced}행 반영 ({SNAPSHOT_DIR})")
+    except (OSError, pymysql.MySQLError) as e:
+        print(f"로컬 스냅샷 갱신 실패: {e}")
+    finally:
+        connection.close()
+
+# 장중 분봉 수집 데몬 (분봉을 봉 간격으로 묶어 주기적으로 저장, Ctrl+C 또는 SIGTERM으로 종료)
+def stream(markets, bar_minutes, replay_path=None, limiter=None):
+    connection = pymysql.connect(
+        host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
+    )
+    create_intraday_table(connection, INTRADAY_TABLE)
+    writer = IntradayBarWriter(connection, INTRADAY_TABLE)
+    aggregator = BarAggregator(bar_minutes)
+    stop = threading.Event()
+    install_stop_handler(stop)
+
+    print(f"장중 수집 시작: {len(markets)}개 마켓, {bar_minutes}분 봉")
+    try:
+        if replay_path:
+            run_stream(replay_source(replay_path, stop=stop), aggregator, writer)
+        else:
+            with UpbitClient(max_concurrency=FETCH_CONCURRENCY, limiter=limiter) as client:
+                run_stream(poll_source(client, markets, bar_minutes, stop=stop), aggregator, writer)
+    finally:
+        # 오류로 끝나도 연결은 닫음 (남은 봉은 run_stream이 끝날 때 저장)
+        writer.close()
+    print("장중 수집 종료.")
+
+# 명령행 옵션
+def parse_args():
+    parser = argparse.ArgumentParser(description="업비트 일봉 데이터 수집")
+    parser.add_argument("--backfill", action="store_true", help="upbit_data의 빈 날짜를 찾아 과거 데이터를 채움")
+    parser.add_argument("--since", default=BACKFILL_SINCE, help="백필 시작 날짜 (YYYY-MM-DD)")
+    parser.add_argument("--universe", action="store_true", help="COINS 대신 전체 원화 마켓을 조회해서 수집")
+    parser.add_argument("--workers", type=int, default=WORKER_PROCESSES, help="전체 마켓 수집 워커 프로세스 수")
+    parser.add_argument("--shard-index", type=int, default=0, help="여러 호스트로 나눌 때 이 호스트의 샤드 번호")
+    parser.add_argument("--shard-count", type=int, default=1, help="전체 샤드(호스트) 수")
+    parser.add_argument("--stream", action="store_true", help="장중 분봉을 계속 수집하는 데몬 모드")
+    parser.add_argument("--bar-minutes", type=int, default=BAR_MINUTES, help="장중 봉 간격 (분)")
+    parser.add_argument("--replay", help="API 대신 분봉 JSON Lines 파일을 재생 (테스트용)")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="upbit_data 전체로 주봉/월봉 집계 테이블을 다시 만듦")
+    parser.add_argument("--sync-snapshot", action="store_true", help="수집 없이 대시보드용 로컬 스냅샷만 갱신")
+    parser.add_argument("--metrics", action="store_true", help="구간별 시간/횟수를 기록해서 종료 시 Prometheus 텍스트 파일로 저장")
+    parser.add_argument("--metrics-file", default=METRICS_FILE, help="Prometheus 텍스트 파일 경로")
+    parser.add_argument("--verbose", action="store_true", help="API 응답 전체를 출력 (디버깅용)")
+    return parser.parse_args()
+
 # 메인 실행
 def main():
+    args = parse_args()
+    if args.metrics or metrics.enabled():
+        metrics.enable()
+        atexit.register(metrics.write_prometheus, args.metrics_file)
     # 데이터베이스 생성
     create_database_if_not_exists()
 
     # 테이블 생성
     create_table_if_not_exists()
 
+    # 주봉/월봉 집계 테이블 재생성
+    if args.rebuild_rollups:
+        connection = pymysql.connect(
+            host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME
+        )
+        print(f"주봉/월봉 집계 {rebuild_rollups(connection, TABLE_NAME)}행 갱신")
+        connection.close()
+        return
+
+    # 대시보드용 로컬 스냅샷만 갱신
+    if args.sync_snapshot:
+        sync_snapshot()
+        return
+
+    # 모든 요청이 공유하는 초당 요청 한도
+    limiter = RateLimiter()
+    markets = list(COINS.values())
+    if args.universe:
+        markets = discover_markets(limiter, "KRW", args.shard_index, args.shard_count)
+        if markets is None:
+            print("마켓 목록 조회 실패.")
+            return
+
+    if args.stream:
+        stream(markets, args.bar_minutes, args.replay, limiter)
+        return
+
+    # 과거 데이터 백필
+    if args.backfill:
+        backfill(markets, args.since, limiter)
+        sync_snapshot()
+        return
+
     yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
     last_processed_date = get_last_processed_date()
 
@@ -140,19 +224,26 @@ def main():
         print("어제 날짜 데이터는 이미 수집됨.")
         return
 
-    for coin_name, market in COINS.items():
-        print(f"데이터 수집 중: {coin_name} ({market})")
-        data = fetch_data(market)
-        if data:
-            print(f"DEBUG: {market} 응답 데이터: {data}")
-            if len(data) > 0:
-                print(f"{coin_name} 데이터 저장 중...")
-                save_data_to_db(data[0], market)
-            else:
-                print(f"{coin_name}: 데이터가 없습니다.")
-        else:
-            print(f"{coin_name}: API 요청 실패 또는 응답 없음.")
-
+    # 전체 마켓 수집 (워커 프로세스로 나눠서)
+    if args.universe:
+        run_universe(markets, open_db_writer, limiter, workers=args.workers, max_concurrency=FETCH_CONCURRENCY)
+    else:
+        print(f"데이터 수집 중: {', '.join(COINS)}")
+        results = fetch_data(COINS.values(), limiter, verbose=args.verbose or VERBOSE_PAYLOADS)
+        with open_db_writer() as writer:
+            for coin_name, market in COINS.items():
+                data = results.get(market)
+                if data:
+                    if len(data) > 0:
+                        print(f"{coin_name} 데이터 저장 중...")
+                        writer.add(data[0], market)
+                    else:
+                        print(f"{coin_name}: 데이터가 없습니다.")
+                else:
+                    print(f"{coin_name}: API 요청 실패 또는 응답 없음.")
+        print(f"저장 결과: {writer.total_written}행 기록, {writer.total_skipped}행 건너뜀")
+
+    sync_snapshot()
     update_status_file(yesterday)
     print("데이터 수집 및 저장 완료.")
 
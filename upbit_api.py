@@ -0,0 +1,220 @@
+import json
+import os
+import time
+import threading
+import multiprocessing
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlencode
+
+import metrics
+
+# [설정]
+API_BASE_URL = os.environ.get("UPBIT_API_URL", "https://api.upbit.com")  # 로컬 스텁 서버로 바꿔서 테스트 가능
+MAX_CONCURRENCY = 8      # 동시에 보낼 최대 요청 수
+REQUEST_TIMEOUT = 10     # 요청 타임아웃 (초)
+REQUEST_RATE = 10        # 초당 요청 한도 (업비트 시세 API는 IP당 초당 10회)
+REQUEST_BURST = 1        # 한꺼번에 보낼 수 있는 요청 수 (1이면 1/REQUEST_RATE초 간격으로 고르게 보냄)
+MAX_RATE_RETRIES = 5     # 429 응답을 받았을 때 재시도 횟수
+
+# keep-alive 연결이 서버 쪽에서 끊겼을 때 발생하는 예외 (한 번 재연결 후 재시도)
+RETRYABLE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+# 프로세스 간에 공유되는 토큰 버킷
+# 공유 메모리에 [남은 토큰, 마지막 갱신 시각]만 두고, 토큰을 먼저 차감(예약)한 뒤
+# 부족한 만큼만 잠금 밖에서 기다린다. 워커 프로세스 생성 시 인자로 넘겨서 공유한다.
+class RateLimiter:
+    def __init__(self, rate=REQUEST_RATE, capacity=REQUEST_BURST):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._lock = multiprocessing.Lock()
+        self._state = multiprocessing.RawArray("d", [self.capacity, time.monotonic()])
+
+    def _refill(self, now):
+        tokens = min(self.capacity, self._state[0] + (now - self._state[1]) * self.rate)
+        self._state[0] = tokens
+        self._state[1] = now
+        return tokens
+
+    # 요청 하나를 보낼 수 있을 때까지 대기
+    def acquire(self):
+        with self._lock:
+            tokens = self._refill(time.monotonic()) - 1
+            self._state[0] = tokens
+        if tokens < 0:
+            time.sleep(-tokens / self.rate)
+
+    # 응답 헤더의 남은 요청 수보다 토큰이 많으면 맞춰서 줄임
+    def sync(self, remaining):
+        with self._lock:
+            tokens = self._refill(time.monotonic())
+            if remaining < tokens:
+                self._state[0] = float(remaining)
+
+    # 429 응답 등으로 일정 시간 모든 요청을 멈춤
+    def penalize(self, seconds):
+        with self._lock:
+            tokens = self._refill(time.monotonic())
+            self._state[0] = min(tokens, 0) - seconds * self.rate
+
+
+# Remaining-Req 헤더 ("group=candles; min=1800; sec=9")에서 초당 남은 요청 수 추출
+def parse_remaining_req(header):
+    if not header:
+        return None
+    for part in header.split(";"):
+        key, _, value = part.strip().partition("=")
+        if key == "sec":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+# 업비트 REST API 클라이언트
+# 스레드마다 keep-alive 연결을 하나씩 유지하고, 스레드 풀로 여러 마켓을 동시에 요청한다.
+class UpbitClient:
+    def __init__(self, base_url=API_BASE_URL, max_concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT, limiter=None):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.limiter = limiter
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # 현재 스레드의 연결 (없으면 새로 생성)
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.scheme == "https":
+                conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+            else:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    # 현재 스레드의 연결을 닫고 버림
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+
+    # GET 요청 후 (상태 코드, 응답 헤더, 본문 바이트) 반환
+    def request(self, path, params=None):
+        url = self.base_path + path
+        if params:
+            url += "?" + urlencode(params)
+        headers = {"Accept": "application/json", "Connection": "keep-alive"}
+        market = params.get("market", "") if params else ""
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                with metrics.timer("http_fetch", endpoint=path, market=market):
+                    conn.request("GET", url, headers=headers)
+                    response = conn.getresponse()
+                    body = response.read()
+                return response.status, response.headers, body
+            except RETRYABLE_ERRORS:
+                self._drop_connection()
+                if attempt == 1:
+                    raise
+            except Exception:
+                self._drop_connection()
+                raise
+
+    # GET 요청 후 JSON 파싱 결과 반환 (실패 시 None)
+    # limiter가 있으면 요청 전에 토큰을 받고, 응답의 Remaining-Req 헤더로 버킷을 맞추며,
+    # 429를 받으면 잠시 멈춘 뒤 재시도한다.
+    def get_json(self, path, params=None):
+        for attempt in range(MAX_RATE_RETRIES + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            try:
+                status, headers, body = self.request(path, params)
+            except (OSError, http.client.HTTPException) as e:
+                print(f"API 요청 실패: {path} {params} ({e})")
+                return None
+            metrics.count("http_responses", status=status)
+            if self.limiter:
+                remaining = parse_remaining_req(headers.get("Remaining-Req"))
+                if remaining is not None:
+                    self.limiter.sync(remaining)
+            if status != 429:
+                break
+            if self.limiter:
+                self.limiter.penalize(0.5 * (attempt + 1))
+            else:
+                time.sleep(0.5 * (attempt + 1))
+        if status != 200:
+            print(f"API 요청 실패: {path} {params} (HTTP {status}) {body[:200]!r}")
+            return None
+        try:
+            with metrics.timer("json_parse", endpoint=path):
+                return json.loads(body)
+        except ValueError:
+            print(f"JSON 파싱 실패: {body[:200]!r}")
+            return None
+
+    # 한 마켓의 일봉 캔들 요청
+    def fetch_candles(self, market, count=1, to=None):
+        params = {"market": market, "count": count}
+        if to:
+            params["to"] = to
+        return self.get_json("/v1/candles/days", params)
+
+    # 거래 가능한 마켓 목록 (quote로 시작하는 마켓만, 예: KRW)
+    def fetch_markets(self, quote="KRW"):
+        markets = self.get_json("/v1/market/all", {"isDetails": "false"})
+        if markets is None:
+            return None
+        return sorted(m["market"] for m in markets if not quote or m["market"].startswith(f"{quote}-"))
+
+    # 한 마켓의 분봉 캔들 요청 (unit: 1, 3, 5, 10, 15, 30, 60, 240)
+    def fetch_minute_candles(self, market, unit=1, count=1, to=None):
+        params = {"market": market, "count": count}
+        if to:
+            params["to"] = to
+        return self.get_json(f"/v1/candles/minutes/{unit}", params)
+
+    # 마켓마다 func(market)을 동시에 실행 ({마켓: 결과})
+    def map_markets(self, func, markets):
+        markets = list(markets)
+        return dict(zip(markets, self._executor.map(func, markets)))
+
+    # 여러 마켓의 일봉 캔들을 동시에 요청 ({마켓: 캔들 리스트 또는 None})
+    def fetch_all(self, markets, count=1, to=None):
+        return self.map_markets(lambda market: self.fetch_candles(market, count, to), markets)
+
+    # 스레드 풀과 모든 연결 정리
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
@@ -1,83 +1,66 @@
+import time
 import streamlit as st
 import pandas as pd
-from collections import Counter
 import plotly.express as px
-import re
-
-# 불용어 리스트 정의
-stop_words = ['은', '는', '이', '가', '을', '를', '에', '에서', '으로', '도', '만', '의', '와', '과', '에게', '한테', '께']
-
-# 불용어 및 특수기호 제거 함수 정의
-def clean_text(text):
-    if pd.isnull(text):
-        return text
-    # 특수기호 제거 (정규표현식으로 처리)
-    text = re.sub(r'[^\w\s]', '', text)  # \w는 알파벳, 숫자, 밑줄(_) 포함, \s는 공백
-    # 불용어를 제거하기 위해 정규표현식 패턴 생성
-    pattern = re.compile(r'\b(' + '|'.join(stop_words) + r')\b')
-    return pattern.sub('', text)
+from defect_cube import build_cube
+from defect_data import DATA_FILE, data_signature, load_clean_frame
+from defect_index import SEARCH_RESULT_ROWS, load_index
+from defect_stream import load_stream_cube, use_streaming
+
+# 정리된 데이터 로딩 (CSV 경로, 크기, 수정 시각, 불용어가 같으면 메모리/디스크 스냅샷 재사용)
+# 모든 세션이 같은 프레임을 공유하므로 바꾸지 말고 필터링만 해서 사용한다.
+@st.cache_resource(max_entries=2)
+def load_data(signature):
+    return load_clean_frame(signature[0], stop_words=signature[-1])
+
+# 연도 × 유형 × 발생유형 집계 큐브 (데이터 버전마다 한 번 생성, 화면은 큐브만 읽음)
+# 큰 파일은 전체를 메모리에 올리지 않고 조각 단위로 읽어 집계한다 (상위 조치 내용은 근사값).
+@st.cache_resource(max_entries=2)
+def load_cube(signature):
+    if use_streaming(signature):
+        return load_stream_cube(signature[0], stop_words=signature[-1])
+    return build_cube(load_data(signature))
+
+# 조치 내용 역색인 (데이터 버전마다 한 번 생성해 캐시 폴더에 저장, 스트리밍 집계 모드에서는 사용 안 함)
+@st.cache_resource(max_entries=2)
+def load_search_index(signature):
+    return load_index(load_data(signature), signature)
 
 # 데이터 로딩
-data = pd.read_csv('data.csv', on_bad_lines='skip', encoding='utf-8-sig')
-
-# 관련 열에 결측치가 있는 행 제거
-filtered_data = data.dropna(subset=['TYPE_GBN_U_NM', 'TYPE_GBN_NM', 'JOCHI_DESCR', 'D_YMD'])
-
-# 'JOCHI_DESCR' 열에 불용어 및 특수기호 제거 적용
-filtered_data['JOCHI_DESCR'] = filtered_data['JOCHI_DESCR'].apply(clean_text)
-
-# 연도 추출 후 정수형으로 변환
-filtered_data['YEAR'] = pd.to_datetime(filtered_data['D_YMD'], errors='coerce').dt.year.astype('Int64')
+data_version = data_signature(DATA_FILE)
+cube = load_cube(data_version)
 
 # 사이드바: 연도 선택
 st.sidebar.header("연도를 선택하세요")
-available_years = sorted(filtered_data['YEAR'].dropna().unique())
+available_years = cube.years
 
 if len(available_years) == 0:
     st.sidebar.write("데이터에 사용 가능한 연도가 없습니다.")
 else:
     selected_year = st.sidebar.selectbox("연도를 선택하세요", options=available_years)
 
-    # 선택된 연도의 데이터 필터링
-    year_filtered_data = filtered_data[filtered_data['YEAR'] == selected_year]
-
-    # 불량 유형별 빈도수 계산
-    type_counts = year_filtered_data['TYPE_GBN_U_NM'].value_counts().reset_index()
-    type_counts.columns = ['TYPE_GBN_U_NM', '빈도수']
+    # 불량 유형별 빈도수 (큐브에서 조회)
+    type_counts = cube.types(selected_year)
 
     # 연도에 따라 불량 유형 및 빈도수 표시 (클릭 가능)
     st.sidebar.write("### 불량 유형별 빈도수")
-    if not type_counts.empty:
+    if type_counts:
         selected_type = st.sidebar.radio(
             "불량 유형을 클릭하세요:",
-            options=type_counts['TYPE_GBN_U_NM'].tolist(),
+            options=list(type_counts),
             index=0,
-            format_func=lambda x: f"{x}: {type_counts[type_counts['TYPE_GBN_U_NM'] == x]['빈도수'].values[0]}회"
+            format_func=lambda x: f"{x}: {type_counts[x]}회"
         )
     else:
         st.sidebar.write("선택한 연도에는 데이터가 없습니다.")
         selected_type = None
 
-    # 선택된 불량 유형 데이터 필터링
+    # 선택된 불량 유형의 Treemap
     if selected_type:
-        type_filtered_data = year_filtered_data[year_filtered_data['TYPE_GBN_U_NM'] == selected_type]
-
         # Treemap 시각화에 HTML 줄바꿈으로 TOP-5 조치 내용 추가
         st.header(f"불량 유형 및 발생 유형 빈도 Treemap ({selected_type})")
 
-        def get_top_5_actions_html(descriptions):
-            actions = [action.strip() for desc in descriptions for action in desc.split('\n') if action.strip()]
-            action_counts = Counter(actions)
-            top_5 = action_counts.most_common(5)
-            if top_5:
-                return "<br>".join([f"{i+1}. {action} ({count})" for i, (action, count) in enumerate(top_5)])
-            return "조치 내용 없음"
-
-        freq_df = (
-            type_filtered_data.groupby(['TYPE_GBN_U_NM', 'TYPE_GBN_NM'])
-            .agg(빈도수=('JOCHI_DESCR', 'size'), 조치내용=('JOCHI_DESCR', get_top_5_actions_html))
-            .reset_index()
-        )
+        freq_df = cube.treemap_frame(selected_year, selected_type)
 
         fig = px.treemap(
             freq_df,
@@ -93,3 +76,46 @@ else:
 
         # Treemap을 Streamlit에 표시
         st.plotly_chart(fig, use_container_width=True)
+
+    # 연도별 비교 (큐브의 유형 × 연도 표)
+    st.header("연도별 불량 유형 비교")
+    compare_years = st.multiselect("비교할 연도", options=available_years, default=available_years)
+    if compare_years:
+        if selected_type:
+            compare_df = cube.compare_subtypes(selected_type, compare_years)
+            x_column, title = 'TYPE_GBN_NM', f'{selected_type}의 연도별 발생유형 빈도'
+        else:
+            compare_df = cube.compare_types(compare_years)
+            x_column, title = 'TYPE_GBN_U_NM', '연도별 불량 유형 빈도'
+        compare_df['YEAR'] = compare_df['YEAR'].astype(str)
+        compare_fig = px.bar(compare_df, x=x_column, y='빈도수', color='YEAR', barmode='group', title=title)
+        st.plotly_chart(compare_fig, use_container_width=True)
+
+        with st.expander("전체 유형 연도별 빈도표"):
+            st.dataframe(cube.type_by_year[[year for year in compare_years if year in cube.type_by_year.columns]])
+
+    # 조치 내용 검색 (역색인)
+    st.header("조치 내용 검색")
+    if use_streaming(data_version):
+        st.info("데이터 파일이 커서 집계 전용 모드로 실행 중입니다. 검색은 사용할 수 없습니다.")
+    else:
+        query = st.text_input("검색어 (여러 단어는 모두 포함, 끝에 *를 붙이면 앞부분 일치)", value="")
+        col1, col2 = st.columns(2)
+        limit_year = col1.checkbox(f"선택한 연도로 제한 ({selected_year})", value=False)
+        limit_type = col2.checkbox(f"선택한 불량 유형으로 제한 ({selected_type})", value=False, disabled=not selected_type)
+        if query.strip():
+            search_index = load_search_index(data_version)
+            started = time.perf_counter()
+            rows, term_counts = search_index.search(
+                query,
+                year=selected_year if limit_year else None,
+                type_name=selected_type if limit_type and selected_type else None,
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+            st.write(f"검색 결과: {len(rows):,}건 ({elapsed:.1f} ms)")
+            if term_counts:
+                st.dataframe(pd.DataFrame(term_counts, columns=['단어', '건수']), hide_index=True)
+            if len(rows):
+                if len(rows) > SEARCH_RESULT_ROWS:
+                    st.caption(f"앞의 {SEARCH_RESULT_ROWS}건만 표시합니다.")
+                st.dataframe(load_data(data_version).iloc[rows[:SEARCH_RESULT_ROWS]])